@@ -0,0 +1,122 @@
+import threading
+import time
+
+import cat_protocol as cat
+from settle_profile import SettleProfile
+
+# EX queries per pipelined write; keeps well inside the radio's input buffer
+MENU_CHUNK = 16
+
+
+class CatEngine:
+    """Serialized access to the CAT port for worker threads.
+
+    Every call takes the shared lock, so a batch can't interleave with a
+    poll from somewhere else.
+    """
+
+    def __init__(self, ser, lock=None, profile=None):
+        self.ser = ser
+        self.lock = lock or threading.RLock()
+        self.profile = profile or SettleProfile()
+        # menu number -> value bytes we know the radio holds right now
+        self.menu_cache = {}
+        self._buf = bytearray(256)
+
+    def delay(self, kind: str) -> float:
+        return self.profile.get(kind)
+
+    def write(self, data: bytes):
+        with self.lock:
+            self.ser.write(data)
+
+    def settle(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def settle_for(self, kind: str):
+        self.settle(self.profile.get(kind))
+
+    def read_reply(self, timeout_s: float = 0.5) -> bytes:
+        with self.lock:
+            return bytes(cat.read_reply(self.ser, self._buf, timeout_s))
+
+    def query(self, cmd: bytes, timeout_s: float = 0.5) -> bytes:
+        with self.lock:
+            self.ser.reset_input_buffer()
+            self.ser.write(cmd)
+            return bytes(cat.read_reply(self.ser, self._buf, timeout_s))
+
+    def query_many(self, cmds, timeout_s: float = 0.5):
+        """Pipelined queries: one write for all commands, then read the replies.
+
+        Stops at the first timeout, so the result can be shorter than cmds
+        if the radio dropped something. Match replies by their prefix, not
+        by position.
+        """
+        if not cmds:
+            return []
+        replies = []
+        with self.lock:
+            self.ser.reset_input_buffer()
+            self.ser.write(b"".join(cmds))
+            for _ in cmds:
+                r = bytes(cat.read_reply(self.ser, self._buf, timeout_s))
+                if not r:
+                    break
+                replies.append(r)
+        return replies
+
+    def read_menus(self, nums, progress=None):
+        """Read EX menus with pipelined queries, MENU_CHUNK per write.
+
+        Returns {menu: value bytes} and refreshes menu_cache. Menus the
+        radio skipped get one more pipelined pass; any still missing are
+        simply absent from the result.
+        """
+        values = {}
+        pending = list(nums)
+        total = max(1, len(pending))
+        for _ in range(2):
+            missing = []
+            for i in range(0, len(pending), MENU_CHUNK):
+                chunk = pending[i:i + MENU_CHUNK]
+                for r in self.query_many([cat.query_ex(n) for n in chunk]):
+                    if r.startswith(b"EX") and r.endswith(b";") and len(r) > 6 and r[2:5].isdigit():
+                        values[int(r[2:5])] = r[5:-1]
+                missing += [n for n in chunk if n not in values]
+                if progress:
+                    progress(int(min(total, len(values)) * 100 / total))
+            pending = missing
+            if not pending:
+                break
+        self.menu_cache.update(values)
+        return values
+
+    def wait_for(self, query: bytes, check, timeout_s: float, step_s: float = 0.01):
+        """Poll query until check(reply) is true. Returns the passing reply or None."""
+        deadline = time.monotonic() + timeout_s
+        with self.lock:
+            while True:
+                reply = self.query(query, timeout_s=0.2)
+                if check(reply):
+                    return reply
+                if time.monotonic() >= deadline:
+                    return None
+                time.sleep(step_s)
+
+    def send_verified(self, cmd: bytes, kind: str, query: bytes, check, retries: int = 2):
+        """Write cmd, wait the profiled settle time and confirm with query.
+
+        The settle time is the calibrated one, so a retry with a longer
+        wait covers a radio that is slower than it was when measured.
+        """
+        wait = self.profile.get(kind)
+        with self.lock:
+            for _ in range(retries + 1):
+                self.write(cmd)
+                self.settle(wait)
+                if check(self.query(query)):
+                    return True
+                wait *= 2
+        return False
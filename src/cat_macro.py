@@ -0,0 +1,217 @@
+import re
+import time
+from typing import NamedTuple
+
+WAIT_TIMEOUT = 2.0
+MAX_STEPS = 5000        # guards against a runaway repeat
+
+_VAR = re.compile(r"\$(\w+)|\$\{(\w+)(?::(\w+))?\}")       # $ch, ${ch}, ${ch:03d}
+_WAIT = re.compile(r"wait\s+([A-Z]{2}\w*)\s*(==|!=)\s*(\S+)(?:\s+within\s+([\d.]+))?$", re.I)
+# commands that change what later commands act on: VFO/memory, channel, band, mode
+_CONTEXT = {"VM", "MC", "VS", "BS", "BD", "BU", "SV", "AB", "BA", "AM", "MA", "MD"}
+# actions with no parameters: the bare code does something, it isn't a read
+_ACTIONS = {"SV", "AB", "BA", "AM", "MA"}
+# length of a read with a selector (MD0, EX031); any other read is the bare code
+_READ_LEN = {"MD": 3, "RM": 3, "SM": 3, "EX": 5, "MR": 5, "MT": 5}
+
+
+class MacroStep(NamedTuple):
+    kind: str               # "send", "wait" or "sleep"
+    data: bytes = b""       # send: commands; wait: the query
+    expect: bytes = b""     # wait: reply body to compare against
+    equal: bool = True      # wait: == or !=
+    seconds: float = 0.0    # wait: timeout; sleep: duration
+    settle: str = "CMD"     # send: settle profile key to wait after the batch
+    line: int = 0
+
+
+def _settle_kind(cmds):
+    kinds = {c[:2] for c in cmds}
+    return kinds.pop() if len(kinds) == 1 else "CMD"
+
+
+def _target(cmd):
+    """What a command reads or sets: the code plus any selector (MD0, EX031)."""
+    return cmd[:_READ_LEN.get(cmd[:2], 2)]
+
+
+def _batches(cmds):
+    """Split (line, command) pairs into runs that can go out as one write.
+
+    A run ends after a command that changes the context (VM1, MC052, MD..),
+    and before one that sets again or reads back something the run
+    already set, so those wait for the settle time of what came before.
+    """
+    batch = []
+    written = set()
+    moved = False
+    for line, cmd in cmds:
+        target = _target(cmd)
+        if batch and (moved or target in written):
+            yield batch
+            batch = []
+            written = set()
+            moved = False
+        batch.append((line, cmd))
+        if cmd == target and cmd[:2] not in _ACTIONS:
+            continue            # a read changes nothing
+        written.add(target)
+        moved = moved or cmd[:2] in _CONTEXT
+    if batch:
+        yield batch
+
+
+def _substitute(text, variables, lineno):
+    def repl(m):
+        name = m.group(1) or m.group(2)
+        if name not in variables:
+            raise ValueError(f"line {lineno}: unknown variable ${name}")
+        fmt = m.group(3)
+        return format(variables[name], fmt) if fmt else str(variables[name])
+    return _VAR.sub(repl, text)
+
+
+def _value(text, variables, lineno):
+    text = _substitute(text, variables, lineno)
+    try:
+        return int(text)
+    except ValueError:
+        return text
+
+
+def _parse_blocks(lines):
+    """Nest repeat ... end blocks: [(lineno, text) | ("repeat", lineno, count, body)]."""
+    stack = [[]]
+    for lineno, raw in enumerate(lines, 1):
+        text = raw.split("#", 1)[0].strip()
+        if not text:
+            continue
+        word = text.split()[0].lower()
+        if word == "repeat":
+            block = ("repeat", lineno, text[len(word):].strip(), [])
+            stack[-1].append(block)
+            stack.append(block[3])
+        elif word == "end":
+            if len(stack) == 1:
+                raise ValueError(f"line {lineno}: 'end' without 'repeat'")
+            stack.pop()
+        else:
+            stack[-1].append((lineno, text))
+    if len(stack) != 1:
+        raise ValueError("'repeat' without 'end'")
+    return stack[0]
+
+
+def _expand(block, variables, out):
+    for item in block:
+        if item[0] == "repeat":
+            _, lineno, count_text, body = item
+            count = _value(count_text, variables, lineno)
+            if not isinstance(count, int) or count < 0:
+                raise ValueError(f"line {lineno}: repeat needs a count, got {count_text!r}")
+            for _ in range(count):
+                _expand(body, variables, out)
+            continue
+
+        lineno, text = item
+        word, _, rest = text.partition(" ")
+        word = word.lower()
+        if word == "set":
+            name, _, expr = rest.strip().partition(" ")
+            variables[name] = _value(expr.strip(), variables, lineno)
+        elif word == "add":
+            name, _, expr = rest.strip().partition(" ")
+            if not isinstance(variables.get(name), int):
+                raise ValueError(f"line {lineno}: ${name} is not a number")
+            variables[name] += int(_value(expr.strip(), variables, lineno))
+        elif word == "sleep":
+            seconds = _substitute(rest.strip(), variables, lineno)
+            try:
+                out.append(MacroStep("sleep", seconds=float(seconds), line=lineno))
+            except ValueError:
+                raise ValueError(f"line {lineno}: sleep needs seconds, got {seconds!r}") from None
+        elif word == "wait":
+            m = _WAIT.match(_substitute(text, variables, lineno))
+            if not m:
+                raise ValueError(f"line {lineno}: expected 'wait CMD == VALUE [within SECONDS]'")
+            query, op, expect, within = m.groups()
+            query = query.upper().encode("ascii")
+            out.append(MacroStep("wait", query + b";", expect.encode("ascii"), op == "==",
+                                 float(within) if within else WAIT_TIMEOUT, line=lineno))
+        else:
+            text = _substitute(text, variables, lineno).upper()
+            cmds = [c.strip() for c in text.split(";") if c.strip()]
+            for c in cmds:
+                if not re.fullmatch(r"[A-Z]{2}[0-9A-Z+\-. ]*", c):
+                    raise ValueError(f"line {lineno}: not a CAT command: {c!r}")
+            out.append(MacroStep("send", text.encode("ascii"), line=lineno))
+        if len(out) > MAX_STEPS:
+            raise ValueError(f"macro expands to more than {MAX_STEPS} steps")
+
+
+def compile_macro(source, variables=None):
+    """Compile macro text into a flat list of steps.
+
+    Variables and repeats are resolved here, so running a macro is just
+    walking the list. Consecutive send lines are regrouped into as few
+    writes as their commands allow (see _batches); each write is
+    followed by the settle time of what it sent.
+    """
+    steps = []
+    _expand(_parse_blocks(source.splitlines()), dict(variables or {}), steps)
+
+    merged = []
+    pending = []
+    for step in steps + [None]:
+        if step is not None and step.kind == "send":
+            pending += [(step.line, c.strip()) for c in step.data.decode("ascii").split(";") if c.strip()]
+            continue
+        for batch in _batches(pending):
+            cmds = [c for _line, c in batch]
+            merged.append(MacroStep("send", b"".join(c.encode("ascii") + b";" for c in cmds),
+                                    settle=_settle_kind(cmds), line=batch[0][0]))
+        pending = []
+        if step is not None:
+            merged.append(step)
+    return merged
+
+
+def run_macro(engine, steps, report=None):
+    """Run compiled steps on the CAT engine. Raises RuntimeError when a wait times out."""
+    sent = 0
+    with engine.lock:
+        for i, step in enumerate(steps, 1):
+            if step.kind == "send":
+                engine.write(step.data)
+                # a following wait polls anyway, no need to sit out the settle time
+                if i == len(steps) or steps[i].kind != "wait":
+                    engine.settle_for(step.settle)
+                sent += step.data.count(b";")
+            elif step.kind == "sleep":
+                time.sleep(step.seconds)
+            else:
+                n = len(step.data) - 1
+                check = (lambda r, s=step, n=n: (r[n:-1] == s.expect) == s.equal)
+                if engine.wait_for(step.data, check, step.seconds) is None:
+                    op = "==" if step.equal else "!="
+                    raise RuntimeError(
+                        f"line {step.line}: {step.data[:-1].decode()} {op} "
+                        f"{step.expect.decode()} not reached in {step.seconds:g} s"
+                    )
+            if report:
+                report(int(i * 100 / len(steps)))
+    return {"steps": len(steps), "commands": sent}
+
+
+if __name__ == "__main__":
+    # python cat_macro.py: check how commands are grouped into writes
+    for source, writes in (
+        ("FA014200000; MD02; PC050;", [b"FA014200000;MD02;", b"PC050;"]),
+        ("FA014200000; FA;", [b"FA014200000;", b"FA;"]),
+        ("VM1; MC052; FA;", [b"VM1;", b"MC052;", b"FA;"]),
+        ("SV;FA014250000;MD02;", [b"SV;", b"FA014250000;MD02;"]),
+        ("EX0311; EX0320;\nAG0100; MC; FA;", [b"EX0311;EX0320;AG0100;MC;FA;"]),
+    ):
+        got = [step.data for step in compile_macro(source)]
+        print(f"{'ok ' if got == writes else 'BAD'} {source!r} -> {got}")
+
@@ -0,0 +1,157 @@
+import time
+
+# Fixed queries, built once
+Q_FA = b"FA;"
+Q_MC = b"MC;"
+Q_MD = b"MD0;"
+Q_IF = b"IF;"
+Q_ID = b"ID;"
+Q_TX = b"TX;"
+Q_RM_S = b"RM1;"
+Q_RM_PO = b"RM5;"
+VM0 = b"VM0;"
+VM1 = b"VM1;"
+
+MEM_MIN = 1
+MEM_MAX = 124
+MENU_MAX = 153
+
+SEMI = 0x3B
+_ZERO = 0x30
+_NINE = 0x39
+
+# MD0x; mode digits
+MD_CODES = {"LSB": b"1", "USB": b"2", "CW": b"3", "FM": b"4", "AM": b"5",
+            "FM-N": b"B", "AM-N": b"D", "C4FM": b"E"}
+
+_MC_SET = tuple(b"MC%03d;" % ch for ch in range(MEM_MAX + 1))
+_MT_QUERY = tuple(b"MT%03d;" % ch for ch in range(MEM_MAX + 1))
+_MR_QUERY = tuple(b"MR%03d;" % ch for ch in range(MEM_MAX + 1))
+_EX_QUERY = tuple(b"EX%03d;" % n for n in range(MENU_MAX + 1))
+_EX_HEAD = tuple(b"EX%03d" % n for n in range(MENU_MAX + 1))
+
+
+def encode_fa(hz: int) -> bytes:
+    return b"FA%011d;" % hz
+
+
+def encode_md(mode: str) -> bytes:
+    """MD0x; for a mode name in MD_CODES."""
+    return b"MD0%s;" % MD_CODES[mode]
+
+
+def encode_mc(channel: int) -> bytes:
+    return _MC_SET[channel]
+
+
+def query_mt(channel: int) -> bytes:
+    return _MT_QUERY[channel]
+
+
+def query_mr(channel: int) -> bytes:
+    return _MR_QUERY[channel]
+
+
+def query_ex(num: int) -> bytes:
+    return _EX_QUERY[num]
+
+
+def encode_ex(num: int, value) -> bytes:
+    if isinstance(value, str):
+        value = value.encode("ascii")
+    return _EX_HEAD[num] + value + b";"
+
+
+def read_reply(ser, buf: bytearray, timeout_s: float = 0.5) -> memoryview:
+    """Read one ';'-terminated reply into buf and return a view of it.
+
+    The view aliases buf, so it is only valid until the next read.
+    """
+    mv = memoryview(buf)
+    n = 0
+    size = len(buf)
+    deadline = time.monotonic() + timeout_s
+    while n < size and time.monotonic() < deadline:
+        if ser.readinto(mv[n:n + 1]):
+            n += 1
+            if buf[n - 1] == SEMI:
+                break
+    return mv[:n]
+
+
+def _is_reply(view, c0: int, c1: int) -> bool:
+    return len(view) >= 3 and view[0] == c0 and view[1] == c1 and view[-1] == SEMI
+
+
+def parse_digits(view, start: int, end: int):
+    """Integer value of the ASCII digits in view[start:end], ignoring noise."""
+    val = 0
+    seen = False
+    for b in view[start:end]:
+        if _ZERO <= b <= _NINE:
+            val = val * 10 + (b - _ZERO)
+            seen = True
+    return val if seen else None
+
+
+def parse_fixed(view, start: int, width: int):
+    """Strict fixed-width digit field, or None if any byte is not a digit."""
+    if len(view) < start + width:
+        return None
+    val = 0
+    for b in view[start:start + width]:
+        if not _ZERO <= b <= _NINE:
+            return None
+        val = val * 10 + (b - _ZERO)
+    return val
+
+
+def decode_fa(view):
+    if not _is_reply(view, 0x46, 0x41):
+        return None
+    hz = parse_digits(view, 2, len(view) - 1)
+    if hz is None:
+        return None
+    return hz % 100_000_000_000
+
+
+def decode_mc(view):
+    if not _is_reply(view, 0x4D, 0x43):
+        return None
+    return parse_fixed(view, 2, 3)
+
+
+def decode_rm(view, meter: int):
+    """Raw 0-255 reading from an RMn reply, or None."""
+    if not _is_reply(view, 0x52, 0x4D) or view[2] != _ZERO + meter:
+        return None
+    return parse_fixed(view, 3, 3)
+
+
+def decode_tx(view):
+    if not _is_reply(view, 0x54, 0x58) or len(view) < 4:
+        return None
+    if view[2] == 0x31:
+        return True
+    if view[2] == _ZERO:
+        return False
+    return None
+
+
+def raw_to_pct(raw: int) -> int:
+    return max(0, min(100, (raw * 100 + 127) // 255))
+
+
+def decode_mt_tag(view):
+    """Memory tag from an MTnnn reply, or None if blank."""
+    if not _is_reply(view, 0x4D, 0x54):
+        return None
+    body = bytes(view[5:-1])
+    if len(body) >= 35:
+        # full answer: 23-char memory block, then the 12-char tag
+        body = body[-12:]
+    tag = bytes(b for b in body if 32 <= b < 127).decode("ascii").strip()
+    tag = tag[:12].rstrip()
+    if not tag or tag == "---":
+        return None
+    return tag
@@ -0,0 +1,42 @@
+import threading
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class CatWorker(QObject):
+    """Runs one blocking CAT job off the GUI thread.
+
+    The job is called as job(report, *args); report(pct, text) may be
+    called from the worker and arrives on the GUI thread as signals.
+    """
+
+    progress = pyqtSignal(int)
+    message = pyqtSignal(str)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, job, *args):
+        if self.is_running():
+            return False
+        self._thread = threading.Thread(target=self._run, args=(job, args), daemon=True)
+        self._thread.start()
+        return True
+
+    def _report(self, pct=None, text=None):
+        if pct is not None:
+            self.progress.emit(int(pct))
+        if text:
+            self.message.emit(text)
+
+    def _run(self, job, args):
+        try:
+            self.finished.emit(job(self._report, *args))
+        except Exception as e:
+            self.failed.emit(str(e))
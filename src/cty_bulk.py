@@ -0,0 +1,209 @@
+import time
+from datetime import datetime
+
+import numpy as np
+
+from cty_db import prefix_candidate
+from cty_index import CALL_LEN, CtyIndex
+
+# one resolved QSO; adif 0 means no entity (invalid operation, /MM, unknown prefix)
+DXCC_DTYPE = np.dtype([("adif", "<u2"), ("cqz", "u1"), ("cont", "S2"),
+                       ("lat", "<f4"), ("lon", "<f4")])
+# matches cty_index._ROW
+_ROW_DTYPE = np.dtype([("record", "<u4"), ("call", f"S{CALL_LEN}"), ("adif", "<u2"),
+                       ("cqz", "u1"), ("cont", "S2"), ("lat", "<f4"), ("lon", "<f4")])
+_KEY = f"S{CALL_LEN}"
+# per-QSO log check: invalid operation, the zone cty expects, and whether the logged one agrees
+CHECK_DTYPE = np.dtype([("invalid", "?"), ("cqz", "u1"), ("zone_ok", "?")])
+
+
+class _Table:
+    """One section as rows sorted by (call, start), plus where each call's run begins."""
+
+    def __init__(self, rows, starts, ends):
+        order = np.lexsort((starts, rows["call"]))
+        self.rows = rows[order]
+        self.starts = starts[order]
+        self.ends = ends[order]
+        self.keys, self.first, self.count = np.unique(
+            self.rows["call"], return_index=True, return_counts=True)
+        # running max of end within each call's run, as in cty_db.DatedRecords
+        self.max_ends = self.ends.copy()
+        for j in range(1, int(self.count.max(initial=1))):
+            run = self.first[self.count > j] + j
+            self.max_ends[run] = np.maximum(self.max_ends[run], self.max_ends[run - 1])
+
+    def match(self, keys, ts):
+        """Row index valid at ts for every key, -1 where there is none.
+
+        A vectorized bisect over each key's run finds the last record
+        starting at or before ts; the walk back from there only goes on
+        while an earlier range could still be open.
+        """
+        out = np.full(len(keys), -1, dtype=np.int64)
+        if not len(self.keys):
+            return out
+        pos = np.searchsorted(self.keys, keys).clip(0, len(self.keys) - 1)
+        live = np.flatnonzero(self.keys[pos] == keys)
+        lo = self.first[pos[live]]
+        hi = lo + self.count[pos[live]]
+        t = ts[live]
+        base = lo.copy()
+        while True:
+            open_ = lo < hi
+            if not open_.any():
+                break
+            mid = (lo + hi) // 2
+            right = open_ & (self.starts[np.minimum(mid, len(self.starts) - 1)] <= t)
+            lo = np.where(right, mid + 1, lo)
+            hi = np.where(open_ & ~right, mid, hi)
+        i = lo - 1
+        while len(live):
+            walk = (i >= base) & (self.max_ends[np.maximum(i, 0)] >= t)
+            found = walk & (self.ends[np.maximum(i, 0)] >= t)
+            out[live[found]] = i[found]
+            more = walk & ~found
+            live, i, base, t = live[more], i[more] - 1, base[more], t[more]
+        return out
+
+
+def _index_table(index, section):
+    rows, starts, ends = index.raw(section)
+    table = _Table(np.frombuffer(rows, dtype=_ROW_DTYPE),
+                   np.frombuffer(starts, dtype=np.int64), np.frombuffer(ends, dtype=np.int64))
+    rows.release()
+    return table
+
+
+def _resolver_table(resolver, section):
+    if section == "prefixes":
+        sec = {}
+        for recs in _walk_trie(resolver._trie):
+            for r in recs:
+                sec.setdefault(r.call, []).append(r)
+    else:
+        sec = getattr(resolver, section)
+    recs = [r for rs in sec.values() for r in rs]
+    rows = np.array([(r.record, r.call.encode("ascii", "replace"), r.adif, r.cqz,
+                      r.cont.encode("ascii"), r.lat, r.lon) for r in recs], dtype=_ROW_DTYPE)
+    return _Table(rows, np.array([r.start for r in recs], dtype=np.int64),
+                  np.array([r.end for r in recs], dtype=np.int64))
+
+
+def _walk_trie(node):
+    for ch, child in node.items():
+        if ch is None:
+            yield child
+        else:
+            yield from _walk_trie(child)
+
+
+def timestamps(when, n):
+    """int64 epoch seconds for n QSOs from None, one time or an array of times."""
+    if when is None:
+        return np.full(n, int(time.time()), dtype=np.int64)
+    if isinstance(when, datetime):
+        return np.full(n, int(when.timestamp()), dtype=np.int64)
+    arr = np.asarray(when)
+    if arr.dtype.kind == "M":
+        arr = arr.astype("datetime64[s]").astype(np.int64)
+    elif arr.dtype.kind == "O":
+        arr = np.array([w.timestamp() for w in arr.ravel()]).reshape(arr.shape)
+    return np.broadcast_to(arr.astype(np.int64), (n,))
+
+
+class BulkResolver:
+    """Resolve whole logs or spot bursts against a CtyResolver or CtyIndex.
+
+    Every section becomes a sorted NumPy table once; a batch is then a
+    handful of searchsorted calls. Python only touches the unique calls
+    that carry a '/', which are rare in any log.
+    """
+
+    def __init__(self, resolver):
+        self.version = resolver.version
+        table = _index_table if isinstance(resolver, CtyIndex) else _resolver_table
+        self.prefixes = table(resolver, "prefixes")
+        self.exceptions = table(resolver, "exceptions")
+        self.invalid = table(resolver, "invalid")
+        self.zones = table(resolver, "zones")
+        self._max_prefix = int(np.char.str_len(self.prefixes.keys).max(initial=0))
+
+    def _candidates(self, calls, encoded):
+        """Prefix-search keys for unique calls; b"" where the call has no entity."""
+        keys = encoded.astype(_KEY)
+        for i in np.flatnonzero(np.char.find(calls, "/") >= 0):
+            text = prefix_candidate(str(calls[i]))
+            keys[i] = text.encode("ascii", "replace") if text else b""
+        return keys
+
+    def _longest_prefix(self, keys, ts):
+        found = np.full(len(keys), -1, dtype=np.int64)
+        lengths = np.char.str_len(keys)
+        raw = keys.view(np.uint8).reshape(len(keys), CALL_LEN)
+        for n in range(self._max_prefix, 0, -1):
+            todo = np.flatnonzero((found < 0) & (lengths >= n))
+            if not len(todo):
+                continue
+            cut = raw[todo].copy()
+            cut[:, n:] = 0
+            hit = self.prefixes.match(cut.view(_KEY).ravel(), ts[todo])
+            found[todo[hit >= 0]] = hit[hit >= 0]
+        return found
+
+    def resolve(self, calls, when=None):
+        """DXCC_DTYPE array with one row per call.
+
+        when is None (now), one datetime/epoch for the whole batch, or an
+        array of QSO times (epoch seconds, datetime64 or datetimes).
+        """
+        return self._resolve(calls, when)[0]
+
+    def check_log(self, calls, when=None, zones=None):
+        """CHECK_DTYPE array flagging invalid operations and wrong CQ zones.
+
+        zones are the zones as logged; zone_ok is True where none was
+        given or cty has no entity to check against.
+        """
+        out, invalid = self._resolve(calls, when)
+        check = np.zeros(len(out), dtype=CHECK_DTYPE)
+        check["invalid"] = invalid
+        check["cqz"] = out["cqz"]
+        check["zone_ok"] = True
+        if zones is not None:
+            zones = np.asarray(zones, dtype=np.int64)
+            known = (out["adif"] > 0) & (zones > 0)
+            check["zone_ok"][known] = zones[known] == out["cqz"][known]
+        return check
+
+    def _resolve(self, calls, when):
+        calls = np.char.upper(np.char.strip(np.asarray(calls, dtype=str)))
+        n = len(calls)
+        ts = timestamps(when, n)
+        out = np.zeros(n, dtype=DXCC_DTYPE)
+        if not n:
+            return out, np.zeros(0, dtype=bool)
+
+        uniq, inv = np.unique(calls, return_inverse=True)
+        encoded = np.char.encode(uniq, "ascii", "replace")
+        prefix_keys = self._candidates(uniq, encoded)[inv]
+        encoded[np.char.str_len(uniq) > CALL_LEN] = b""
+        keys = encoded[inv]
+
+        exc = self.exceptions.match(keys, ts)
+        pre = np.full(n, -1, dtype=np.int64)
+        need = np.flatnonzero((exc < 0) & (prefix_keys != b""))
+        pre[need] = self._longest_prefix(prefix_keys[need], ts[need])
+
+        for table, rows in ((self.exceptions, exc), (self.prefixes, pre)):
+            hit = np.flatnonzero(rows >= 0)
+            src = table.rows[rows[hit]]
+            for field in DXCC_DTYPE.names:
+                out[field][hit] = src[field]
+
+        zone = self.zones.match(keys, ts)
+        hit = np.flatnonzero((zone >= 0) & (out["adif"] > 0))
+        out["cqz"][hit] = self.zones.rows["cqz"][zone[hit]]
+        invalid = self.invalid.match(keys, ts) >= 0
+        out[invalid | (out["adif"] == 0)] = np.zeros(1, DXCC_DTYPE)
+        return out, invalid
@@ -0,0 +1,351 @@
+import gzip
+import re
+import time
+import xml.etree.ElementTree as ET
+from bisect import bisect_right
+from datetime import datetime
+from typing import NamedTuple
+
+# open-ended date ranges; both fit an int64
+NO_START = -(1 << 62)
+NO_END = 1 << 62
+
+# portable suffixes that never change the entity
+_DROP_SUFFIXES = {"P", "M", "QRP", "QRPP", "A", "B", "LH", "J", "R", "T", "X"}
+# maritime/aeronautical mobile: no DXCC entity at all
+_NO_ENTITY_SUFFIXES = {"MM", "AM"}
+_CALL_AREA = re.compile(r"^(\d?[A-Z]+)\d")
+# a whole call: letters after the call-area digit (W1A, VP2E), not a bare prefix (KP4)
+_WHOLE_CALL = re.compile(r"^(\d?[A-Z]+\d+)[A-Z]+$")
+# one top-level record of a cty.xml, found without parsing it
+_BLOCK = re.compile(rb"<(exception|prefix|invalid|zone_exception) record=['\"](\d+)['\"]>.*?</\1>"
+                    rb"|<entity>\s*<adif>(\d+)</adif>.*?</entity>", re.S)
+_VERSION = re.compile(rb"<clublog\b[^>]*?\sdate=['\"]([^'\"]*)['\"]")
+
+
+class CtyRecord(NamedTuple):
+    record: int
+    call: str
+    adif: int = 0
+    entity: str = ""
+    cqz: int = 0            # zone_exceptions: the zone
+    cont: str = ""
+    lon: float = 0.0
+    lat: float = 0.0
+    start: int = NO_START   # epoch seconds, inclusive
+    end: int = NO_END
+
+
+class DatedRecords:
+    """One call's records sorted by start date, searched with bisect.
+
+    max_ends[i] is the latest end among records 0..i, so the backwards
+    walk from the last record starting before ts stops as soon as no
+    earlier range can still be open: O(log k) unless ranges overlap.
+    """
+
+    __slots__ = ("recs", "starts", "max_ends")
+
+    def __init__(self, recs):
+        self.recs = sorted(recs, key=lambda r: r.start)
+        self.starts = [r.start for r in self.recs]
+        self.max_ends = []
+        top = NO_START
+        for r in self.recs:
+            top = max(top, r.end)
+            self.max_ends.append(top)
+
+    def __iter__(self):
+        return iter(self.recs)
+
+    def __len__(self):
+        return len(self.recs)
+
+    def at(self, ts):
+        """The latest-starting record covering ts, or None."""
+        i = bisect_right(self.starts, ts) - 1
+        while i >= 0 and self.max_ends[i] >= ts:
+            if self.recs[i].end >= ts:
+                return self.recs[i]
+            i -= 1
+        return None
+
+
+class DxccInfo(NamedTuple):
+    call: str
+    adif: int
+    entity: str
+    cqz: int
+    cont: str
+    lat: float
+    lon: float
+
+
+def parse_date(text):
+    return int(datetime.fromisoformat(text).timestamp())
+
+
+def timestamp(when=None):
+    """Epoch seconds from None (now), a datetime or a number."""
+    if when is None:
+        return int(time.time())
+    if isinstance(when, datetime):
+        return int(when.timestamp())
+    return int(when)
+
+
+def _record(elem):
+    def text(tag, default=""):
+        value = elem.findtext(tag)
+        return value.strip() if value else default
+
+    start = text("start")
+    end = text("end")
+    return CtyRecord(
+        int(elem.get("record", 0)),
+        text("call").upper(),
+        int(text("adif", "0")),
+        text("entity"),
+        int(text("cqz") or text("zone") or 0),
+        text("cont"),
+        float(text("long", "0")),
+        float(text("lat", "0")),
+        parse_date(start) if start else NO_START,
+        parse_date(end) if end else NO_END,
+    )
+
+
+def _entity(elem):
+    """CtyRecord for an <entities> entry; call holds its main prefix."""
+    end = elem.findtext("end")
+    return CtyRecord(
+        0,
+        (elem.findtext("prefix") or "").strip(),
+        int(elem.findtext("adif")),
+        (elem.findtext("name") or "").strip(),
+        int(elem.findtext("cqz") or 0),
+        (elem.findtext("cont") or "").strip(),
+        float(elem.findtext("long") or 0),
+        float(elem.findtext("lat") or 0),
+        end=parse_date(end.strip()) if end else NO_END,
+    )
+
+
+class CtyData:
+    """The sections of a ClubLog cty.xml, each as call -> list of CtyRecord."""
+
+    SECTIONS = {
+        "exception": "exceptions",
+        "prefix": "prefixes",
+        "invalid": "invalid",
+        "zone_exception": "zones",
+    }
+
+    def __init__(self):
+        self.version = ""
+        self.entities = {}      # adif -> CtyRecord (call holds the entity's main prefix)
+        self.exceptions = {}
+        self.prefixes = {}
+        self.invalid = {}
+        self.zones = {}
+
+    def add(self, kind, rec):
+        getattr(self, self.SECTIONS[kind]).setdefault(rec.call, []).append(rec)
+
+
+def iter_cty(path):
+    """Stream a cty.xml (plain or gzipped): ("version", date) first, then
+    ("entity" | "exception" | "prefix" | "invalid" | "zone_exception", CtyRecord).
+
+    Elements are cleared as they are read, so no tree is ever built.
+    """
+    with open(path, "rb") as f:
+        gzipped = f.read(2) == b"\x1f\x8b"
+    opener = gzip.open if gzipped else open
+    depth = 0
+    with opener(path, "rb") as f:
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            if event == "start":
+                if elem.tag == "clublog":
+                    yield "version", elem.get("date", "")
+                depth += 1
+                continue
+            depth -= 1
+            # clublog > section > record; <entity> and <prefix> also occur as fields
+            if depth != 2:
+                continue
+            if elem.tag == "entity":
+                yield "entity", _entity(elem)
+            elif elem.tag in CtyData.SECTIONS:
+                yield elem.tag, _record(elem)
+            elem.clear()
+
+
+def _read_cty(path):
+    with open(path, "rb") as f:
+        gzipped = f.read(2) == b"\x1f\x8b"
+    with (gzip.open if gzipped else open)(path, "rb") as f:
+        return f.read()
+
+
+def cty_blocks(path):
+    """(version, {(kind, id): bytes}) for every record of a cty.xml, unparsed.
+
+    kind is as in iter_cty and id the record= number, or the ADIF number
+    for entities. Much cheaper than iter_cty, so two releases can be
+    compared and only the records that differ parsed with block_record().
+    """
+    text = _read_cty(path)
+    m = _VERSION.search(text, 0, 4096)
+    blocks = {}
+    for b in _BLOCK.finditer(text):
+        if b.group(1):
+            blocks[b.group(1).decode("ascii"), int(b.group(2))] = b.group(0)
+        else:
+            blocks["entity", int(b.group(3))] = b.group(0)
+    return (m.group(1).decode("ascii") if m else ""), blocks
+
+
+def block_record(kind, block):
+    """CtyRecord of one block from cty_blocks()."""
+    elem = ET.fromstring(block)
+    return _entity(elem) if kind == "entity" else _record(elem)
+
+
+def load_cty(path):
+    """All of a cty.xml (plain or gzipped) as a CtyData."""
+    data = CtyData()
+    for kind, rec in iter_cty(path):
+        if kind == "version":
+            data.version = rec
+        elif kind == "entity":
+            data.entities[rec.adif] = rec
+        else:
+            data.add(kind, rec)
+    return data
+
+
+def _call_letters(part):
+    """Letters after the call-area digit of a whole call; 0 for a bare prefix like KP4."""
+    m = _WHOLE_CALL.match(part)
+    return len(part) - m.end(1) if m else 0
+
+
+def prefix_candidate(call):
+    """The part of a call that decides its prefix, or None for /MM and /AM.
+
+    'G4ABC/P' -> 'G4ABC', 'F/G4ABC' -> 'F', 'W1ABC/4' -> 'W4'. Between
+    parts of the same length the one that isn't a whole call wins
+    ('W1A/KP4' -> 'KP4'), then the one with fewer letters after its digit
+    ('VP2E/K1AB' -> 'VP2E'), then the one after the '/'.
+    """
+    parts = [p for p in call.upper().split("/") if p]
+    if not parts:
+        return None
+    if len(parts) > 1 and parts[-1] in _NO_ENTITY_SUFFIXES:
+        return None
+    while len(parts) > 1 and parts[-1] in _DROP_SUFFIXES:
+        parts.pop()
+    if len(parts) == 1:
+        return parts[0]
+    base, other = max(parts, key=len), min(parts, key=len)
+    if len(base) == len(other):
+        i = min(range(len(parts)), key=lambda i: (_call_letters(parts[i]), -i))
+        other, base = parts[i], parts[i - 1]
+    if other.isdigit() and len(other) == 1:
+        m = _CALL_AREA.match(base)
+        return m.group(1) + other if m else base
+    return other
+
+
+class CtyResolver:
+    """Callsign + date -> DXCC entity, zone, continent and position.
+
+    Exact calls come from a dict of exceptions; everything else from the
+    longest prefix in a character trie whose record is valid on the date.
+    Both are checked against the record date ranges, so a call that was
+    a DXpedition in 2019 resolves differently from the same call today.
+    """
+
+    def __init__(self, data):
+        self.version = data.version
+        self.entities = data.entities
+        self.exceptions = {call: DatedRecords(recs) for call, recs in data.exceptions.items()}
+        self.invalid = {call: DatedRecords(recs) for call, recs in data.invalid.items()}
+        self.zones = {call: DatedRecords(recs) for call, recs in data.zones.items()}
+        self._trie = {}
+        for prefix, recs in data.prefixes.items():
+            node = self._trie
+            for ch in prefix:
+                node = node.setdefault(ch, {})
+            node[None] = DatedRecords(recs)
+
+    @classmethod
+    def load(cls, path):
+        return cls(load_cty(path))
+
+    def find(self, section, call, ts):
+        """The record for call in "exceptions", "invalid" or "zones" valid at ts."""
+        recs = getattr(self, section).get(call)
+        return recs.at(ts) if recs is not None else None
+
+    def entity_name(self, adif):
+        ent = self.entities.get(adif)
+        return ent.entity if ent else ""
+
+    def longest_prefix(self, text, ts):
+        node = self._trie
+        found = None
+        for ch in text:
+            node = node.get(ch)
+            if node is None:
+                break
+            recs = node.get(None)
+            rec = recs.at(ts) if recs is not None else None
+            if rec is not None:
+                found = rec
+        return found
+
+    def exception_calls(self):
+        return self.exceptions.keys()
+
+    def is_invalid(self, call, when=None):
+        return self.find("invalid", call.strip().upper(), timestamp(when)) is not None
+
+    def zone(self, call, ts):
+        rec = self.find("zones", call, ts)
+        return rec.cqz if rec is not None else None
+
+    def resolve(self, call, when=None):
+        """DxccInfo for call on the given date, or None.
+
+        None means no entity: an invalid operation, /MM or /AM, or a
+        call no prefix matches.
+        """
+        call = call.strip().upper()
+        ts = timestamp(when)
+        if self.find("invalid", call, ts) is not None:
+            return None
+        rec = self.find("exceptions", call, ts)
+        if rec is None:
+            text = prefix_candidate(call)
+            if text is None:
+                return None
+            rec = self.longest_prefix(text, ts)
+            if rec is None:
+                return None
+        if rec.adif == 0:
+            return None
+        cqz = self.zone(call, ts)
+        return DxccInfo(call, rec.adif, self.entity_name(rec.adif) or rec.entity,
+                        rec.cqz if cqz is None else cqz, rec.cont, rec.lat, rec.lon)
+
+
+if __name__ == "__main__":
+    # python cty_db.py: check which part of a portable call decides its prefix
+    for call, want in (("G4ABC/P", "G4ABC"), ("F/G4ABC", "F"), ("W1ABC/4", "W4"),
+                       ("K1AB/VP2E", "VP2E"), ("VP2E/K1AB", "VP2E"), ("W1A/KP4", "KP4"),
+                       ("KP4/W1A", "KP4"), ("DL1ABC/MM", None)):
+        got = prefix_candidate(call)
+        print(f"{'ok ' if got == want else 'BAD'} {call} -> {got}")
+
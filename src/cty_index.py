@@ -0,0 +1,500 @@
+import mmap
+import os
+import struct
+import sys
+import zlib
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import NamedTuple
+
+from cty_db import NO_START, CtyData, CtyRecord, CtyResolver, load_cty
+
+INDEX_SUFFIX = ".idx"
+_MAGIC = b"CTY3"
+CALL_LEN = 16           # longest call in cty.xml is 16 chars
+
+# magic, source mtime_ns, source size, cty.xml date= attribute
+_HEADER = struct.Struct("<4sqq32s")
+# rows, starts, ends, max_ends and buckets offsets, count, bucket count
+_SECTION = struct.Struct("<QQQQQII")
+# record id, call (NUL padded), adif, cqz, continent, lat, lon
+_ROW = struct.Struct(f"<I{CALL_LEN}sHB2sff")
+
+# entities: one row per ADIF number; prefixes: sorted by (call, start);
+# exceptions/invalid/zones: hash buckets of crc32(call), each sorted by (call, start);
+# names: entity names, rows offset is the text blob, buckets the string offsets.
+# added_*: rows patch_index added since the last compile, sorted by (call, start)
+# like prefixes and kept at the end of the file so only they move on an update.
+# max_ends[i] is the latest end in row i's call run up to i (see cty_db.DatedRecords).
+SECTION_NAMES = ("entities", "prefixes", "exceptions", "invalid", "zones", "names",
+                 "added_prefixes", "added_exceptions", "added_invalid", "added_zones")
+_HASHED = ("exceptions", "invalid", "zones")
+ADDED = {name: "added_" + name for name in ("prefixes", "exceptions", "invalid", "zones")}
+# end of a removed row: it stays where it is but covers no date
+REMOVED = NO_START
+
+
+def index_path(path):
+    path = Path(path)
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def _key(call):
+    return call.encode("ascii", "replace")[:CALL_LEN].ljust(CALL_LEN, b"\0")
+
+
+def _bucket(key, nbuckets):
+    return zlib.crc32(key.rstrip(b"\0")) & (nbuckets - 1)
+
+
+def pack_row(rec):
+    return _ROW.pack(rec.record, _key(rec.call), rec.adif, rec.cqz,
+                     rec.cont.encode("ascii")[:2], rec.lat, rec.lon)
+
+
+def _unpack_row(buf, offset, start, end, exact=False):
+    record, call, adif, cqz, cont, lat, lon = _ROW.unpack_from(buf, offset)
+    if not exact:
+        lat, lon = round(lat, 4), round(lon, 4)
+    return CtyRecord(record, call.rstrip(b"\0").decode("ascii"), adif, "", cqz,
+                     cont.rstrip(b"\0").decode("ascii"), lon, lat, start, end)
+
+
+def _max_ends(calls, ends):
+    out = []
+    prev = None
+    top = NO_START
+    for call, end in zip(calls, ends):
+        top = max(top, end) if call == prev else end
+        out.append(top)
+        prev = call
+    return out
+
+
+def _pack_rows(recs, runs=True):
+    rows = b"".join(pack_row(r) for r in recs)
+    ends = [r.end for r in recs]
+    max_ends = _max_ends([r.call for r in recs], ends) if runs else ends
+    return (rows, struct.pack(f"<{len(recs)}q", *(r.start for r in recs)),
+            struct.pack(f"<{len(recs)}q", *ends), struct.pack(f"<{len(recs)}q", *max_ends))
+
+
+def _added_parts(recs):
+    recs = sorted(recs, key=lambda r: (_key(r.call), r.start))
+    return _pack_rows(recs) + (b"", len(recs), 0)
+
+
+def _section_parts(name, data):
+    """(rows, starts, ends, max_ends, buckets, count, nbuckets) byte blocks for one section."""
+    if name in ADDED.values():
+        return _added_parts([])
+    if name == "entities":
+        top = max(data.entities, default=0)
+        recs = [data.entities.get(a) or CtyRecord(0, "", a) for a in range(top + 1)]
+        return _pack_rows(recs, runs=False) + (b"", len(recs), 0)
+    if name == "names":
+        blobs = [data.entities[a].entity.encode("utf-8") if a in data.entities else b""
+                 for a in range(max(data.entities, default=0) + 1)]
+        offsets = [0]
+        for b in blobs:
+            offsets.append(offsets[-1] + len(b))
+        return (b"".join(blobs), b"", b"", b"",
+                struct.pack(f"<{len(offsets)}I", *offsets), len(blobs), 0)
+
+    section = getattr(data, name)
+    for call in section:
+        if len(call.encode("ascii", "replace")) > CALL_LEN:
+            raise ValueError(f"{name}: call {call!r} longer than {CALL_LEN}")
+    if name == "prefixes":
+        recs = [r for call in sorted(section, key=_key) for r in sorted(section[call], key=lambda r: r.start)]
+        return _pack_rows(recs) + (b"", len(recs), 0)
+
+    nbuckets = 1
+    while nbuckets < len(section):
+        nbuckets <<= 1
+    by_bucket = [[] for _ in range(nbuckets)]
+    for call, recs in section.items():
+        by_bucket[_bucket(_key(call), nbuckets)].extend(recs)
+    recs = [r for b in by_bucket for r in sorted(b, key=lambda r: (_key(r.call), r.start))]
+    offsets = [0]
+    for b in by_bucket:
+        offsets.append(offsets[-1] + len(b))
+    return _pack_rows(recs) + (struct.pack(f"<{len(offsets)}I", *offsets), len(recs), nbuckets)
+
+
+def _layout(pos, sections):
+    """Directory entries and padded blocks for sections placed from file offset pos."""
+    directory = []
+    blocks = []
+    for *parts, count, nbuckets in sections:
+        offsets = []
+        for block in parts:
+            pad = -pos % 8          # keep the int64/uint32 arrays aligned
+            blocks.append(b"\0" * pad + block)
+            pos += pad
+            offsets.append(pos)
+            pos += len(block)
+        directory.append(_SECTION.pack(*offsets, count, nbuckets))
+    return directory, blocks
+
+
+def write_index(data, path, src_mtime_ns=0, src_size=0):
+    """Compile CtyData into the binary index at path.
+
+    Written to a temp file and renamed over the old one, so a process
+    that still has the old index mapped keeps reading a complete file.
+    """
+    header = _HEADER.pack(_MAGIC, src_mtime_ns, src_size, data.version.encode("ascii")[:32])
+    directory, blocks = _layout(_HEADER.size + _SECTION.size * len(SECTION_NAMES),
+                                [_section_parts(name, data) for name in SECTION_NAMES])
+
+    tmp = Path(str(path) + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(b"".join(directory))
+        for block in blocks:
+            f.write(block)
+    os.replace(tmp, path)
+
+
+def _fix_run(buf, section, i):
+    """Recompute max_ends over the call run holding row i."""
+    row_off, _starts, ends, max_ends, _buckets, count, _nb = section
+
+    def call(j):
+        pos = row_off + j * _ROW.size + 4
+        return bytes(buf[pos:pos + CALL_LEN])
+
+    key = call(i)
+    lo, hi = i, i + 1
+    while lo > 0 and call(lo - 1) == key:
+        lo -= 1
+    while hi < count and call(hi) == key:
+        hi += 1
+    top = NO_START
+    for j in range(lo, hi):
+        top = max(top, struct.unpack_from("<q", buf, ends + 8 * j)[0])
+        struct.pack_into("<q", buf, max_ends + 8 * j, top)
+
+
+def patch_index(path, rows, version, src_mtime_ns=0, src_size=0, removed=(), added=()):
+    """Apply a diff to an index in place of a full compile.
+
+    rows is a list of (section, row number, CtyRecord) rewritten where
+    they sit; the call and start of each row must not change, since those
+    decide where it sits. removed lists (section, row number) to retire,
+    added (section, CtyRecord) for that section's added_* overflow. Only
+    the overflow blocks at the end of the file are laid out again.
+    Patched on a copy and renamed into place, like write_index.
+    """
+    buf = bytearray(Path(path).read_bytes())
+    magic, _mtime, _size, _version = _HEADER.unpack_from(buf, 0)
+    if magic != _MAGIC:
+        raise ValueError(f"{path}: not a cty index")
+    _HEADER.pack_into(buf, 0, _MAGIC, src_mtime_ns, src_size, version.encode("ascii")[:32])
+    offsets = {name: _SECTION.unpack_from(buf, _HEADER.size + i * _SECTION.size)
+               for i, name in enumerate(SECTION_NAMES)}
+    overflow = {}
+    for name in ADDED.values():
+        row_off, starts, ends, _top, _buckets, count, _nb = offsets[name]
+        overflow[name] = {i: _unpack_row(buf, row_off + i * _ROW.size,
+                                         struct.unpack_from("<q", buf, starts + 8 * i)[0],
+                                         struct.unpack_from("<q", buf, ends + 8 * i)[0], exact=True)
+                          for i in range(count)}
+
+    def check(section, i):
+        if not 0 <= i < offsets[section][5]:
+            raise IndexError(f"{section} row {i} out of range")
+
+    touched = set()
+    for section, i, rec in rows:
+        check(section, i)
+        if section in overflow:
+            overflow[section][i] = rec
+            continue
+        row_off, starts, ends, _top, _buckets, _count, _nb = offsets[section]
+        buf[row_off + i * _ROW.size:row_off + (i + 1) * _ROW.size] = pack_row(rec)
+        struct.pack_into("<q", buf, starts + 8 * i, rec.start)
+        struct.pack_into("<q", buf, ends + 8 * i, rec.end)
+        touched.add((section, i))
+    for section, i in removed:
+        check(section, i)
+        if section in overflow:
+            del overflow[section][i]
+            continue
+        struct.pack_into("<q", buf, offsets[section][2] + 8 * i, REMOVED)
+        touched.add((section, i))
+    # a changed end can move the running maximum of the rest of its run
+    for section, i in touched:
+        if section != "entities":
+            _fix_run(buf, offsets[section], i)
+
+    new = {name: list(recs.values()) for name, recs in overflow.items()}
+    for section, rec in added:
+        new[ADDED[section]].append(rec)
+    first = offsets[SECTION_NAMES[-len(ADDED)]][0]
+    del buf[first:]
+    directory, blocks = _layout(first, [_added_parts(new[name]) for name in SECTION_NAMES[-len(ADDED):]])
+    pos = _HEADER.size + _SECTION.size * (len(SECTION_NAMES) - len(ADDED))
+    buf[pos:pos + len(b"".join(directory))] = b"".join(directory)
+    buf += b"".join(blocks)
+
+    tmp = Path(str(path) + ".tmp")
+    tmp.write_bytes(buf)
+    os.replace(tmp, path)
+
+
+class _Keys:
+    """The call column of a section, as a sequence bisect can search."""
+
+    def __init__(self, mm, offset, count):
+        self.mm = mm
+        self.offset = offset + 4
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        pos = self.offset + i * _ROW.size
+        return self.mm[pos:pos + CALL_LEN]
+
+
+class _Section(NamedTuple):
+    rows: int               # file offset of the first row
+    count: int
+    nbuckets: int
+    keys: _Keys
+    starts: memoryview
+    ends: memoryview
+    max_ends: memoryview
+    buckets: memoryview
+
+
+class CtyIndex(CtyResolver):
+    """CtyResolver over a compiled index file, queried in place through mmap.
+
+    Nothing is deserialized at open: rows are unpacked only when a
+    lookup hits them, and the pages are shared by every process that
+    maps the same file.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.src_mtime_ns, self.src_size, version = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path}: not a cty index")
+        self.version = version.rstrip(b"\0").decode("ascii")
+        self._view = memoryview(self._mm)
+        self._sections = {}
+        for i, name in enumerate(SECTION_NAMES):
+            rows, starts, ends, max_ends, buckets, count, nbuckets = _SECTION.unpack_from(
+                self._mm, _HEADER.size + i * _SECTION.size)
+            n = 0 if name == "names" else count
+            nb = (nbuckets or count) + 1 if name in _HASHED or name == "names" else 0
+            self._sections[name] = _Section(
+                rows, count, nbuckets, _Keys(self._mm, rows, n),
+                self._view[starts:starts + 8 * n].cast("q"),
+                self._view[ends:ends + 8 * n].cast("q"),
+                self._view[max_ends:max_ends + 8 * n].cast("q"),
+                self._view[buckets:buckets + 4 * nb].cast("I"),
+            )
+        # the one column searched on every lookup; 4k short keys, copied once
+        self._prefix_keys = list(self._sections["prefixes"].keys)
+        self._added_keys = list(self._sections["added_prefixes"].keys)
+        self._max_prefix = max((len(k.rstrip(b"\0")) for k in self._prefix_keys + self._added_keys),
+                               default=0)
+
+    def close(self):
+        for sec in self._sections.values():
+            for view in (sec.starts, sec.ends, sec.max_ends, sec.buckets):
+                view.release()
+        self._view.release()
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def raw(self, section):
+        """(rows, starts, ends) buffers of a section and its added rows, for bulk readers.
+
+        Removed rows are still there, with an end of REMOVED that matches no date.
+        """
+        sec = self._sections[section]
+        rows = self._view[sec.rows:sec.rows + sec.count * _ROW.size]
+        more = self._sections.get(ADDED.get(section))
+        if more is None or not more.count:
+            return rows, sec.starts, sec.ends
+        extra = self._view[more.rows:more.rows + more.count * _ROW.size]
+        joined = (memoryview(bytes(rows) + bytes(extra)),
+                  memoryview(sec.starts.tobytes() + more.starts.tobytes()).cast("q"),
+                  memoryview(sec.ends.tobytes() + more.ends.tobytes()).cast("q"))
+        rows.release()
+        extra.release()
+        return joined
+
+    def row(self, section, i):
+        """Packed bytes of one row, to compare against pack_row()."""
+        rows = self._sections[section].rows
+        return self._mm[rows + i * _ROW.size:rows + (i + 1) * _ROW.size]
+
+    def records(self, section):
+        """(row number, CtyRecord) for every live row of a section, in file order.
+
+        lat/lon are the stored float32 values, so they pack back unchanged.
+        """
+        sec = self._sections[section]
+        for i in range(sec.count):
+            if sec.ends[i] != REMOVED:
+                yield i, self._record(section, i, exact=True)
+
+    def added_count(self):
+        """Rows added since the last full compile."""
+        return sum(self._sections[name].count for name in ADDED.values())
+
+    def locate(self, section, rec):
+        """(section or its added_* overflow, row number) of the live row for
+        rec's record id and call, or None."""
+        key = _key(rec.call)
+        for name in (section, ADDED[section]):
+            sec = self._sections[name]
+            lo, hi = 0, sec.count
+            if name in _HASHED:
+                h = _bucket(key, sec.nbuckets)
+                lo, hi = sec.buckets[h], sec.buckets[h + 1]
+            i = bisect_left(sec.keys, key, lo, hi)
+            while i < hi and sec.keys[i] == key:
+                if (sec.ends[i] != REMOVED
+                        and struct.unpack_from("<I", self._mm, sec.rows + i * _ROW.size)[0] == rec.record):
+                    return name, i
+                i += 1
+        return None
+
+    def exception_calls(self):
+        calls = set()
+        for name in ("exceptions", ADDED["exceptions"]):
+            sec = self._sections[name]
+            calls.update(sec.keys[i].rstrip(b"\0").decode("ascii")
+                         for i in range(sec.count) if sec.ends[i] != REMOVED)
+        return calls
+
+    def to_data(self):
+        """The index back as CtyData, for recompiling without the XML."""
+        data = CtyData()
+        data.version = self.version
+        for adif, rec in self.records("entities"):
+            if rec.adif:
+                data.entities[adif] = rec._replace(entity=self.entity_name(adif))
+        for tag, section in CtyData.SECTIONS.items():
+            for name in (section, ADDED[section]):
+                for _i, rec in self.records(name):
+                    data.add(tag, rec)
+        return data
+
+    def _record(self, section, i, exact=False):
+        sec = self._sections[section]
+        return _unpack_row(self._mm, sec.rows + i * _ROW.size, sec.starts[i], sec.ends[i], exact)
+
+    @staticmethod
+    def _run_at(sec, lo, hi, ts):
+        """Row in lo..hi (one call's run, sorted by start) covering ts, or -1."""
+        i = bisect_right(sec.starts, ts, lo, hi) - 1
+        while i >= lo and sec.max_ends[i] >= ts:
+            if sec.ends[i] >= ts:
+                return i
+            i -= 1
+        return -1
+
+    def _search(self, section, keys, key, lo, hi, ts):
+        """(section, row) of key's run in keys[lo:hi] covering ts, or None."""
+        sec = self._sections[section]
+        lo = bisect_left(keys, key, lo, hi)
+        if lo == hi or keys[lo] != key:
+            return None
+        i = self._run_at(sec, lo, bisect_right(keys, key, lo, hi), ts)
+        return (section, i) if i >= 0 else None
+
+    def _latest(self, hit, added):
+        """Whichever hit starts last, as DatedRecords.at picks."""
+        if hit is None or added is None:
+            return hit or added
+        return max(hit, added, key=lambda h: self._sections[h[0]].starts[h[1]])
+
+    def find(self, section, call, ts):
+        sec = self._sections[section]
+        if not sec.nbuckets or len(call) > CALL_LEN:
+            return None
+        key = _key(call)
+        h = _bucket(key, sec.nbuckets)
+        hit = self._search(section, sec.keys, key, sec.buckets[h], sec.buckets[h + 1], ts)
+        added = self._sections[ADDED[section]]
+        if added.count:
+            hit = self._latest(hit, self._search(ADDED[section], added.keys, key, 0, added.count, ts))
+        return self._record(*hit) if hit else None
+
+    def entity_name(self, adif):
+        names = self._sections["names"]
+        if not 0 <= adif < names.count:
+            return ""
+        offsets = names.buckets
+        return self._mm[names.rows + offsets[adif]:names.rows + offsets[adif + 1]].decode("utf-8")
+
+    def entity(self, adif):
+        if not 0 <= adif < self._sections["entities"].count:
+            return None
+        rec = self._record("entities", adif)
+        return rec._replace(entity=self.entity_name(adif)) if rec.adif else None
+
+    def longest_prefix(self, text, ts):
+        keys, added = self._prefix_keys, self._added_keys
+        for n in range(min(len(text), self._max_prefix), 0, -1):
+            key = _key(text[:n])
+            hit = self._search("prefixes", keys, key, 0, len(keys), ts)
+            if added:
+                hit = self._latest(hit, self._search("added_prefixes", added, key, 0, len(added), ts))
+            if hit:
+                return self._record(*hit)
+        return None
+
+
+def open_index(path):
+    """Resolver for a cty.xml/cty.gz, compiling its index sidecar when stale.
+
+    Falls back to an in-memory CtyResolver if the sidecar can't be written.
+    """
+    path = Path(path)
+    st = path.stat()
+    side = index_path(path)
+    try:
+        idx = CtyIndex(side)
+        if idx.src_mtime_ns == st.st_mtime_ns and idx.src_size == st.st_size:
+            return idx
+        idx.close()
+    except (OSError, ValueError, struct.error):
+        pass
+
+    data = load_cty(path)
+    try:
+        write_index(data, side, st.st_mtime_ns, st.st_size)
+        return CtyIndex(side)
+    except OSError as e:
+        print(f"[DEBUG] cty index not written ({e}), using the parsed data")
+        return CtyResolver(data)
+
+
+if __name__ == "__main__":
+    # python cty_index.py cty.gz [CALL ...]: compile if needed, then look calls up
+    if len(sys.argv) < 2:
+        sys.exit("usage: cty_index.py cty.gz [CALL ...]")
+    resolver = open_index(sys.argv[1])
+    print(f"cty {resolver.version}")
+    for arg in sys.argv[2:]:
+        print(resolver.resolve(arg))
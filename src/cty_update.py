@@ -0,0 +1,213 @@
+import os
+import shutil
+from pathlib import Path
+from typing import NamedTuple
+
+from cty_db import CtyData, block_record, cty_blocks, iter_cty, load_cty
+from cty_index import ADDED, CtyIndex, index_path, pack_row, patch_index, write_index
+
+# rows the added_* overflow may hold before an update compiles a fresh layout
+ADDED_MAX = 1024
+_BASE = {added: section for section, added in ADDED.items()}
+
+
+class CtyDiff(NamedTuple):
+    version: str
+    patches: list       # (section, row number, CtyRecord) rewritten where it sits
+    added: list         # (tag, CtyRecord): new ids, or ids whose call/start moved
+    removed: list       # (section, row number, CtyRecord) retired rows
+    entities: list      # (adif, CtyRecord or None) that need the names rebuilt
+
+
+def _snapshot(index):
+    """(section, record id) -> (row section, row number, packed row, CtyRecord) for every live row."""
+    old = {}
+    for section in CtyData.SECTIONS.values():
+        for name in (section, ADDED[section]):
+            for i, rec in index.records(name):
+                old[section, rec.record] = (name, i, index.row(name, i), rec)
+    entities = {}
+    for adif, rec in index.records("entities"):
+        if rec.adif:
+            entities[adif] = (index.row("entities", adif), rec.end, index.entity_name(adif))
+    return old, entities
+
+
+def _entity_change(diff, rec, name):
+    """An entity whose name stays is patched in its row; anything else rebuilds."""
+    if name == rec.entity:
+        diff.patches.append(("entities", rec.adif, rec))
+    else:
+        diff.entities.append((rec.adif, rec))
+
+
+def diff_cty(index, path):
+    """Compare a cty.xml against a compiled index in one streaming pass.
+
+    Only records that differ are kept in the CtyDiff. Reads the whole
+    XML; diff_blocks() is the fast way when the index's own source is
+    still at hand.
+    """
+    old, old_entities = _snapshot(index)
+    diff = CtyDiff("", [], [], [], [])
+    seen = set()
+    for kind, rec in iter_cty(path):
+        if kind == "version":
+            diff = diff._replace(version=rec)
+            continue
+        if kind == "entity":
+            have = old_entities.get(rec.adif)
+            if have is None:
+                diff.entities.append((rec.adif, rec))
+            elif have != (pack_row(rec._replace(record=0)), rec.end, rec.entity):
+                _entity_change(diff, rec, have[2])
+            continue
+        section = CtyData.SECTIONS[kind]
+        key = (section, rec.record)
+        seen.add(key)
+        have = old.get(key)
+        if have is None:
+            diff.added.append((kind, rec))
+            continue
+        name, i, row, prev = have
+        if row == pack_row(rec) and (prev.start, prev.end) == (rec.start, rec.end):
+            continue
+        if prev.call == rec.call and prev.start == rec.start:
+            diff.patches.append((name, i, rec))
+        else:
+            diff.added.append((kind, rec))
+            seen.discard(key)   # the old row goes, the new one is added
+    for key in set(old) - seen:
+        name, i, _row, prev = old[key]
+        diff.removed.append((name, i, prev))
+    return diff
+
+
+def diff_blocks(index, old_src, src):
+    """CtyDiff of src against old_src, the cty.xml the index was compiled from.
+
+    Both files are split into their record blocks without parsing; only
+    blocks whose bytes differ are parsed, and their rows found by call
+    rather than by walking the index. None if the index doesn't hold a
+    record old_src has, so the caller can fall back to diff_cty().
+    """
+    version, new = cty_blocks(src)
+    _version, old = cty_blocks(old_src)
+    diff = CtyDiff(version, [], [], [], [])
+    for key, block in new.items():
+        was = old.pop(key, None)
+        if was == block:
+            continue
+        kind = key[0]
+        rec = block_record(kind, block)
+        if kind == "entity":
+            if index.entity(rec.adif) is None:
+                diff.entities.append((rec.adif, rec))
+            else:
+                _entity_change(diff, rec, index.entity_name(rec.adif))
+            continue
+        if was is None:
+            diff.added.append((kind, rec))
+            continue
+        prev = block_record(kind, was)
+        if prev == rec:
+            continue
+        at = index.locate(CtyData.SECTIONS[kind], prev)
+        if at is None:
+            return None
+        if prev.call == rec.call and prev.start == rec.start:
+            diff.patches.append((*at, rec))
+        else:
+            diff.removed.append((*at, prev))
+            diff.added.append((kind, rec))
+    for (kind, number), block in old.items():
+        if kind == "entity":
+            diff.entities.append((number, None))
+            continue
+        prev = block_record(kind, block)
+        at = index.locate(CtyData.SECTIONS[kind], prev)
+        if at is None:
+            return None
+        diff.removed.append((*at, prev))
+    return diff
+
+
+def update_index(src, side=None, old_src=None):
+    """Bring the compiled index of src up to date with src.
+
+    old_src is the cty.xml the index was compiled from, if it is still
+    there: then only the records whose text changed are parsed. Changed
+    rows and entities are patched where they sit, removed rows retired in
+    place and new ones go to the added_* overflow at the end of the file.
+    New or renamed entities, or an overflow past ADDED_MAX, compile a new
+    layout from the old index plus the changes. The XML's date= becomes
+    the index version.
+    """
+    src = Path(src)
+    side = Path(side) if side else index_path(src)
+    st = src.stat()
+    try:
+        index = CtyIndex(side)
+    except (OSError, ValueError):
+        data = load_cty(src)
+        write_index(data, side, st.st_mtime_ns, st.st_size)
+        return {"version": data.version, "patched": 0, "added": 0,
+                "removed": 0, "entities": len(data.entities), "rebuilt": True}
+
+    with index:
+        diff = None
+        if old_src is not None and Path(old_src).exists():
+            ost = Path(old_src).stat()
+            if (index.src_mtime_ns, index.src_size) == (ost.st_mtime_ns, ost.st_size):
+                diff = diff_blocks(index, old_src, src)
+        if diff is None:
+            diff = diff_cty(index, src)
+        rebuild = bool(diff.entities) or index.added_count() + len(diff.added) > ADDED_MAX
+        if rebuild:
+            data = index.to_data()
+    result = {"version": diff.version, "patched": len(diff.patches), "added": len(diff.added),
+              "removed": len(diff.removed), "entities": len(diff.entities), "rebuilt": rebuild}
+    if not rebuild:
+        patch_index(side, diff.patches, diff.version, st.st_mtime_ns, st.st_size,
+                    removed=[(name, i) for name, i, _rec in diff.removed],
+                    added=[(CtyData.SECTIONS[kind], rec) for kind, rec in diff.added])
+        return result
+
+    data.version = diff.version
+    patched = {(_BASE.get(name, name), rec.record): rec
+               for name, _i, rec in diff.patches if name != "entities"}
+    gone = {(_BASE.get(name, name), rec.record) for name, _i, rec in diff.removed}
+    for section in CtyData.SECTIONS.values():
+        table = getattr(data, section)
+        for call, recs in list(table.items()):
+            recs[:] = [patched.get((section, r.record), r) for r in recs
+                       if (section, r.record) not in gone]
+            if not recs:
+                del table[call]
+    for kind, rec in diff.added:
+        data.add(kind, rec)
+    for name, adif, rec in diff.patches:
+        if name == "entities":
+            data.entities[adif] = rec
+    for adif, rec in diff.entities:
+        if rec is None:
+            data.entities.pop(adif, None)
+        else:
+            data.entities[adif] = rec
+    write_index(data, side, st.st_mtime_ns, st.st_size)
+    return result
+
+
+def update_cty(new_path, cty_path):
+    """Install a newly downloaded cty.gz over cty_path and update its index."""
+    cty_path = Path(cty_path)
+    tmp = cty_path.with_name(cty_path.name + ".new")
+    shutil.copyfile(new_path, tmp)
+    try:
+        # the index records the new file's mtime/size, which the rename keeps
+        result = update_index(tmp, index_path(cty_path), old_src=cty_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    os.replace(tmp, cty_path)
+    return result
@@ -12,16 +12,42 @@ from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QLabel, QPushButton, QComboBox,
     QHBoxLayout, QMessageBox, QProgressBar, QTextEdit, QTabWidget,
     QFileDialog, QLineEdit, QStyleFactory, QGroupBox, QSlider,
-    QCheckBox, QGridLayout, QFrame, QGraphicsDropShadowEffect
+    QCheckBox, QGridLayout, QFrame, QGraphicsDropShadowEffect, QCompleter,
+    QListWidget, QListWidgetItem
 )
 from PyQt6.QtGui import (
     QPalette, QColor, QLinearGradient, QBrush, QPen, QFont, QPainter
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, QStringListModel
+
+import cat_protocol as cat
+from cat_engine import CatEngine
+from cat_macro import compile_macro, run_macro
+from cat_worker import CatWorker
+from cty_index import open_index
+from cty_update import update_cty
+from geodesy import StationGeo, format_hours, grid_to_latlon, load_station, save_station
+from menu_schema import MENU_NUMBERS, SCHEMA, describe
+from menu_transaction import apply_menus, format_verify_table, verify_menus
+from menu_validation import compile_validators, format_errors, validate_menus
+from memory_channels import CTCSS_NAMES, SHIFT_NAMES, channel_name
+from memory_export import BIN_SUFFIX, export_memories, read_plan
+from memory_index import MemoryIndex
+from memory_programmer import MemoryProgrammer
+from preset_cache import load_compiled
+from preset_plans import PRESET_PLANS, PresetExecutor
+from radio_backend import SCANNER_MODES, ScannerBackend, YaesuBackend
+from rig_state import RigState, StationState
+from scanner_udp import SCANNER_HOST
+from scp_index import PartialIndex, load_master
+from settle_profile import DEFAULT_SETTLE, SettleProfile, calibrate
+from win4yaesu_import import import_settings
 
 SERIAL_READ_TIMEOUT_MS = 60  # quick peek window for IF reply
 
 BASE_DIR = Path(__file__).resolve().parent
+CTY_PATH = BASE_DIR.parent / "old_presets" / "cty.gz"
+SCP_MASTER_PATH = BASE_DIR.parent / "old_presets" / "MASTER.SCP"     # optional
 
 
 def resource_path(name: str) -> str:
@@ -32,163 +58,6 @@ def resource_path(name: str) -> str:
     return str(p)
 
 
-MENU_DESCRIPTIONS = {
-    "001": ("AGC FAST DELAY", "20 - 4000", "msec"),
-    "002": ("AGC MID DELAY", "20 - 4000", "msec"),
-    "003": ("AGC SLOW DELAY", "20 - 4000", "msec"),
-    "004": ("HOME FUNCTION", "0:SCOPE, 1:FUNCTION", ""),
-    "005": ("MY CALL INDICATOR", "0 - 5", "sec"),
-    "006": ("DISPLAY COLOR", "0:BLUE, 1:GRAY, 2:GREEN, 3:ORANGE, 4:PURPLE, 5:RED, 6:SKY BLUE", ""),
-    "007": ("DIMMER LED", "0:1, 1:2", ""),
-    "008": ("DIMMER TFT", "0-15", ""),
-    "009": ("DISPLAY BAR MTR PEAK HOLD", "0:0s, 1:0.5s, 2:1s, 3:2s", ""),
-    "010": ("DVS RX OUT LEVEL", "0-100", ""),
-    "011": ("DVS TX OUT LEVEL", "0-100", ""),
-    "012": ("KEYER TYPE", "0:OFF, 1:BUG, 2:ELEKEY-A, 3:ELEKEY-B, 4:ELEKEY-Y, 5:ACS", ""),
-    "013": ("KEYER DOT DASH", "0:NORMAL, 1:REVERSE", ""),
-    "014": ("KEYER CW WEIGHT", "2.5 - 4.5", ""),
-    "015": ("KEYER BEACON TIME", "0:OFF, 1:1 - 240", "sec"),
-    "016": ("KEYER NUMBER STYLE", "0:1290, 1:AUNO, 2:AUNT, 3:A2NO, 4:A2NT, 5:12NO, 6:12NT", ""),
-    "017": ("KEYER CONTEST NUMBER", "0-9999", ""),
-    "018": ("KEYER CW MEMORY 1", "0:TEXT, 1:MESSAGE", ""),
-    "019": ("KEYER CW MEMORY 2", "0:TEXT, 1:MESSAGE", ""),
-    "020": ("KEYER CW MEMORY 3", "0:TEXT, 1:MESSAGE", ""),
-    "021": ("KEYER CW MEMORY 4", "0:TEXT, 1:MESSAGE", ""),
-    "022": ("KEYER CW MEMORY 5", "0:TEXT, 1:MESSAGE", ""),
-    "023": ("NB WIDTH", "0:1ms, 1:3ms, 2:10ms", ""),
-    "024": ("NB REJECTION", "0:10 dB, 1:30 dB, 2:50dB", ""),
-    "025": ("NB LEVEL", "0-10", ""),
-    "026": ("BEEP LEVEL", "0-100", ""),
-    "027": ("Please set this at the radio", "TIMEZONE", ""),
-    "028": ("GPS/232C SELECT", "0:GPS1, 1:GPS2, 2:RS232C", ""),
-    "029": ("232C RATE", "0:4800bps, 1:9600bps, 2:19200bps, 3:38400bps", ""),
-    "030": ("232C TOT", "0:10ms, 1:100ms, 2:1000ms, 3:3000", ""),
-    "031": ("CAT RATE", "0:4800bps, 1:9600bps, 2:19200bps, 3:38400bps", ""),
-    "032": ("CAT TIMEOUT", "0:10ms, 1:100ms, 2:1000ms, 3:3000ms", ""),
-    "033": ("CAT RTS", "0:DISABLE, 1:ENABLE", ""),
-    "034": ("MEM GROUP", "0:DISABLE, 1:ENABLE", ""),
-    "035": ("QUICK SPLIT FREQ", "-20 to +20 kHz", ""),
-    "036": ("TX TIMEOUT TIMER", "0-30min", ""),
-    "037": ("MIC SCAN", "0:DISABLE, 1:ENABLE", ""),
-    "038": ("MIC SCAN RESUME", "0:PAUSE, 1:TIME", ""),
-    "039": ("REF FREQUENCY ADJUST", "-25 to +25 kHz", ""),
-    "040": ("CLAR MODE SELECT", "0:RX, 1:TX, 2:TRX", ""),
-    "041": ("Mode:AM LCUT Freq", "0:OFF, 1:100Hz - 19:1000Hz", ""),
-    "042": ("Mode:AM LCUT Slope", "0:6dB/oct, 1:18dB/oct", ""),
-    "043": ("Mode:AM HCUT Freq", "0:OFF, 1:700Hz - 67:4000Hz", ""),
-    "044": ("Mode:AM HCUT Slope", "0:6dB/oct, 1:18dB/oct", ""),
-    "045": ("Mode:AM MIC SEL", "0:MIC, 1:REAR", ""),
-    "046": ("Mode:AM OUT LEVEL", "0-100", ""),
-    "047": ("Mode:AM PTT SELECT", "0:DAKY, 1:RTS, 2:DTR", ""),
-    "048": ("Mode:AM PORT SELECT", "0:DATA, 1:USB", ""),
-    "049": ("Mode:AM DATA GAIN", "0-100", ""),
-    "050": ("Mode:CW LCUT FREQ", "0:OFF, 1:100Hz - 19:1000Hz", ""),
-    "051": ("Mode:CW LCUT SLOPE", "0:6dB/oct, 1:18dB/oct", ""),
-    "052": ("Mode:CW HCUT FREQ", "0:OFF, 1:700Hz - 67:4000Hz", ""),
-    "053": ("Mode:CW HCUT SLOPE", "0:6dB/oct, 1:18dB/oct", ""),
-    "054": ("Mode:CW OUT LEVEL", "0-100", ""),
-    "055": ("Mode:CW CW AUTO MODE", "0:OFF, 1:50MHz, 2:ON", ""),
-    "056": ("Mode:CW CW BK-IN", "0:SEMI, 1:FULL", ""),
-    "057": ("MODE:CW CW BK-IN DELAY", "30 - 3000", "msec"),
-    "058": ("Mode:CW CW WAVE SHAPE", "0:1ms, 1:2ms, 2:4ms, 3:6ms", ""),
-    "059": ("Mode:CW CW FREQ DISPLAY", "0:DIRECT, 1:OFFSET", ""),
-    "060": ("Mode:CW PC KEYING", "0:OFF, 1:DAKY, 2:RTS, 3:DTR", ""),
-    "061": ("Mode:CW QSK", "0:15ms, 1:20ms, 2:25ms, 3:30ms", ""),
-    "062": ("Mode:DATA DATA MODE", "0:PSK, 1:OTHER", ""),
-    "063": ("PSK TONE", "0:1000, 1:1500, 2:2000", ""),
-    "064": ("Mode:DATA OTHER DISP SSB", "-3000 to +3000 kHz", ""),
-    "065": ("Mode:DATA OTHER SHIFT SSB", "-3000 to +3000 kHz", ""),
-    "066": ("Mode:DATA DATA LCUT FREQ", "0:OFF, 1:100Hz - 19:1000Hz", ""),
-    "067": ("Mode:DATA DATA LCUT SLOPE", "0:6dB/oct, 1:18dB/oct", ""),
-    "068": ("Mode:DATA DATA HCUT FREQ", "0:OFF, 1:700Hz - 67:4000Hz", ""),
-    "069": ("Mode:DATA DATA HCUT SLOPE", "0:6dB/oct, 1:18dB/oct", ""),
-    "070": ("Mode:DATA DATA IN SELECT", "0:MIC, 1:REAR", ""),
-    "071": ("Mode:DATA PTT SELECT", "0:DAKY, 1:RTS, 2:DTR", ""),
-    "072": ("Mode:DATA PORT SELECT", "0:DATA, 1:USB", ""),
-    "073": ("Mode:DATA DATA OUT LEVEL", "0-100", ""),
-    "074": ("Mode:FM FM MIC SEL", "0:MIC, 1:REAR", ""),
-    "075": ("FM OUT LEVEL", "0-100", ""),
-    "076": ("FM PKT PTT SELECT", "0:DAKY, 1:RTS, 2:DTR", ""),
-    "077": ("FM PORT SELECT", "0:DATA, 1:USB", ""),
-    "078": ("FM PKT TX GAIN", "0-100", ""),
-    "079": ("FM PKT MODE", "0:1200, 1:9600", ""),
-    "080": ("Mode:FM RPT SHIFT(28MHz)", "0-1000", ""),
-    "081": ("Mode:FM RPT SHIFT(50MHz)", "0-4000", ""),
-    "082": ("Mode:FM RPT SHIFT(144MHz)", "0-4000", ""),
-    "083": ("Mode:FM RPT SHIFT(430MHz)", "0-10000", ""),
-    "084": ("ARS 144MHz", "0:OFF, 1:ON", ""),
-    "085": ("ARS 430MHz", "0:OFF, 1:ON", ""),
-    "086": ("DCS POLARITY", "0:Tn-Rn, 1:Tn-Riv, 2:Tiv-Rn, 3:Tiv-Riv", ""),
-    "087": ("Please set this at the radio", "0:6dB/oct, 1:18dB/oct", ""),
-    "088": ("GM DISPLAY", "0:DISTANCE, 1:STRENGTH", ""),
-    "089": ("DISTANCE", "0:KM, 1:MILE", ""),
-    "090": ("AMS TX MODE", "0:AUTO, 1:MANUAL, 2:DN, 3:VW, 4:ANALOG", ""),
-    "091": ("STANDBY BEEP", "0:OFF, 1:ON", ""),
-    "092": ("Mode:RTTY LCUT FREQ", "0:OFF, 1:100Hz - 19:1000 50Hz STEPS", ""),
-    "093": ("Mode:RTTY LCUT SLOPE", "0:6dB/oct, 1:18dB/oct", ""),
-    "094": ("Mode:RTTY HCUT FREQ", "0:OFF, 1:700Hz - 67:4000Hz", ""),
-    "095": ("Mode:RTTY HCUT SLOPE", "0:6dB/oct, 1:18dB/oct", ""),
-    "096": ("RTTY SHIFT PORT", "0:SHIFT, 1:DTR, 2:RTS", ""),
-    "097": ("Mode:RTTY POLARITY-R", "0:NOR, 1:REV", ""),
-    "098": ("Mode:RTTY POLARITY-T", "0:NOR, 1:REV", ""),
-    "099": ("Mode:RTTY OUT LEVEL", "0-100", ""),
-    "100": ("Mode:RTTY RTTY SHIFT", "0:170, 1:200, 2:425, 3:850", ""),
-    "101": ("Mode:RTTY MARK FREQ", "0:1275Hz, 1:2125Hz", ""),
-    "102": ("Mode:SSB LCUT FREQ", "0:OFF, 1:100Hz - 19:1000Hz (50Hz steps)", ""),
-    "103": ("Mode:SSB LCUT SLOPE", "0:6dB/oct, 1:18dB/oct", ""),
-    "104": ("Mode:SSB HCUT FREQ", "0:OFF, 1:700Hz - 67:4000Hz (50Hz steps)", ""),
-    "105": ("Mode:SSB HCUT SLOPE", "0:6dB/oct, 1:18dB/oct", ""),
-    "106": ("Mode:SSB MIC SELECT", "0:MIC, 1:REAR", ""),
-    "107": ("Mode:SSB OUT LEVEL", "0-100", ""),
-    "108": ("Mode:SSB PTT SELECT", "0:DAKY, 1:RTS, 2:DTR", ""),
-    "109": ("Mode:SSB PORT SELECT", "0:DATA, 1:USB", ""),
-    "110": ("Mode:SSB TX BPF", "0:50-3000, 1:100-2900, 2:200-2800, 3:300-2700, 4:400-2600", ""),
-    "111": ("APF WIDTH", "0:NARROW, 1:MEDIUM, 2:WIDE", ""),
-    "112": ("CONTOUR LEVEL", "-40 to +20", ""),
-    "113": ("CONTOUR WIDTH", "1-11", ""),
-    "114": ("IF NOTCH WIDTH", "0:NARROW, 1:WIDE", ""),
-    "115": ("SCOPE DISPLAY MODE", "0:SPECTRUM, 1:WATERFALL", ""),
-    "116": ("SCOPE SPAN FREQ", "3:50kHz, 4:100kHz, 5:200kHz, 6:500kHz, 7:1000kHz", ""),
-    "117": ("SPECTRUM COLOR", "0:BLUE, 1:GRAY, 2:GREEN, 3:ORANGE, 4:PURPLE, 5:RED, 6:SKY BLUE", ""),
-    "118": ("WATERFALL COLOR", "0:BLUE, 1:GRAY, 2:GREEN, 3:ORANGE, 4:PURPLE, 5:RED, 6:SKY BLUE, 7:MULTI", ""),
-    "119": ("PRMTRC EQ1 FREQ", "0:OFF, 1:100Hz, 2:200Hz, 3:300Hz, 4:400Hz, 5:500Hz, 6:600Hz, 7:700Hz", ""),
-    "120": ("PRMTRC EQ1 LEVEL", "-20 to +10", ""),
-    "121": ("PRMTRC EQ1 BWTH", "1-10", ""),
-    "122": ("PRMTRC EQ2 FREQ", "0:OFF, 1:700Hz, 2:800Hz, 3:900Hz, 4:1000Hz, 5:1100Hz, 6:1200Hz, 7:1300Hz, 8:1400Hz, 9:1500Hz", ""),
-    "123": ("PRMTRC EQ2 LEVEL", "-20 to +10", ""),
-    "124": ("PRMTRC EQ2 BWTH", "1-10", ""),
-    "125": ("PRMTRC EQ3 FREQ", "0:OFF, 1:1500Hz, 2:1600Hz, 3:1700Hz, 4:1800Hz, 5:1900Hz, 6:2000Hz-18:3200Hz", ""),
-    "126": ("PRMTRC EQ3 LEVEL", "-20 to +10", ""),
-    "127": ("PRMTRC EQ3 BWTH", "1-10", ""),
-    "128": ("P-PRMTRC EQ1 FREQ", "0:OFF, 1:100Hz, 2:200Hz, 3:300Hz, 4:400Hz, 5:500Hz, 6:600Hz, 7:700Hz", ""),
-    "129": ("P-PRMTRC EQ1 LEVEL", "-20 to +10", ""),
-    "130": ("P-PRMTRC EQ1 BWTH", "1-10", ""),
-    "131": ("P-PRMTRC EQ2 FREQ", "0:OFF, 1:700Hz, 2:800Hz, 3:900Hz, 4:1000Hz, 5:1100Hz, 6:1200Hz, 7:1300Hz, 8:1400Hz, 9:1500Hz", ""),
-    "132": ("P-PRMTRC EQ2 LEVEL", "-20 to +10", ""),
-    "133": ("P-PRMTRC EQ2 BWTH", "1-10", ""),
-    "134": ("P-PRMTRC EQ3 FREQ", "0:OFF, 1:1500Hz, 2:1600Hz, 3:1700Hz, 4:1800Hz, 5:1900Hz, 6:2000Hz-18:3200Hz", ""),
-    "135": ("P-PRMTRC EQ3 LEVEL", "-20 to +10", ""),
-    "136": ("P-PRMTRC EQ3 BWTH", "1-10", ""),
-    "137": ("HF TX MAX POWER", "5-100", "W"),
-    "138": ("50M TX MAX POWER", "5-100", "W"),
-    "139": ("144M TX MAX POWER", "5-50", "W"),
-    "140": ("430M TX MAX POWER", "5-50", "W"),
-    "141": ("TUNER SELECT", "0:OFF, 1:INTERNAL, 2:EXTERNAL, 3:ATAS, 4:LAMP", ""),
-    "142": ("VOX SELECT", "0:MIC, 1:DATA", ""),
-    "143": ("VOX GAIN", "0-100", ""),
-    "144": ("VOX DELAY", "30-3000", "ms"),
-    "145": ("ANTI VOX GAIN", "0-100", ""),
-    "146": ("DATA VOX GAIN", "0-100", ""),
-    "147": ("DATA VOX DELAY", "30-3000", "ms"),
-    "148": ("ANTI DVOX GAIN", "0-100", ""),
-    "149": ("EMERGENCY FREQ TX", "0:DISABLE, 1:ENABLE", ""),
-    "150": ("PRT/WIRES FREQ", "0:MANUAL, 1:PRESET", ""),
-    "151": ("PRESET FREQUENCY", "3000000-47000000", "Hz"),
-    "152": ("SEARCH SETUP", "0:HISTORY, 1:ACTIVITY", ""),
-    "153": ("WIRES DG-ID", "0:AUTO, 1-99:DG-ID", "")
-}
-
-
 class LEDIndicator(QFrame):
     def __init__(self, diameter=16, color_on="#FF4D4D", color_off="#30343A",
                  border="#8A8F99", label_text="TX"):
@@ -289,6 +158,8 @@ class FrequencyDisplayLabel(QLabel):
         if not self.controller.serial_conn or not self.controller.serial_conn.is_open:
             print("[ERROR] Serial connection not open.")
             return
+        if not self.controller._cat_free():
+            return
 
         delta = event.angleDelta().y()
         if delta == 0:
@@ -301,7 +172,7 @@ class FrequencyDisplayLabel(QLabel):
             ok = self.controller._ensure_vfo()
             if not ok:
                 ser.reset_input_buffer()
-                ser.write(b"VM0;")
+                ser.write(cat.VM0)
                 time.sleep(0.20)
                 self.controller._ensure_vfo()
 
@@ -324,20 +195,18 @@ class FrequencyDisplayLabel(QLabel):
             new_hz = int(new11)
 
             new_hz = self.controller._clip_rig_range(new_hz)
-            cmd = f"FA{new_hz:011d};"
-            ser.write(cmd.encode('ascii'))
-            print(f"[DEBUG] Updated freq to: {cmd}")
+            cmd = cat.encode_fa(new_hz)
+            ser.write(cmd)
+            print(f"[DEBUG] Updated freq to: {cmd!r}")
 
-            time.sleep(0.12)
+            self.controller._settle("FA")
             ser.reset_input_buffer()
-            ser.write(b'FA;')
-            fa = self.controller.read_until_semicolon()
-            if fa.startswith('FA') and fa.endswith(';'):
-                digits = ''.join(ch for ch in fa[2:-1] if ch.isdigit())
-                if digits:
-                    new_hz = int(digits[-11:].rjust(11, '0'))
-
-            self.controller.freq_display.setText(self.controller._format_hz_for_display(new_hz))
+            ser.write(cat.Q_FA)
+            readback = cat.decode_fa(self.controller._read_reply_view())
+            if readback is not None:
+                new_hz = readback
+
+            self.controller.rig_state.set_freq(new_hz)
             event.accept()
 
         except Exception as e:
@@ -381,15 +250,20 @@ class RetroBarMeter(QWidget):
         self.setFixedSize(500, 70)
 
         self.timer = QTimer(self)
+        self.timer.setInterval(50)
         self.timer.timeout.connect(self.animate_bar)
-        self.timer.start(50)
 
     def set_value(self, val):
         try:
             v = float(val)
         except (TypeError, ValueError):
             return
-        self.target_value = max(0.0, min(100.0, v))
+        v = max(0.0, min(100.0, v))
+        if v == self.target_value:
+            return
+        self.target_value = v
+        if not self.timer.isActive():
+            self.timer.start()
 
     def animate_bar(self):
         diff = self.target_value - self.current_value
@@ -397,6 +271,7 @@ class RetroBarMeter(QWidget):
             self.current_value += diff * self.smoothing
         else:
             self.current_value = self.target_value
+            self.timer.stop()
         self.update()
 
     def paintEvent(self, event):
@@ -446,17 +321,74 @@ class FT991AController(QWidget):
         self.setFixedSize(1200, 1200)
 
         self.serial_conn = None
+        self._rx_buf = bytearray(64)
         self._poll_inhibit_until = 0.0
         self._cat_busy = False
 
         self.meter_timer = None
         self.freq_timer = None
         self._cat_lock = threading.RLock()
-        self._cat_busy = False
 
-        self.is_transmitting = False
         self.poll_counter = 0
-        self.current_memory = 1
+        self.rig_state = RigState(self)
+
+        self.cat_engine = None
+        self._radio_id = None
+        self._settle_profile_id = "default"
+        self.menu_validators = compile_validators()
+        self.preset_executor = PresetExecutor(None, BASE_DIR, self)
+        self.preset_executor.validators = self.menu_validators
+        self.preset_executor.stage_done.connect(self._on_preset_stage)
+        self.preset_executor.finished.connect(self._on_preset_finished)
+        self.preset_executor.failed.connect(self._on_preset_failed)
+
+        self.calibration_worker = CatWorker(self)
+        self.calibration_worker.progress.connect(lambda pct: self.progress_bar.setValue(pct))
+        self.calibration_worker.finished.connect(self._on_calibration_finished)
+        self.calibration_worker.failed.connect(self._on_calibration_failed)
+        self.menu_worker = CatWorker(self)
+        self.menu_worker.progress.connect(lambda pct: self.progress_bar.setValue(pct))
+        self.menu_worker.finished.connect(self._on_menus_applied)
+        self.menu_worker.failed.connect(self._on_menus_failed)
+        self.macro_worker = CatWorker(self)
+        self.macro_worker.progress.connect(lambda pct: self.progress_bar.setValue(pct))
+        self.macro_worker.finished.connect(self._on_macro_finished)
+        self.macro_worker.failed.connect(self._on_macro_failed)
+        self.memory_programmer = None
+        self.memory_worker = CatWorker(self)
+        self.memory_worker.progress.connect(lambda pct: self.mem_progress.setValue(pct))
+        self.memory_worker.message.connect(lambda text: self.mem_status.setText(text))
+        self.memory_worker.finished.connect(self._on_memory_job_finished)
+        self.memory_worker.failed.connect(self._on_memory_job_failed)
+        self.cty = None
+        self._cty_pending = ""
+        station = load_station()
+        self.station_geo = StationGeo(station[1], station[2]) if station else None
+        self.cty_worker = CatWorker(self)
+        self.cty_worker.finished.connect(self._on_cty_loaded)
+        self.cty_worker.message.connect(lambda text: self.dx_result.setText(text))
+        self.scp = None
+        self._scp_source = None     # resolver the last SCP build read
+        self._cty_retired = []      # replaced indexes the running SCP build still reads
+        self.scp_worker = CatWorker(self)
+        self.scp_worker.finished.connect(self._on_scp_built)
+        self.scp_worker.failed.connect(self._on_scp_failed)
+        self.cty_worker.failed.connect(lambda message: self.dx_result.setText(f"❌ cty: {message}"))
+
+        # every radio feeds one StationState; the Radios tab listens to it
+        self.station = StationState(self)
+        self.yaesu = YaesuBackend(self)
+        self.rig_state.freq_changed.connect(lambda hz: self.station.set_freq(self.yaesu.name, hz))
+        self.yaesu.freq_read.connect(self.rig_state.set_freq)
+        self.yaesu.online.connect(lambda on: self.station.set_online(self.yaesu.name, on))
+        self.yaesu.failed.connect(lambda message: self.radio_status.setText(f"❌ 991A: {message}"))
+        self.yaesu.idle.connect(self._on_yaesu_idle)
+        self.scanner = ScannerBackend(self)
+        self.scanner.freq_read.connect(lambda hz: self.station.set_freq(self.scanner.name, hz))
+        self.scanner.online.connect(lambda on: self.station.set_online(self.scanner.name, on))
+        self.scanner.status_read.connect(lambda st: self.station.set_status(self.scanner.name, st))
+        self.scanner.hit.connect(self.station.add_hit)
+        self.scanner.failed.connect(self._on_scanner_failed)
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -496,6 +428,10 @@ class FT991AController(QWidget):
         self.cat_tab = QWidget()
         self.tabs.addTab(self.main_tab, "Menu Reader")
         self.tabs.addTab(self.cat_tab, "CAT Terminal")
+        self.mem_tab = QWidget()
+        self.tabs.addTab(self.mem_tab, "Memories")
+        self.radios_tab = QWidget()
+        self.tabs.addTab(self.radios_tab, "Radios")
 
         palette = QPalette()
         gradient = QLinearGradient(0, 0, 0, self.height())
@@ -622,7 +558,8 @@ class FT991AController(QWidget):
         self.tx_led.setParent(self.main_tab)
         self.tx_led.setGeometry(600, 32, 60, 18)
 
-        self.is_transmitting = False
+        self.rig_state.tx_changed.connect(self.tx_led.set_on)
+        self.rig_state.meter_changed.connect(self._on_meter_changed)
         self.start_meter_polling()
         self.tx_timer = QTimer(self)
         self.tx_timer.setInterval(250)
@@ -671,60 +608,80 @@ class FT991AController(QWidget):
         self.btn_mem_darn2.setStyleSheet(btn_style)
         self.btn_mem_darn2.clicked.connect(lambda: self.recall_memory_channel("003"))
 
+        self.memory_index = MemoryIndex()
+        self.mem_search = QLineEdit(self.main_tab)
+        self.mem_search.setGeometry(280, 140, 250, 30)
+        self.mem_search.setPlaceholderText("🔎 Channel, label or MHz")
+        self._mem_search_model = QStringListModel(self)
+        completer = QCompleter(self._mem_search_model, self)
+        completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        completer.activated.connect(self._recall_search_hit)
+        self.mem_search.setCompleter(completer)
+        self.mem_search.textEdited.connect(self._update_memory_search)
+        self.mem_search.returnPressed.connect(
+            lambda: self._recall_search_hit(self.mem_search.text())
+        )
+        default_plan = BASE_DIR.parent / "old_presets" / "channels.xml"
+        if default_plan.exists():
+            try:
+                self.memory_index = MemoryIndex(read_plan(default_plan).values())
+            except (OSError, ValueError, ET.ParseError):
+                pass
+
         self.preset_btn_default = QPushButton("Default", self.main_tab)
         self.preset_btn_default.setGeometry(20, 955, 100, 30)
         self.preset_btn_default.setStyleSheet("background-color: #3a0ca3; color: white; font-weight: bold;")
         self.preset_btn_default.clicked.connect(
-            partial(self.activate_default_memory, "defaultv002.xml")
+            partial(self.activate_preset, "default")
         )
 
         self.preset_btn_ft8 = QPushButton("FT8", self.main_tab)
         self.preset_btn_ft8.setGeometry(130, 255, 100, 30)
         self.preset_btn_ft8.setStyleSheet("background-color: #3a0ca3; color: white; font-weight: bold;")
         self.preset_btn_ft8.clicked.connect(
-            partial(self.activate_ft8_memory, "FT8settings.xml")
+            partial(self.activate_preset, "ft8")
         )
 
         self.preset_btn_winlink = QPushButton("Winlink", self.main_tab)
         self.preset_btn_winlink.setGeometry(240, 255, 100, 30)
         self.preset_btn_winlink.setStyleSheet("background-color: #3a0ca3; color: white; font-weight: bold;")
         self.preset_btn_winlink.clicked.connect(
-            partial(self.activate_winlink_memory, "WINLINK_APRS.xml")
+            partial(self.activate_preset, "winlink")
         )
 
         self.preset_btn_aprs = QPushButton("APRS-pinpoint", self.main_tab)
         self.preset_btn_aprs.setGeometry(350, 255, 100, 30)
         self.preset_btn_aprs.setStyleSheet("background-color: #3a0ca3; color: white; font-weight: bold;")
         self.preset_btn_aprs.clicked.connect(
-            partial(self.activate_aprs_memory, "aprs.xml")
+            partial(self.activate_preset, "aprs")
         )
 
         self.preset_btn_ssb = QPushButton("SSB", self.main_tab)
         self.preset_btn_ssb.setGeometry(460, 255, 100, 30)
         self.preset_btn_ssb.setStyleSheet("background-color: #3a0ca3; color: white; font-weight: bold;")
         self.preset_btn_ssb.clicked.connect(
-            partial(self.activate_ssb_memory, "SSB_setting.xml")
+            partial(self.activate_preset, "ssb")
         )
 
         self.preset_btn_wiresx = QPushButton("WIRES-X", self.main_tab)
         self.preset_btn_wiresx.setGeometry(570, 255, 100, 30)
         self.preset_btn_wiresx.setStyleSheet("background-color: #3a0ca3; color: white; font-weight: bold;")
         self.preset_btn_wiresx.clicked.connect(
-            partial(self.activate_wiresx_memory, "WIRESX.xml")
+            partial(self.activate_preset, "wiresx")
         )
 
         self.preset_btn_default2 = QPushButton("Mic simplex", self.main_tab)
         self.preset_btn_default2.setGeometry(20, 220, 100, 30)
         self.preset_btn_default2.setStyleSheet("background-color: #3a0ca3; color: white; font-weight: bold;")
         self.preset_btn_default2.clicked.connect(
-            partial(self.activate_default2_memory, "overrides_only.xml")
+            partial(self.activate_preset, "default2")
         )
 
         self.preset_btn_mic_default_d3 = QPushButton("Mic darn3", self.main_tab)
         self.preset_btn_mic_default_d3.setGeometry(20, 255, 100, 30)
         self.preset_btn_mic_default_d3.setStyleSheet("background-color: #3a0ca3; color: white; font-weight: bold;")
         self.preset_btn_mic_default_d3.clicked.connect(
-            partial(self.activate_mic_default_d3, "overrides_only.xml")
+            partial(self.activate_preset, "mic_d3")
         )
 
         self.save_btn = QPushButton("📥 Download From Radio to File", self.main_tab)
@@ -741,7 +698,7 @@ class FT991AController(QWidget):
         self.preset_btn_aprs_m059.setGeometry(350, 220, 100, 30)
         self.preset_btn_aprs_m059.setStyleSheet("background-color: #3a0ca3; color: white; font-weight: bold;")
         self.preset_btn_aprs_m059.clicked.connect(
-            partial(self.activate_aprs_simplex59, "aprs.xml")
+            partial(self.activate_preset, "aprs_simplex")
         )
 
         self.text_display = QTextEdit(self.main_tab)
@@ -787,6 +744,9 @@ class FT991AController(QWidget):
             border: 2px solid cyan;
         """)
         self.freq_display.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.rig_state.freq_changed.connect(
+            lambda hz: self.freq_display.setText(self._format_hz_for_display(hz))
+        )
 
         self.mem_plus_btn = QPushButton("+", self.main_tab)
         self.mem_plus_btn.setGeometry(700, 400, 40, 60)
@@ -931,6 +891,84 @@ class FT991AController(QWidget):
         self.cat_send_btn.clicked.connect(self.send_cat_command)
         cat_layout.addWidget(self.cat_send_btn)
 
+        self.calibrate_btn = QPushButton("⏱ Calibrate Settle Times")
+        self.calibrate_btn.setToolTip(
+            "Measures how fast this radio accepts VM/MC/MD/FA/EX commands.\n"
+            "Nudges FA and menu 026 and puts them back."
+        )
+        self.calibrate_btn.clicked.connect(self.calibrate_settle_times)
+        cat_layout.addWidget(self.calibrate_btn)
+
+        self.verify_writes_chk = QCheckBox("Verify menu writes (read back every EX)")
+        self.verify_writes_chk.setToolTip(
+            "After a preset or an EX command, read every written menu back\n"
+            "and resend only the ones that didn't take."
+        )
+        self.verify_writes_chk.toggled.connect(
+            lambda on: setattr(self.preset_executor, "verify", on)
+        )
+        cat_layout.addWidget(self.verify_writes_chk)
+
+        dx_group = QGroupBox("DX Lookup")
+        dx_layout = QHBoxLayout()
+        self.dx_call_input = QLineEdit()
+        self.dx_call_input.setPlaceholderText("Callsign, e.g. VP8ABC or F/G4ABC")
+        self.dx_call_input.returnPressed.connect(self.lookup_dx_call)
+        self._dx_scp_model = QStringListModel(self)
+        dx_completer = QCompleter(self._dx_scp_model, self)
+        dx_completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        dx_completer.activated.connect(lambda text: self.lookup_dx_call())
+        self.dx_call_input.setCompleter(dx_completer)
+        self.dx_call_input.textEdited.connect(self._update_dx_suggestions)
+        dx_layout.addWidget(self.dx_call_input)
+        self.dx_grid_input = QLineEdit(station[0] if station else "")
+        self.dx_grid_input.setPlaceholderText("My grid")
+        self.dx_grid_input.setMaximumWidth(80)
+        self.dx_grid_input.editingFinished.connect(self.set_station_grid)
+        dx_layout.addWidget(self.dx_grid_input)
+        self.dx_update_btn = QPushButton("⟳ Update cty")
+        self.dx_update_btn.setToolTip("Patch the DXCC database from a newer ClubLog cty.gz")
+        self.dx_update_btn.clicked.connect(self.update_cty_file)
+        dx_layout.addWidget(self.dx_update_btn)
+        self.dx_result = QLabel("")
+        dx_layout.addWidget(self.dx_result, 1)
+        dx_group.setLayout(dx_layout)
+        cat_layout.addWidget(dx_group)
+
+        fn_group = QGroupBox("FN Macros")
+        fn_layout = QVBoxLayout()
+        self.import_w4y_btn = QPushButton("📂 Import Win4Yaesu Settings")
+        self.import_w4y_btn.clicked.connect(self.import_win4yaesu_settings)
+        fn_layout.addWidget(self.import_w4y_btn)
+        self.fn_macro_row = QHBoxLayout()
+        fn_layout.addLayout(self.fn_macro_row)
+        fn_group.setLayout(fn_layout)
+        cat_layout.addWidget(fn_group)
+        self.fn_macro_buttons = []
+
+        macro_group = QGroupBox("Macro")
+        macro_layout = QVBoxLayout()
+        self.macro_editor = QTextEdit()
+        self.macro_editor.setPlaceholderText(
+            "FA014200000; MD02; PC050;\n"
+            "set ch 52\n"
+            "MC${ch:03d};\n"
+            "wait MC == 052 within 2\n"
+            "repeat 3 ... end, add ch 1, sleep 0.5"
+        )
+        self.macro_editor.setStyleSheet("font-family: Consolas;")
+        macro_layout.addWidget(self.macro_editor)
+        macro_buttons = QHBoxLayout()
+        self.macro_load_btn = QPushButton("📂 Load")
+        self.macro_load_btn.clicked.connect(self.load_macro_file)
+        macro_buttons.addWidget(self.macro_load_btn)
+        self.macro_run_btn = QPushButton("▶ Run Macro")
+        self.macro_run_btn.clicked.connect(self.run_macro_text)
+        macro_buttons.addWidget(self.macro_run_btn)
+        macro_layout.addLayout(macro_buttons)
+        macro_group.setLayout(macro_layout)
+        cat_layout.addWidget(macro_group)
+
         self.cat_response_display = QTextEdit()
         self.cat_response_display.setReadOnly(True)
         self.cat_response_display.setStyleSheet(
@@ -939,8 +977,83 @@ class FT991AController(QWidget):
         cat_layout.addWidget(self.cat_response_display)
         self.cat_tab.setLayout(cat_layout)
 
+        mem_layout = QVBoxLayout()
+        mem_buttons = QHBoxLayout()
+        self.mem_load_btn = QPushButton("📂 Load Channel Plan")
+        self.mem_load_btn.clicked.connect(self.load_channel_plan_file)
+        mem_buttons.addWidget(self.mem_load_btn)
+        self.mem_compare_btn = QPushButton("🔍 Read Radio && Compare")
+        self.mem_compare_btn.clicked.connect(self.compare_memories)
+        mem_buttons.addWidget(self.mem_compare_btn)
+        self.mem_write_btn = QPushButton("✍ Write Changes")
+        self.mem_write_btn.clicked.connect(self.write_memories)
+        mem_buttons.addWidget(self.mem_write_btn)
+        self.mem_export_btn = QPushButton("📤 Export Radio")
+        self.mem_export_btn.clicked.connect(self.export_memories_file)
+        mem_buttons.addWidget(self.mem_export_btn)
+        self.mem_stop_btn = QPushButton("⏹ Stop")
+        self.mem_stop_btn.clicked.connect(self.stop_memory_job)
+        mem_buttons.addWidget(self.mem_stop_btn)
+        mem_layout.addLayout(mem_buttons)
+        self.mem_progress = QProgressBar()
+        mem_layout.addWidget(self.mem_progress)
+        self.mem_status = QLabel("No channel plan loaded")
+        mem_layout.addWidget(self.mem_status)
+        self.mem_display = QTextEdit()
+        self.mem_display.setReadOnly(True)
+        self.mem_display.setStyleSheet(
+            "background-color: #1e1e1e; color: #90ee90; font-family: Consolas;"
+        )
+        mem_layout.addWidget(self.mem_display)
+        self.mem_tab.setLayout(mem_layout)
+
+        radios_layout = QVBoxLayout()
+        scanner_row = QHBoxLayout()
+        scanner_row.addWidget(QLabel("SDS200 address:"))
+        self.scanner_host_input = QLineEdit(SCANNER_HOST)
+        self.scanner_host_input.setFixedWidth(160)
+        self.scanner_host_input.returnPressed.connect(self.toggle_scanner)
+        scanner_row.addWidget(self.scanner_host_input)
+        self.scanner_connect_btn = QPushButton("📡 Connect Scanner")
+        self.scanner_connect_btn.clicked.connect(self.toggle_scanner)
+        scanner_row.addWidget(self.scanner_connect_btn)
+        self.follow_hits_check = QCheckBox("Follow scanner hits on the 991A")
+        scanner_row.addWidget(self.follow_hits_check)
+        scanner_row.addStretch(1)
+        radios_layout.addLayout(scanner_row)
+        radio_font = QFont("Consolas", 14, QFont.Weight.Bold)
+        self.rig_freq_label = QLabel("FT-991A   offline")
+        self.rig_freq_label.setFont(radio_font)
+        self.rig_freq_label.setStyleSheet("color: cyan; padding: 4px;")
+        radios_layout.addWidget(self.rig_freq_label)
+        self.scanner_freq_label = QLabel("SDS200    offline")
+        self.scanner_freq_label.setFont(radio_font)
+        self.scanner_freq_label.setStyleSheet("color: #f8961e; padding: 4px;")
+        radios_layout.addWidget(self.scanner_freq_label)
+        self.hit_list = QListWidget()
+        self.hit_list.setStyleSheet(
+            "background-color: #1e1e1e; color: #90ee90; font-family: Consolas;"
+        )
+        self.hit_list.itemDoubleClicked.connect(self.tune_to_selected_hit)
+        radios_layout.addWidget(self.hit_list)
+        hit_buttons = QHBoxLayout()
+        self.tune_hit_btn = QPushButton("📻 Tune 991A to Hit")
+        self.tune_hit_btn.clicked.connect(self.tune_to_selected_hit)
+        hit_buttons.addWidget(self.tune_hit_btn)
+        self.clear_hits_btn = QPushButton("🗑 Clear Hits")
+        self.clear_hits_btn.clicked.connect(self.hit_list.clear)
+        hit_buttons.addWidget(self.clear_hits_btn)
+        radios_layout.addLayout(hit_buttons)
+        self.radio_status = QLabel("Scanner not connected")
+        radios_layout.addWidget(self.radio_status)
+        self.radios_tab.setLayout(radios_layout)
+        self.station.freq_changed.connect(self._on_station_freq)
+        self.station.online_changed.connect(self._on_station_online)
+        self.station.status_changed.connect(self._on_station_status)
+        self.station.hit_added.connect(self._on_scanner_hit)
+
     def _ensure_vfo(self, attempts: int = 4, check_delay: float = 0.16) -> bool:
-        if not (self.serial_conn and self.serial_conn.is_open):
+        if not (self.serial_conn and self.serial_conn.is_open) or self._cat_busy:
             return False
 
         ser = self.serial_conn
@@ -993,7 +1106,7 @@ class FT991AController(QWidget):
         QTimer.singleShot(0, self.update_meters)
 
     def update_meters(self):
-        if not (self.serial_conn and self.serial_conn.is_open):
+        if not (self.serial_conn and self.serial_conn.is_open) or self._cat_busy:
             return
         if hasattr(self, "_poll_inhibit_until") and time.time() < getattr(self, "_poll_inhibit_until"):
             return
@@ -1003,24 +1116,26 @@ class FT991AController(QWidget):
 
             if self._meter_toggle:
                 self.serial_conn.reset_input_buffer()
-                self.serial_conn.write(b'RM5;')
-                resp = self.read_until_semicolon()
-                if resp.startswith('RM5') and len(resp) >= 6 and resp[3:6].isdigit():
-                    raw = int(resp[3:6])
-                    val = max(0, min(100, int(round(raw * 100 / 255))))
-                    self.pwr_meter.set_value(val)
+                self.serial_conn.write(cat.Q_RM_PO)
+                raw = cat.decode_rm(self._read_reply_view(), 5)
+                if raw is not None:
+                    self.rig_state.set_meter("PO", cat.raw_to_pct(raw))
             else:
                 self.serial_conn.reset_input_buffer()
-                self.serial_conn.write(b'RM1;')
-                resp = self.read_until_semicolon()
-                if resp.startswith('RM1') and len(resp) >= 6 and resp[3:6].isdigit():
-                    raw = int(resp[3:6])
-                    val = max(0, min(100, int(round(raw * 100 / 255))))
-                    self.s_meter.set_value(val)
+                self.serial_conn.write(cat.Q_RM_S)
+                raw = cat.decode_rm(self._read_reply_view(), 1)
+                if raw is not None:
+                    self.rig_state.set_meter("S", cat.raw_to_pct(raw))
 
         except Exception as e:
             print(f"[ERROR] Meter update failed: {e}")
 
+    def _on_meter_changed(self, name, val):
+        if name == "S":
+            self.s_meter.set_value(val)
+        elif name == "PO":
+            self.pwr_meter.set_value(val)
+
     def stop_meter_polling(self):
         t = getattr(self, "meter_timer", None)
         if t and t.isActive():
@@ -1039,20 +1154,22 @@ class FT991AController(QWidget):
         if not (1 <= ch_int <= 124):
             QMessageBox.warning(self, "Warning", f"Memory {ch_int:03d} out of range.")
             return False
+        if not self._cat_free():
+            return False
         ch = f"{ch_int:03d}"
 
         try:
             ser = self.serial_conn
             ser.reset_input_buffer()
-            ser.write(b'VM1;')
-            time.sleep(0.12)
+            ser.write(cat.VM1)
+            self._settle("VM")
 
             self._poll_inhibit_until = time.time() + 0.4
 
             ser.reset_input_buffer()
-            ser.write(f'MC{ch};'.encode('ascii'))
+            ser.write(cat.encode_mc(ch_int))
             self.cat_response_display.append(f">> MC{ch};")
-            time.sleep(0.15)
+            self._settle("MC")
 
             ser.reset_input_buffer()
             ser.write(b'MC;')
@@ -1064,6 +1181,7 @@ class FT991AController(QWidget):
             if resp.startswith('MC') and len(resp) >= 5 and resp[2:5].isdigit():
                 actual = resp[2:5]
                 ok = (actual == ch)
+                self.rig_state.set_memory(int(actual))
 
             tag = None
             try:
@@ -1081,6 +1199,42 @@ class FT991AController(QWidget):
             QMessageBox.critical(self, "Error", f"Failed to recall memory channel {ch}:\n{e}")
             return False
 
+    def _update_memory_search(self, text):
+        hits = self.memory_index.search(text)
+        self._mem_search_model.setStringList([MemoryIndex.describe(ch) for ch in hits])
+
+    def _recall_search_hit(self, text):
+        hits = self.memory_index.search(text.split("  ")[0], limit=1)
+        if not hits:
+            return
+        ch = hits[0]
+        if not (self.serial_conn and self.serial_conn.is_open and self.cat_engine):
+            QMessageBox.warning(self, "Warning", "Connect to the radio first.")
+            return
+        if not self._cat_free():
+            return
+        self._poll_inhibit_until = time.time() + 0.4
+        try:
+            # MCnnn alone selects the channel and puts the radio in memory mode
+            with self.cat_engine.lock:
+                self.cat_engine.write(cat.encode_mc(ch.channel))
+                self.cat_engine.settle_for("MC")
+                actual = cat.decode_mc(self.cat_engine.query(cat.Q_MC))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to recall memory channel {ch.channel:03d}:\n{e}")
+            return
+        if actual is None:
+            self.status_label.setText(f"❌ No MC readback after recalling {ch.channel:03d}")
+            return
+        self.rig_state.set_memory(actual)
+        if actual != ch.channel:
+            self.status_label.setText(f"❌ Asked for memory {ch.channel:03d}, radio is on {actual:03d}")
+            return
+        nice = MemoryIndex.describe(ch)
+        self.text_display.append(f"🔁 Recalled {nice}")
+        self.status_label.setText(f"Memory {nice} Active")
+        QTimer.singleShot(350, self.update_frequency_display)
+
     def read_until_semicolon(self):
         response = b""
         timeout = time.time() + 0.5
@@ -1092,6 +1246,58 @@ class FT991AController(QWidget):
                     break
         return response.decode('ascii', errors='ignore').strip()
 
+    def _cat_free(self):
+        """False while a background job owns the CAT port; GUI writes must not interleave with it."""
+        if self._cat_busy:
+            self.status_label.setText("⏳ Radio busy with a CAT job, try again when it finishes")
+            return False
+        return True
+
+    def _read_reply_view(self, timeout_s: float = 0.5):
+        # Valid only until the next read; decode it before sending again.
+        return cat.read_reply(self.serial_conn, self._rx_buf, timeout_s)
+
+    def _settle(self, kind):
+        if self.cat_engine is not None:
+            self.cat_engine.settle_for(kind)
+        else:
+            time.sleep(DEFAULT_SETTLE[kind])
+
+    def _load_settle_profile(self, port):
+        self._settle_profile_id = f"{self._radio_id or 'unknown'}_{Path(port).name}"
+        profile = SettleProfile.load(self._settle_profile_id)
+        self.cat_engine.profile = profile
+        if profile.measured_at:
+            self.cat_response_display.append(
+                f"⏱ Settle profile {self._settle_profile_id} (measured {profile.measured_at})"
+            )
+
+    def calibrate_settle_times(self):
+        if not (self.serial_conn and self.serial_conn.is_open and self.cat_engine):
+            QMessageBox.warning(self, "Warning", "Connect to the radio first.")
+            return
+        if self.calibration_worker.is_running() or self._cat_busy:
+            return
+        self._cat_busy = True
+        self.progress_bar.setValue(0)
+        self.cat_response_display.append("⏱ Calibrating settle times...")
+        self.calibration_worker.start(
+            lambda report: calibrate(self.cat_engine, self._settle_profile_id,
+                                     progress=report)
+        )
+
+    def _on_calibration_finished(self, profile):
+        self._cat_busy = False
+        path = profile.save()
+        self.cat_engine.profile = profile
+        for kind, secs in sorted(profile.delays.items()):
+            self.cat_response_display.append(f"   {kind:<4} {secs * 1000:6.0f} ms")
+        self.cat_response_display.append(f"📁 Saved to {path}")
+
+    def _on_calibration_failed(self, message):
+        self._cat_busy = False
+        QMessageBox.critical(self, "Error", f"Calibration failed:\n{message}")
+
     def _clip_rig_range(self, hz):
         try:
             hz = int(hz)
@@ -1108,42 +1314,32 @@ class FT991AController(QWidget):
         return f"{mhz}.{khz:03d}.{rhz:03d}"
 
     def _read_fa_hz(self):
-        if not (self.serial_conn and self.serial_conn.is_open):
+        if not (self.serial_conn and self.serial_conn.is_open) or self._cat_busy:
             return None
         try:
             self.serial_conn.reset_input_buffer()
-            self.serial_conn.write(b"FA;")
-            resp = self.read_until_semicolon()
-            if not (resp.startswith("FA") and resp.endswith(";")):
-                return None
-            digits = "".join(ch for ch in resp[2:-1] if ch.isdigit())
-            if not digits:
+            self.serial_conn.write(cat.Q_FA)
+            hz = cat.decode_fa(self._read_reply_view())
+            if hz is None:
                 return None
-            hz = int(digits[-11:].rjust(11, "0"))
             return self._clip_rig_range(hz)
         except Exception:
             return None
 
     def update_frequency_display(self):
-        if not (self.serial_conn and self.serial_conn.is_open):
+        if not (self.serial_conn and self.serial_conn.is_open) or self._cat_busy:
             return
         try:
             if getattr(self, "_poll_inhibit_until", 0) > time.time():
                 return
 
-            hz = self._read_fa_hz()
-            if hz is None:
-                return
-
-            if getattr(self, "_last_fa_hz", None) != hz:
-                self._last_fa_hz = hz
-                self.freq_display.setText(self._format_hz_for_display(hz))
+            self.rig_state.set_freq(self._read_fa_hz())
 
         except Exception as e:
             print(f"[ERROR] Frequency read failed: {e}")
 
     def adjust_frequency(self, step_hz):
-        if not (self.serial_conn and self.serial_conn.is_open):
+        if not (self.serial_conn and self.serial_conn.is_open) or not self._cat_free():
             return
         try:
             self._ensure_vfo()
@@ -1159,68 +1355,83 @@ class FT991AController(QWidget):
 
             self._poll_inhibit_until = time.time() + 0.35
 
-            self.serial_conn.write(f"FA{new_hz:011d};".encode("ascii"))
-            time.sleep(0.12)
+            self.serial_conn.write(cat.encode_fa(new_hz))
+            self._settle("FA")
             self.serial_conn.reset_input_buffer()
-            self.serial_conn.write(b"FA;")
-            fa = self.read_until_semicolon()
-            if fa.startswith("FA") and fa.endswith(";"):
-                digits = "".join(ch for ch in fa[2:-1] if ch.isdigit())
-                if digits:
-                    new_hz = int(digits[-11:].rjust(11, "0"))
-
-            self._last_fa_hz = new_hz
-            self.freq_display.setText(self._format_hz_for_display(new_hz))
+            self.serial_conn.write(cat.Q_FA)
+            readback = cat.decode_fa(self._read_reply_view())
+            if readback is not None:
+                new_hz = readback
+
+            self.rig_state.set_freq(new_hz)
             print(f"[DEBUG] Frequency adjusted to: FA{new_hz:011d};")
 
         except Exception as e:
             print(f"[ERROR] Frequency adjust failed: {e}")
 
-    def activate_winlink_memory(self, file):
+    def activate_preset(self, key):
+        plan = PRESET_PLANS[key]
         self.text_display.clear()
 
         if not (self.serial_conn and self.serial_conn.is_open):
             QMessageBox.warning(self, "Warning", "Connect to the radio first.")
             return
+        if self.preset_executor.is_running():
+            self.text_display.append("⏳ Another preset is still being applied.")
+            return
 
-        try:
-            ser = self.serial_conn
-            self._poll_inhibit_until = time.time() + 0.6
-
-            ser.reset_input_buffer()
-            self._apply_settings_from_file(file)
-            time.sleep(0.25)
-
-            ser.write(b'VM1;')
-            time.sleep(0.12)
-            ser.write(b'MC053;')
-            time.sleep(0.30)
+        self._cat_busy = True
+        self._preset_started = time.perf_counter()
+        self.progress_bar.setValue(0)
+        self.status_label.setText(f"⏳ Activating {plan.title}...")
+        self.text_display.append(f"📤 Applying {plan.title} from: {' + '.join(plan.layers)}\n")
+        self.preset_executor.start(plan)
 
-            ser.reset_input_buffer()
-            ser.write(b"MC;")
-            resp = self.read_until_semicolon()
-            actual = None
-            if resp.startswith("MC") and len(resp) >= 5 and resp[2:5].isdigit():
-                actual = int(resp[2:5])
+    def _on_preset_stage(self, name, seconds):
+        self.text_display.append(f"⏱ {name}: {seconds * 1000:.0f} ms")
 
-            tag = self.read_memory_tag(actual) if actual else None
+    def _on_preset_finished(self, result):
+        self._cat_busy = False
+        plan = result["plan"]
+        actual = result["memory"]
+        if actual is not None:
+            self.rig_state.set_memory(actual)
 
-            port = self.com_selector.currentText()
-            nice = f"📡 Winlink {(f'{actual:03d}' if actual else '???')}"
-            if tag:
-                nice += f" — {tag}"
+        if actual:
+            where = f"MC{actual:03d}" + (f" — {result['tag']}" if result["tag"] else "")
+        else:
+            where = "VFO"
+        for name in result["unconfirmed"]:
+            self.text_display.append(f"⚠️ Could not confirm stage '{name}'; continuing.")
+        if result["verify"]:
+            self._show_verify_table(result["verify"])
+
+        total = time.perf_counter() - self._preset_started
+        self.progress_bar.setValue(100)
+        self.status_label.setText(f"✅ {plan.title} loaded ({where})")
+        self.status_label.setStyleSheet("color: white; font-weight: bold; padding: 4px;")
+        self.text_display.append(
+            f"✅ {plan.title} activated: {result['menus']} of {result['menus_total']} menus "
+            f"sent from {result['menu_file']}, {where} ({total:.2f} s)\n"
+        )
 
-            self.status_label.setText(f"{nice} on {port}")
-            self.status_label.setStyleSheet("color: white; font-weight: bold; padding: 4px;")
-            self.text_display.append("✅ Winlink activated: preset applied, memory recalled\n")
+        QTimer.singleShot(350, self.update_frequency_display)
 
-            QTimer.singleShot(400, self.update_frequency_display)
+    def _show_verify_table(self, rows):
+        failed = sum(1 for row in rows if not row[3])
+        self.text_display.append(
+            f"🔎 Read-back: {len(rows) - failed} of {len(rows)} menus confirmed"
+        )
+        self.text_display.append(format_verify_table(rows))
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to activate Winlink:\n{e}")
+    def _on_preset_failed(self, message):
+        self._cat_busy = False
+        self.status_label.setText("Error loading preset")
+        self.status_label.setStyleSheet("color: red; font-weight: bold; padding: 4px;")
+        QMessageBox.critical(self, "Error", f"Failed to activate preset:\n{message}")
 
     def read_current_memory_channel(self):
-        if not (self.serial_conn and self.serial_conn.is_open):
+        if not (self.serial_conn and self.serial_conn.is_open) or self._cat_busy:
             return None
         try:
             ser = self.serial_conn
@@ -1244,6 +1455,7 @@ class FT991AController(QWidget):
                 return None
 
             ch = int(m.group(1))
+            self.rig_state.set_memory(ch)
             if ch == 0:
                 return None
 
@@ -1257,52 +1469,8 @@ class FT991AController(QWidget):
                 pass
             return None
 
-    def activate_mic_default_d3(self, file):
-        self.text_display.clear()
-        if not (self.serial_conn and self.serial_conn.is_open):
-            QMessageBox.warning(self, "Warning", "Connect to the radio first.")
-            return
-        try:
-            ser = self.serial_conn
-            self._poll_inhibit_until = time.time() + 0.7
-            ser.reset_input_buffer()
-            ser.reset_output_buffer()
-
-            self._apply_settings_from_file(file)
-            self.text_display.append(f"📤 Applied stripped defaults from: {file}\n")
-
-            ser.reset_input_buffer()
-            ser.write(b'VM1;')
-            _ = self.read_until_semicolon()
-            time.sleep(0.12)
-
-            ser.reset_input_buffer()
-            ser.write(b'MC004;')
-            _ = self.read_until_semicolon()
-            time.sleep(0.25)
-
-            ser.reset_input_buffer()
-            ser.write(b"MC;")
-            state = self.read_until_semicolon() or ""
-            actual = 4
-            if state.startswith("MC") and len(state) >= 5 and state[2:5].isdigit():
-                ch = int(state[2:5])
-                if ch != 0:
-                    actual = ch
-
-            tag = self.read_memory_tag(actual)
-            nice = f"🎙️ Mic default D3 (MC{actual:03d}" + (f" — {tag}" if tag else "") + ")"
-
-            self.status_label.setText(nice)
-            self.status_label.setStyleSheet("color: white; font-weight: bold; padding: 4px;")
-            self.text_display.append("✅ Mic default D3 applied: stripped defaults + DARN 3 recalled\n")
-
-            QTimer.singleShot(350, self.update_frequency_display)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to activate Mic default D3:\n{e}")
-
     def read_memory_tag(self, channel: int):
-        if not (self.serial_conn and self.serial_conn.is_open):
+        if not (self.serial_conn and self.serial_conn.is_open) or self._cat_busy:
             return None
         try:
             ser = self.serial_conn
@@ -1316,23 +1484,7 @@ class FT991AController(QWidget):
             except Exception:
                 pass
 
-            if not (resp.startswith("MT") and resp.endswith(";")):
-                return None
-
-            payload = resp[2:-1]
-            if len(payload) >= 3 and payload[:3].isdigit():
-                payload = payload[3:]
-
-            import string
-            tag = "".join(ch for ch in payload if ch in string.printable).strip()
-
-            if len(tag) > 12:
-                tag = tag[:12].rstrip()
-
-            if not tag or tag == "---":
-                return None
-
-            return tag
+            return cat.decode_mt_tag(resp.encode("ascii", errors="ignore"))
 
         except Exception as e:
             try:
@@ -1342,7 +1494,7 @@ class FT991AController(QWidget):
             return None
 
     def read_memory_summary(self, channel: int):
-        if not (self.serial_conn and self.serial_conn.is_open):
+        if not (self.serial_conn and self.serial_conn.is_open) or self._cat_busy:
             return None
         try:
             ser = self.serial_conn
@@ -1368,7 +1520,7 @@ class FT991AController(QWidget):
             return None
 
     def fetch_current_freq_mode(self):
-        if not (self.serial_conn and self.serial_conn.is_open):
+        if not (self.serial_conn and self.serial_conn.is_open) or self._cat_busy:
             return None, None
 
         freq_str = None
@@ -1399,6 +1551,7 @@ class FT991AController(QWidget):
             if md and md.startswith('MD') and len(md) >= 4:
                 code = md[2:4]
                 mode_h = mode_map.get(code, f"Unknown (MD{code})")
+                self.rig_state.set_mode(mode_h)
         except Exception as e:
             try:
                 self.cat_response_display.append(f"[fetch_current_freq_mode error] {e}")
@@ -1408,6 +1561,8 @@ class FT991AController(QWidget):
         return freq_str, mode_h
 
     def is_memory_filled(self, ch: int) -> bool:
+        if self._cat_busy:
+            return False
         try:
             self.serial_conn.reset_input_buffer()
             self.serial_conn.reset_output_buffer()
@@ -1430,12 +1585,14 @@ class FT991AController(QWidget):
         if not (self.serial_conn and self.serial_conn.is_open):
             QMessageBox.warning(self, "Warning", "Connect to the radio first.")
             return
+        if not self._cat_free():
+            return
 
         try:
             ser = self.serial_conn
             cur = self.read_current_memory_channel()
             if cur is None:
-                cur = max(1, int(getattr(self, "current_memory", 1)))
+                cur = max(1, int(self.rig_state.memory or 1))
 
             lo, hi = 1, 124
             direction = 1 if int(step) >= 0 else -1
@@ -1477,7 +1634,6 @@ class FT991AController(QWidget):
                 return
 
             tag = self.read_memory_tag(found)
-            self.current_memory = found
             nice = f"Memory {found:03d}" + (f" — {tag}" if tag else "")
             self.status_label.setText(nice)
             self.text_display.append(f"🔁 {nice}")
@@ -1489,7 +1645,8 @@ class FT991AController(QWidget):
             QMessageBox.critical(self, "Error", f"Failed to change/read memory channel:\n{e}")
 
     def _cat(self, cmd: bytes, read_reply: bool = True, timeout_s: float = 0.8) -> str:
-        if not (self.serial_conn and self.serial_conn.is_open):
+        # a worker holds _cat_lock for its whole job: don't block the GUI on it
+        if not (self.serial_conn and self.serial_conn.is_open) or self._cat_busy:
             return ""
 
         with self._cat_lock:
@@ -1511,112 +1668,6 @@ class FT991AController(QWidget):
             except Exception:
                 return ""
 
-    def activate_aprs_memory(self, file):
-        self.text_display.clear()
-
-        if not (self.serial_conn and self.serial_conn.is_open):
-            QMessageBox.warning(self, "Warning", "Connect to the radio first.")
-            return
-
-        try:
-            ser = self.serial_conn
-            self._poll_inhibit_until = time.time() + 0.6
-
-            ser.reset_input_buffer()
-            ser.reset_output_buffer()
-            self._apply_settings_from_file(file)
-            self.text_display.append(f"📤 Preset applied from: {file}\n")
-            time.sleep(0.25)
-
-            ser.reset_input_buffer()
-            ser.write(b'VM1;')
-            vm_ack = self.read_until_semicolon()
-            try:
-                self.cat_response_display.append(f">> VM1;\n<< {vm_ack or '[No Response]'}")
-            except Exception:
-                pass
-            time.sleep(0.10)
-
-            ser.reset_input_buffer()
-            cmd = b'MC052;'
-            ser.write(cmd)
-            mc_ack = self.read_until_semicolon()
-            try:
-                self.cat_response_display.append(
-                    f">> {cmd.decode('ascii')}\n<< {mc_ack or '[No Response]'}"
-                )
-            except Exception:
-                pass
-            time.sleep(0.20)
-
-            self.status_label.setText("📡 APRS memory 052 loaded + preset")
-            self.status_label.setStyleSheet("color: white; font-weight: bold; padding: 4px;")
-            self.text_display.append("✅ APRS activated: MC052 recalled and preset applied\n")
-
-            QTimer.singleShot(350, self.update_frequency_display)
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to activate APRS:\n{e}")
-
-    def activate_aprs_simplex59(self, file):
-        self.text_display.clear()
-
-        if not (self.serial_conn and self.serial_conn.is_open):
-            QMessageBox.warning(self, "Warning", "Connect to the radio first.")
-            return
-
-        try:
-            ser = self.serial_conn
-            self._poll_inhibit_until = time.time() + 0.7
-            ser.reset_input_buffer()
-            ser.reset_output_buffer()
-
-            self._apply_settings_from_file(file)
-            self.text_display.append(f"📤 Preset applied from: {file}\n")
-            time.sleep(0.25)
-
-            ser.reset_input_buffer()
-            ser.write(b'VM1;')
-            vm_ack = self.read_until_semicolon()
-            try:
-                self.cat_response_display.append(f">> VM1;\n<< {vm_ack or '[No Response]'}")
-            except Exception:
-                pass
-            time.sleep(0.12)
-
-            ser.reset_input_buffer()
-            ser.write(b'MC059;')
-            mc_ack = self.read_until_semicolon()
-            try:
-                self.cat_response_display.append(f">> MC059;\n<< {mc_ack or '[No Response]'}")
-            except Exception:
-                pass
-            time.sleep(0.25)
-
-            ser.reset_input_buffer()
-            ser.write(b"MC;")
-            state = self.read_until_semicolon()
-
-            actual = 59
-            if state.startswith("MC") and len(state) >= 5 and state[2:5].isdigit():
-                ch = int(state[2:5])
-                if ch != 0:
-                    actual = ch
-
-            tag = self.read_memory_tag(actual)
-            nice = f"📡 APRS preset → MC{actual:03d}" + (f" — {tag}" if tag else "")
-
-            self.status_label.setText(nice)
-            self.status_label.setStyleSheet("color: white; font-weight: bold; padding: 4px;")
-            self.text_display.append(
-                "✅ APRS (simplex) activated: preset applied + memory 059 recalled\n"
-            )
-
-            QTimer.singleShot(350, self.update_frequency_display)
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to activate APRS → M059:\n{e}")
-
     def connect_to_radio(self):
         port = self.com_selector.currentText()
 
@@ -1631,6 +1682,10 @@ class FT991AController(QWidget):
                 timeout=self.SERIAL_TIMEOUT,
                 write_timeout=self.SERIAL_WRITE_TIMEOUT
             )
+            self.cat_engine = CatEngine(self.serial_conn, self._cat_lock)
+            self.preset_executor.engine = self.cat_engine
+            self.yaesu.attach(self.cat_engine)
+            self._radio_id = None
 
             self.status_label.setText(f"Connected to {port}")
             self.status_label.setStyleSheet("color: white; font-weight: bold; padding: 4px;")
@@ -1647,6 +1702,7 @@ class FT991AController(QWidget):
 
             # 🔔 Immediately test CAT with ID;
             self.test_radio_response()
+            self._load_settle_profile(port)
 
         except serial.SerialException as e:
             QMessageBox.critical(self, "Error", f"Unable to open {port}:\n{e}")
@@ -1658,168 +1714,19 @@ class FT991AController(QWidget):
             self.serial_conn = None
 
 
-    def activate_ft8_memory(self, file):
-        self.text_display.clear()
-
-        if not (self.serial_conn and self.serial_conn.is_open):
-            QMessageBox.warning(self, "Warning", "Connect to the radio first.")
-            return
-
-        try:
-            ser = self.serial_conn
-            self._poll_inhibit_until = time.time() + 0.6
-
-            ser.reset_input_buffer()
-            ser.reset_output_buffer()
-            self._apply_settings_from_file(file)
-            self.text_display.append(f"📤 Preset applied from: {file}\n")
-
-            ok = self._ensure_vfo()
-            self.text_display.append(
-                "✅ VFO confirmed.\n" if ok else "⚠️ Could not confirm VFO; continuing.\n"
-            )
-
-            ser.reset_input_buffer()
-            ser.write(b"MD0C;")
-            md_ack = self.read_until_semicolon()
-            try:
-                self.cat_response_display.append(f">> MD0C;\n<< {md_ack or '[No Response]'}")
-            except Exception:
-                pass
-
-            self.status_label.setText("🎛️ FT8 preset loaded (DATA-U)")
-            self.status_label.setStyleSheet("color: white; font-weight: bold; padding: 4px;")
-            self.text_display.append("✅ FT8 activated: preset applied + DATA-U set\n")
-
-            QTimer.singleShot(350, self.update_frequency_display)
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to activate FT8:\n{e}")
-
-    def activate_default_memory(self, file):
-        self.text_display.clear()
-        if not (self.serial_conn and self.serial_conn.is_open):
-            QMessageBox.warning(self, "Warning", "Connect to the radio first.")
-            return
-
-        try:
-            ser = self.serial_conn
-            self._poll_inhibit_until = time.time() + 0.7
-            ser.reset_input_buffer()
-            ser.reset_output_buffer()
-
-            self._apply_settings_from_file(file)
-            self.text_display.append(f"📤 Preset applied from: {file}\n")
-
-            ser.reset_input_buffer()
-            ser.write(b'VM1;')
-            vm_ack = self.read_until_semicolon()
-            try:
-                self.cat_response_display.append(f">> VM1;\n<< {vm_ack or '[No Response]'}")
-            except Exception:
-                pass
-            time.sleep(0.12)
-
-            ser.reset_input_buffer()
-            ser.write(b'MC004;')
-            mc_ack = self.read_until_semicolon()
-            try:
-                self.cat_response_display.append(f">> MC004;\n<< {mc_ack or '[No Response]'}")
-            except Exception:
-                pass
-            time.sleep(0.25)
-
-            ser.reset_input_buffer()
-            ser.write(b"MC;")
-            state = self.read_until_semicolon()
-
-            actual = 4
-            if state.startswith("MC") and len(state) >= 5 and state[2:5].isdigit():
-                ch = int(state[2:5])
-                if ch != 0:
-                    actual = ch
-
-            tag = self.read_memory_tag(actual)
-            nice = f"🎛️ Default preset loaded (MC{actual:03d}" + (f" — {tag})" if tag else ")")
-
-            self.status_label.setText(nice)
-            self.status_label.setStyleSheet("color: white; font-weight: bold; padding: 4px;")
-            self.text_display.append("✅ Default activated: preset applied and memory recalled\n")
-
-            QTimer.singleShot(350, self.update_frequency_display)
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to activate Default:\n{e}")
-
-    def activate_default2_memory(self, file):
-        self.text_display.clear()
-        if not (self.serial_conn and self.serial_conn.is_open):
-            QMessageBox.warning(self, "Warning", "Connect to the radio first.")
-            return
-
-        try:
-            ser = self.serial_conn
-            self._poll_inhibit_until = time.time() + 0.7
-            ser.reset_input_buffer()
-            ser.reset_output_buffer()
-
-            self._apply_settings_from_file(file)
-            self.text_display.append(f"📤 Preset applied from: {file}\n")
-
-            ser.reset_input_buffer()
-            ser.write(b'VM1;')
-            vm_ack = self.read_until_semicolon()
-            try:
-                self.cat_response_display.append(f">> VM1;\n<< {vm_ack or '[No Response]'}")
-            except Exception:
-                pass
-            time.sleep(0.12)
-
-            ser.reset_input_buffer()
-            ser.write(b'MC059;')
-            mc_ack = self.read_until_semicolon()
-            try:
-                self.cat_response_display.append(f">> MC058;\n<< {mc_ack or '[No Response]'}")
-            except Exception:
-                pass
-            time.sleep(0.25)
-
-            ser.reset_input_buffer()
-            ser.write(b"MC;")
-            state = self.read_until_semicolon()
-
-            actual = 58
-            if state.startswith("MC") and len(state) >= 5 and state[2:5].isdigit():
-                ch = int(state[2:5])
-                if ch != 0:
-                    actual = ch
-
-            tag = self.read_memory_tag(actual)
-            nice = f"🎛️ Default 2 preset loaded (MC{actual:03d}" + (f" — {tag})" if tag else ")")
-
-            self.status_label.setText(nice)
-            self.status_label.setStyleSheet("color: white; font-weight: bold; padding: 4px;")
-            self.text_display.append("✅ Default 2 activated: preset applied and memory 058 recalled\n")
-
-            QTimer.singleShot(350, self.update_frequency_display)
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to activate Default 2:\n{e}")
-
     def _poll_tx_status(self):
         if not (self.serial_conn and self.serial_conn.is_open):
-            if hasattr(self, "tx_led"):
-                self.tx_led.set_on(False)
+            self.rig_state.set_tx(False)
+            return
+        if self._cat_busy:
             return
 
         try:
             ser = self.serial_conn
 
             ser.reset_input_buffer()
-            ser.write(b"TX;")
-            tx_reply = self.read_until_semicolon()
-
-            is_tx = self._parse_tx_from_tx_reply(tx_reply)
+            ser.write(cat.Q_TX)
+            is_tx = cat.decode_tx(self._read_reply_view())
 
             if is_tx is None:
                 ser.reset_input_buffer()
@@ -1836,17 +1743,10 @@ class FT991AController(QWidget):
                     raw = int(rm[3:6])
                 is_tx = (raw >= 10)
 
-            self.tx_led.set_on(bool(is_tx))
+            self.rig_state.set_tx(is_tx)
 
         except Exception:
-            self.tx_led.set_on(False)
-
-    def _parse_tx_from_tx_reply(self, tx_reply: str):
-        if not (isinstance(tx_reply, str) and tx_reply.startswith("TX") and tx_reply.endswith(";")):
-            return None
-        if len(tx_reply) >= 4 and tx_reply[2] in "01":
-            return tx_reply[2] == "1"
-        return None
+            self.rig_state.set_tx(False)
 
     def _parse_tx_from_if(self, if_reply: str):
         if not (isinstance(if_reply, str) and if_reply.startswith("IF") and if_reply.endswith(";")):
@@ -1867,137 +1767,445 @@ class FT991AController(QWidget):
 
         return None
 
-    def activate_wiresx_memory(self, file):
-        self.text_display.clear()
-        if not (self.serial_conn and self.serial_conn.is_open):
-            QMessageBox.warning(self, "Warning", "Connect to the radio first.")
+    def send_cat_command(self):
+        if not self.serial_conn or not self._cat_free():
             return
+        cmd = self.cat_input.text().strip()
+        if not cmd.endswith(";"):
+            cmd += ";"
+        if (self.verify_writes_chk.isChecked() and self.cat_engine is not None
+                and len(cmd) > 6 and cmd.startswith("EX") and cmd[2:5].isdigit()):
+            self.cat_engine.write(cmd.encode("ascii"))
+            self.cat_engine.settle_for("EX")
+            rows = verify_menus(self.cat_engine, [(int(cmd[2:5]), cmd[5:-1].encode("ascii"))])
+            self.cat_response_display.append(f">> {cmd}\n{format_verify_table(rows)}")
+            return
+        self.serial_conn.write(cmd.encode())
+        self._settle("CMD")
+        resp = self.serial_conn.read_all().decode(errors="ignore")
+        self.cat_response_display.append(f">> {cmd}\n<< {resp if resp else '[No Response]'}")
 
+    def import_win4yaesu_settings(self):
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Import Win4Yaesu Settings", str(BASE_DIR.parent / "old_presets"),
+            "XML Files (*.xml)"
+        )
+        if not filename:
+            return
         try:
-            ser = self.serial_conn
-            self._poll_inhibit_until = time.time() + 0.7
-            ser.reset_input_buffer()
-            ser.reset_output_buffer()
-
-            self._apply_settings_from_file(file)
-            self.text_display.append(f"📤 Preset applied from: {file}\n")
-
-            ser.reset_input_buffer()
-            ser.write(b'VM1;')
-            vm_ack = self.read_until_semicolon()
-            try:
-                self.cat_response_display.append(f">> VM1;\n<< {vm_ack or '[No Response]'}")
-            except Exception:
-                pass
-            time.sleep(0.12)
-
-            ser.reset_input_buffer()
-            ser.write(b'MC001;')
-            mc_ack = self.read_until_semicolon()
-            try:
-                self.cat_response_display.append(f">> MC001;\n<< {mc_ack or '[No Response]'}")
-            except Exception:
-                pass
-            time.sleep(0.25)
-
-            ser.reset_input_buffer()
-            ser.write(b"MC;")
-            state = self.read_until_semicolon()
-
-            actual = 1
-            if state.startswith("MC") and len(state) >= 5 and state[2:5].isdigit():
-                ch = int(state[2:5])
-                if ch != 0:
-                    actual = ch
-
-            tag = self.read_memory_tag(actual)
-            nice = f"📡 WIRES-X memory MC{actual:03d}" + (f" — {tag}" if tag else "")
+            imported = import_settings(filename)
+        except (OSError, ET.ParseError) as e:
+            QMessageBox.critical(self, "Error", f"Could not read Win4Yaesu settings:\n{e}")
+            return
 
-            self.status_label.setText(nice)
-            self.status_label.setStyleSheet("color: white; font-weight: bold; padding: 4px;")
-            self.text_display.append("✅ WIRES-X activated: memory recalled and preset applied\n")
+        for btn in self.fn_macro_buttons:
+            self.fn_macro_row.removeWidget(btn)
+            btn.deleteLater()
+        self.fn_macro_buttons = []
+
+        for macro in imported.macros:
+            btn = QPushButton(macro.label)
+            if macro.skipped:
+                btn.setToolTip(
+                    f"{macro.name}: {macro.source}\n"
+                    f"Not supported by the radio: {' '.join(macro.skipped)}"
+                )
+            else:
+                btn.setToolTip(f"{macro.name}: {macro.source}")
+            btn.setEnabled(bool(macro.data))
+            btn.clicked.connect(partial(self.run_fn_macro, macro))
+            self.fn_macro_row.addWidget(btn)
+            self.fn_macro_buttons.append(btn)
+
+        if imported.com_port and self.com_selector.findText(imported.com_port) >= 0:
+            self.com_selector.setCurrentText(imported.com_port)
+        if imported.baud_rate:
+            self.BAUD = imported.baud_rate
+
+        usable = sum(1 for m in imported.macros if m.data)
+        self.cat_response_display.append(
+            f"📂 Imported {len(imported.macros)} macros ({usable} usable) from {Path(filename).name}; "
+            f"port {imported.com_port or '-'} @ {imported.baud_rate or self.BAUD}"
+        )
 
-            QTimer.singleShot(350, self.update_frequency_display)
+    def run_fn_macro(self, macro):
+        if not (self.serial_conn and self.serial_conn.is_open and self.cat_engine):
+            QMessageBox.warning(self, "Warning", "Connect to the radio first.")
+            return
+        if not self._cat_free():
+            return
+        self.cat_engine.write(macro.data)
+        for cmd in macro.data.split(b";"):
+            if cmd.startswith(b"EX") and cmd[2:5].isdigit():
+                self.cat_engine.menu_cache.pop(int(cmd[2:5]), None)
+        self.cat_response_display.append(f">> {macro.label}: {macro.data.decode('ascii')}")
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to activate WIRES-X:\n{e}")
+    def load_macro_file(self):
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Load Macro", str(BASE_DIR), "Macro Files (*.macro *.txt)"
+        )
+        if filename:
+            self.macro_editor.setPlainText(Path(filename).read_text(encoding="utf-8"))
 
-    def activate_ssb_memory(self, file):
-        self.text_display.clear()
-        if not (self.serial_conn and self.serial_conn.is_open):
+    def run_macro_text(self):
+        if not (self.serial_conn and self.serial_conn.is_open and self.cat_engine):
             QMessageBox.warning(self, "Warning", "Connect to the radio first.")
             return
+        if self.macro_worker.is_running() or self._cat_busy:
+            return
         try:
-            ser = self.serial_conn
+            steps = compile_macro(self.macro_editor.toPlainText())
+        except ValueError as e:
+            QMessageBox.warning(self, "Macro", f"Macro not run:\n{e}")
+            return
+        if not steps:
+            return
+        self._cat_busy = True
+        self.progress_bar.setValue(0)
+        writes = sum(1 for step in steps if step.kind == "send")
+        self.cat_response_display.append(f"▶ Macro: {len(steps)} steps, {writes} writes")
+        engine = self.cat_engine
+        self.macro_worker.start(lambda report: run_macro(engine, steps, report))
 
-            self._poll_inhibit_until = time.time() + 0.8
-            ser.reset_input_buffer()
-            ser.reset_output_buffer()
+    def _on_macro_finished(self, result):
+        self._cat_busy = False
+        # a macro can send anything, including EX writes
+        self.cat_engine.menu_cache.clear()
+        self.cat_response_display.append(
+            f"✅ Macro done: {result['commands']} commands in {result['steps']} steps"
+        )
+        QTimer.singleShot(100, self.update_frequency_display)
 
-            self._apply_settings_from_file(file)
-            self.text_display.append(f"📤 Preset applied from: {file}\n")
+    def _on_macro_failed(self, message):
+        self._cat_busy = False
+        if self.cat_engine is not None:
+            self.cat_engine.menu_cache.clear()
+        self.cat_response_display.append(f"❌ Macro stopped: {message}")
+
+    def toggle_scanner(self):
+        if self.scanner.is_open():
+            self.scanner.close()
+            self.scanner_connect_btn.setText("📡 Connect Scanner")
+            self.radio_status.setText("Scanner disconnected")
+            return
+        host = self.scanner_host_input.text().strip()
+        if not host:
+            QMessageBox.warning(self, "Warning", "Enter the scanner's IP address.")
+            return
+        if not self.scanner.open(host):
+            self.radio_status.setText("⚠️ Scanner is still shutting down, try again")
+            return
+        self.scanner_connect_btn.setText("⏹ Disconnect Scanner")
+        self.radio_status.setText(f"⏳ Polling SDS200 at {host}...")
+
+    def _on_scanner_failed(self, message):
+        self.scanner_connect_btn.setText("📡 Connect Scanner")
+        self.radio_status.setText(f"❌ Scanner: {message}")
+
+    def _on_station_freq(self, name, hz):
+        if name == self.yaesu.name:
+            self.rig_freq_label.setText(f"FT-991A   {self._format_hz_for_display(hz)}")
+
+    def _on_station_online(self, name, online):
+        if name == self.yaesu.name and not online:
+            self.rig_freq_label.setText("FT-991A   offline")
+        elif name == self.scanner.name:
+            if online:
+                self.radio_status.setText("✅ Scanner online")
+                return
+            self.scanner_freq_label.setText("SDS200    offline")
+            # after a disconnect or a failure the status line already says why
+            if self.scanner.is_open():
+                self.radio_status.setText("⚠️ Scanner not answering")
 
-            ser.reset_input_buffer()
-            ser.write(b'VM1;')
-            vm_ack = self.read_until_semicolon()
-            try:
-                self.cat_response_display.append(f">> VM1;\n<< {vm_ack or '[No Response]'}")
-            except Exception:
-                pass
-            time.sleep(0.12)
+    def _on_station_status(self, name, status):
+        if name != self.scanner.name:
+            return
+        freq = self._format_hz_for_display(status.freq_hz) if status.freq_hz else "---"
+        where = " / ".join(p for p in (status.system, status.department) if p)
+        squelch = "🔇" if status.muted else "🔊"
+        self.scanner_freq_label.setText(
+            f"SDS200    {freq} {status.mod:<4} {squelch} {status.channel}  {where}"
+        )
 
-            ser.reset_input_buffer()
-            ser.write(b'MC060;')
-            mc_ack = self.read_until_semicolon()
-            try:
-                self.cat_response_display.append(f">> MC060;\n<< {mc_ack or '[No Response]'}")
-            except Exception:
-                pass
-            time.sleep(0.25)
+    def _on_scanner_hit(self, hit):
+        st = hit.status
+        stamp = time.strftime("%H:%M:%SZ", time.gmtime(hit.when))
+        text = f"{stamp}  {self._format_hz_for_display(st.freq_hz)} {st.mod:<4} {st.channel}"
+        if st.system:
+            text += f"  ({st.system})"
+        if not self.yaesu.can_tune(st.freq_hz):
+            text += "  [outside 991A range]"
+        item = QListWidgetItem(text)
+        item.setData(Qt.ItemDataRole.UserRole, hit)
+        self.hit_list.insertItem(0, item)
+        while self.hit_list.count() > StationState.HIT_HISTORY:
+            self.hit_list.takeItem(self.hit_list.count() - 1)
+        if self.follow_hits_check.isChecked():
+            self.tune_rig_to_hit(hit)
+
+    def tune_to_selected_hit(self, item=None):
+        item = item or self.hit_list.currentItem() or self.hit_list.item(0)
+        if item is None:
+            return
+        self.tune_rig_to_hit(item.data(Qt.ItemDataRole.UserRole))
 
-            ser.reset_input_buffer()
-            ser.write(b"MD;")
-            md = self.read_until_semicolon()
-            if not (md.startswith("MD") and len(md) >= 4 and md[2:4] == "00"):
-                ser.reset_input_buffer()
-                ser.write(b"MD00;")
-                md_ack = self.read_until_semicolon()
-                try:
-                    self.cat_response_display.append(f">> MD00;\n<< {md_ack or '[No Response]'}")
-                except Exception:
-                    pass
-                time.sleep(0.12)
+    def tune_rig_to_hit(self, hit):
+        st = hit.status
+        if not self.yaesu.is_open():
+            self.radio_status.setText("⚠️ Connect the 991A to tune it to scanner hits")
+            return
+        if not self.yaesu.can_tune(st.freq_hz):
+            self.radio_status.setText(
+                f"⚠️ {self._format_hz_for_display(st.freq_hz)} is outside the 991A receive range"
+            )
+            return
+        if self._cat_busy and not self.yaesu.is_busy():
+            self.radio_status.setText("⏳ 991A is busy with another CAT job")
+            return
+        self._cat_busy = True
+        if not self.yaesu.tune(st.freq_hz, SCANNER_MODES.get(st.mod.upper())):
+            self._cat_busy = self.yaesu.is_busy()
+            return
+        self.radio_status.setText(
+            f"📻 Tuning 991A to {self._format_hz_for_display(st.freq_hz)} {st.mod} ({st.channel})"
+        )
 
-            ser.reset_input_buffer()
-            ser.write(b"MC;")
-            state = self.read_until_semicolon()
-            actual = 60
-            if state.startswith("MC") and len(state) >= 5 and state[2:5].isdigit():
-                ch = int(state[2:5])
-                if ch != 0:
-                    actual = ch
-
-            tag = self.read_memory_tag(actual)
-            nice = f"🎙️ SSB preset loaded (MC{actual:03d})" + (f" — {tag}" if tag else "")
-            self.status_label.setText(nice)
-            self.status_label.setStyleSheet("color: white; font-weight: bold; padding: 4px;")
-            self.text_display.append("✅ SSB activated: preset applied and memory recalled\n")
+    def _on_yaesu_idle(self):
+        self._cat_busy = False
 
-            QTimer.singleShot(350, self.update_frequency_display)
+    def lookup_dx_call(self):
+        call = self.dx_call_input.text().strip()
+        if not call:
+            return
+        if self.cty is None:
+            # mapping the compiled index is instant; compiling it the first time is not
+            self._cty_pending = call
+            if not self.cty_worker.is_running():
+                self.dx_result.setText("⏳ Loading cty.gz...")
+                self.cty_worker.start(lambda report: open_index(CTY_PATH))
+            return
+        info = self.cty.resolve(call)
+        if info is None:
+            self.dx_result.setText(f"❓ {call.upper()}: no DXCC entity")
+            return
+        text = (f"{info.call}: {info.entity} (ADIF {info.adif}), CQ {info.cqz}, {info.cont}, "
+                f"{info.lat:.2f}, {info.lon:.2f}")
+        if self.station_geo is not None:
+            geo = self.station_geo.point(info.lat, info.lon)
+            text += (f"\n🧭 {geo['bearing']:.0f}° (LP {geo['long_path']:.0f}°), {geo['km']:,.0f} km, "
+                     f"sun {format_hours(geo['sunrise'])} - {format_hours(geo['sunset'])}")
+        self.dx_result.setText(text)
+
+    def set_station_grid(self):
+        grid = self.dx_grid_input.text().strip()
+        if not grid:
+            return
+        try:
+            lat, lon = save_station(grid)
+        except ValueError as e:
+            self.dx_result.setText(f"❌ {e}")
+            return
+        except OSError as e:
+            print(f"[DEBUG] station not saved: {e}")
+            lat, lon = grid_to_latlon(grid)
+        self.station_geo = StationGeo(lat, lon)
+        if self.cty is not None and self.dx_call_input.text().strip():
+            self.lookup_dx_call()
+
+    def update_cty_file(self):
+        if self.cty_worker.is_running():
+            return
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Update cty", str(Path.home()), "ClubLog cty (*.gz *.xml)"
+        )
+        if not filename:
+            return
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to activate SSB:\n{e}")
+        def job(report):
+            result = update_cty(filename, CTY_PATH)
+            how = "rebuilt" if result["rebuilt"] else "patched"
+            report(text=f"✅ cty {result['version']}: {result['patched']} changed, "
+                        f"{result['added']} added, {result['removed']} removed ({how})")
+            return open_index(CTY_PATH)
+
+        self._cty_pending = ""
+        self.dx_result.setText("⏳ Updating cty...")
+        self.cty_worker.start(job)
+
+    def _on_cty_loaded(self, resolver):
+        old = self.cty
+        if old is not None and old is not resolver and hasattr(old, "close"):
+            # the SCP build may still be reading the old index: close it when done
+            if self.scp_worker.is_running() and old is self._scp_source:
+                self._cty_retired.append(old)
+            else:
+                old.close()
+        self.cty = resolver
+        print(f"[DEBUG] cty loaded, version {resolver.version}")
+        self._start_scp_build()
+        if self._cty_pending:
+            self.lookup_dx_call()
+
+    def _start_scp_build(self):
+        if self.cty is None:
+            if not self.cty_worker.is_running():
+                self.cty_worker.start(lambda report: open_index(CTY_PATH))
+            return
+        if self.scp_worker.is_running():
+            return
+        resolver = self.cty
+        self._scp_source = resolver
+
+        def job(report):
+            master = load_master(SCP_MASTER_PATH) if SCP_MASTER_PATH.exists() else ()
+            return PartialIndex.from_cty(resolver, master)
+
+        self.scp_worker.start(job)
+
+    def _on_scp_built(self, index):
+        self.scp = index
+        print(f"[DEBUG] SCP index ready: {len(index)} calls")
+        self._after_scp_build()
+        self._update_dx_suggestions(self.dx_call_input.text())
+
+    def _on_scp_failed(self, message):
+        print(f"[DEBUG] SCP index failed: {message}")
+        self._after_scp_build()
+
+    def _after_scp_build(self):
+        for old in self._cty_retired:
+            old.close()
+        self._cty_retired = []
+        # cty was updated while building: the new index gets its own build
+        if self.cty is not None and self.cty is not self._scp_source:
+            self._start_scp_build()
+
+    def _update_dx_suggestions(self, text):
+        # built on first keystroke, never at startup
+        if self.scp is None:
+            self._start_scp_build()
+            return
+        self._dx_scp_model.setStringList(self.scp.search(text))
 
-    def send_cat_command(self):
-        if not self.serial_conn:
+    @staticmethod
+    def _memory_line(ch):
+        if ch is None:
+            return "(empty)"
+        shift = "(radio)" if ch.shift is None else SHIFT_NAMES.get(ch.shift, "?")
+        ctcss = "(radio)" if ch.ctcss is None else CTCSS_NAMES.get(ch.ctcss, "?")
+        return f"{ch.freq_hz / 1e6:11.5f} {ch.mode:<8} {shift:<11} {ctcss:<13} {ch.tag}"
+
+    def load_channel_plan_file(self):
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Load Channel Plan", str(BASE_DIR.parent / "old_presets"),
+            f"Channel Plans (*.xml *.csv *{BIN_SUFFIX})"
+        )
+        if not filename:
             return
-        cmd = self.cat_input.text().strip()
-        if not cmd.endswith(";"):
-            cmd += ";"
-        self.serial_conn.write(cmd.encode())
-        time.sleep(0.2)
-        resp = self.serial_conn.read_all().decode(errors="ignore")
-        self.cat_response_display.append(f">> {cmd}\n<< {resp if resp else '[No Response]'}")
+        try:
+            plan = read_plan(filename)
+        except (OSError, ValueError, KeyError, ET.ParseError) as e:
+            QMessageBox.critical(self, "Error", f"Could not read channel plan:\n{e}")
+            return
+        self.memory_programmer = MemoryProgrammer(self.cat_engine, plan)
+        self.memory_index = MemoryIndex(plan.values())
+        self.mem_display.clear()
+        for num, ch in sorted(plan.items()):
+            self.mem_display.append(f"{channel_name(num):>5}  {self._memory_line(ch)}")
+        self.mem_status.setText(f"{len(plan)} channels in {Path(filename).name}")
+
+    def export_memories_file(self):
+        if not (self.serial_conn and self.serial_conn.is_open and self.cat_engine):
+            QMessageBox.warning(self, "Warning", "Connect to the radio first.")
+            return
+        if self.memory_worker.is_running() or self._cat_busy:
+            return
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Export Memories", "FT991A_memories.csv",
+            f"CSV (*.csv);;Binary (*{BIN_SUFFIX})"
+        )
+        if not filename:
+            return
+        path = Path(filename)
+        csv_path = path if path.suffix.lower() != BIN_SUFFIX else None
+        bin_path = path if csv_path is None else None
+        reader = MemoryProgrammer(self.cat_engine, {})
+        channels = range(cat.MEM_MIN, cat.MEM_MAX + 1)
+        self._cat_busy = True
+        self.mem_progress.setValue(0)
+        self.mem_status.setText("Exporting memories...")
+        self.memory_worker.start(
+            lambda report: ("export", (path.name, export_memories(reader, channels, csv_path,
+                                                                  bin_path, report)))
+        )
+
+    def _start_memory_job(self, job):
+        if not (self.serial_conn and self.serial_conn.is_open and self.cat_engine):
+            QMessageBox.warning(self, "Warning", "Connect to the radio first.")
+            return False
+        if self.memory_programmer is None:
+            QMessageBox.warning(self, "Warning", "Load a channel plan first.")
+            return False
+        if self.memory_worker.is_running() or self._cat_busy:
+            return False
+        self.memory_programmer.engine = self.cat_engine
+        self._cat_busy = True
+        self.mem_progress.setValue(0)
+        self.memory_worker.start(job)
+        return True
+
+    def compare_memories(self):
+        prog = self.memory_programmer
+        if self._start_memory_job(lambda report: ("compare", prog.compare(report))):
+            self.mem_status.setText("Reading memories...")
+
+    def write_memories(self):
+        prog = self.memory_programmer
+        if self._start_memory_job(lambda report: ("write", prog.run(report))):
+            self.mem_status.setText("Writing memories...")
+
+    def stop_memory_job(self):
+        if self.memory_programmer is not None:
+            self.memory_programmer.stop()
+
+    def _on_memory_job_finished(self, outcome):
+        self._cat_busy = False
+        kind, result = outcome
+        prog = self.memory_programmer
+        if kind == "export":
+            name, rows = result
+            self.mem_status.setText(f"📁 {rows} channels exported to {name}")
+            return
+        if kind == "compare":
+            self.memory_index = MemoryIndex(ch for ch in prog.radio.values() if ch is not None)
+            self.mem_display.clear()
+            for want in result:
+                have = prog.radio.get(want.channel)
+                self.mem_display.append(
+                    f"{channel_name(want.channel):>5}  radio: {self._memory_line(have)}\n"
+                    f"       plan:  {self._memory_line(want)}"
+                )
+            self.mem_status.setText(
+                f"{len(result)} of {len(prog.plan)} channels differ from the plan"
+            )
+            return
+
+        msg = f"✅ {result['written']} channels written in {result['seconds']:.1f} s"
+        if result["failed"]:
+            msg += f", ❌ failed: {', '.join(result['failed'])}"
+        if result["remaining"]:
+            msg += f", ⏸ {result['remaining']} left (Write again to resume)"
+        self.mem_status.setText(msg)
+        self.mem_display.append(msg)
+
+    def _on_memory_job_failed(self, message):
+        self._cat_busy = False
+        self.mem_status.setText(f"❌ {message}")
+        if self.memory_programmer is not None and self.memory_programmer.pending:
+            self.mem_display.append(
+                f"⏸ {len(self.memory_programmer.pending)} channels left; Write again to resume"
+            )
 
     def connect_cat_send(self):
         self.cat_input.returnPressed.connect(
@@ -2016,45 +2224,33 @@ class FT991AController(QWidget):
         if not (self.serial_conn and self.serial_conn.is_open):
             QMessageBox.warning(self, "Warning", "Connect to the radio first.")
             return
+        if not self._cat_free():
+            return
 
         was_meter_running = hasattr(self, "meter_timer") and self.meter_timer.isActive()
         was_freq_running = hasattr(self, "freq_timer") and self.freq_timer.isActive()
+        root = None
         try:
             if was_meter_running:
                 self.meter_timer.stop()
             if was_freq_running:
                 self.freq_timer.stop()
 
-            total = len(MENU_DESCRIPTIONS)
             self.progress_bar.setValue(0)
             self.text_display.clear()
 
-            root = ET.Element("YaesuMenuItems")
-
-            for idx, (num, (desc, opt_range, unit)) in enumerate(MENU_DESCRIPTIONS.items()):
-                cmd = f"EX{num};"
-
-                self.serial_conn.reset_input_buffer()
-                self.serial_conn.write(cmd.encode("ascii"))
-                decoded = self.read_until_semicolon()
-
-                menu = ET.SubElement(root, "YaesuFT991A_MenuItems")
-                ET.SubElement(menu, "MENU_NUMBER").text = num
-                ET.SubElement(menu, "DESCRIPTION").text = desc
-
-                val = "----"
-                if decoded.startswith(f"EX{num}") and decoded.endswith(";") and len(decoded) >= 6:
-                    val = decoded[5:-1] or "----"
-
-                ET.SubElement(menu, "MENU_VALUE").text = val
-
-                unit_str = f" {unit}" if unit else ""
-                line = f"{num}\t{val}{unit_str}  {desc}    ({opt_range})"
-                self.text_display.append(line)
-
-                pct = int((idx + 1) / total * 100)
-                self.progress_bar.setValue(pct)
-                QApplication.processEvents()
+            values = self._read_all_menus()
+            root = self._menu_dump_xml(values, "YaesuMenuItems")
+            for num, spec in SCHEMA.items():
+                val = values.get(num)
+                shown = describe(num, val) if val is not None else "----"
+                self.text_display.append(
+                    f"{num:03d}\t{shown}  {spec.description}    ({spec.range_text})"
+                )
+            if len(values) < len(SCHEMA):
+                self.text_display.append(
+                    f"⚠️ {len(SCHEMA) - len(values)} menus did not answer"
+                )
 
             self._last_menu_dump = root
 
@@ -2066,6 +2262,8 @@ class FT991AController(QWidget):
             if was_freq_running:
                 self.freq_timer.start(500)
 
+        if root is None:
+            return
         choice = QMessageBox.question(
             self,
             "Save Settings",
@@ -2085,9 +2283,14 @@ class FT991AController(QWidget):
                 self.text_display.append(f"\n📁 Settings saved to: {filename}")
 
     def disconnect_from_radio(self):
+        # a preset, macro or tune job still holds the port; closing it would cut the job off mid-write
+        if not self._cat_free():
+            return
         if self.serial_conn and self.serial_conn.is_open:
+            self.yaesu.detach()
             self.serial_conn.close()
             self.serial_conn = None
+            self.rig_state.reset()
             self.connect_btn.setStyleSheet(
                 "QPushButton { background-color: white; color: black; font-weight: bold; }"
             )
@@ -2103,6 +2306,8 @@ class FT991AController(QWidget):
         if not (self.serial_conn and self.serial_conn.is_open):
             QMessageBox.warning(self, "Warning", "Connect to the radio first.")
             return
+        if not self._cat_free():
+            return
 
         was_meter_running = hasattr(self, "meter_timer") and self.meter_timer.isActive()
         was_freq_running = hasattr(self, "freq_timer") and self.freq_timer.isActive()
@@ -2119,10 +2324,10 @@ class FT991AController(QWidget):
             before = self.read_until_semicolon() or ""
             in_vfo = before.startswith("MC") and len(before) >= 5 and before[2:5] == "000"
 
-            target_cmd = b"VM1;" if in_vfo else b"VM0;"
+            target_cmd = cat.VM1 if in_vfo else cat.VM0
             ser.reset_input_buffer()
             ser.write(target_cmd)
-            time.sleep(0.12)
+            self._settle("VM")
 
             ser.reset_input_buffer()
             ser.write(b"MC;")
@@ -2162,6 +2367,8 @@ class FT991AController(QWidget):
         if not (self.serial_conn and self.serial_conn.is_open):
             QMessageBox.warning(self, "Warning", "Connect to the radio first.")
             return False
+        if not self._cat_free():
+            return False
 
         was_meter_running = hasattr(self, "meter_timer") and self.meter_timer.isActive()
         was_freq_running = hasattr(self, "freq_timer") and self.freq_timer.isActive()
@@ -2183,6 +2390,7 @@ class FT991AController(QWidget):
 
             if resp and resp.startswith('ID') and resp.endswith(';'):
                 ident = resp[2:-1]
+                self._radio_id = ident
                 self.text_display.append(f"✅ Test response from radio: {resp} (ID={ident})")
                 self.status_label.setText("Radio responded to test command")
                 self.status_label.setStyleSheet(
@@ -2225,30 +2433,27 @@ class FT991AController(QWidget):
             if not path.is_absolute():
                 path = BASE_DIR / path
 
-            tree = ET.parse(str(path))
-            root = tree.getroot()
-            items = root.findall("YaesuFT991A_MenuItems")
-            total = len(items)
+            preset = load_compiled(path)
+            good, errors = validate_menus(zip(preset.menus, preset.values), self.menu_validators)
+            if errors:
+                QMessageBox.warning(
+                    self, "Invalid preset",
+                    f"{path.name} was not sent:\n\n{format_errors(errors)}"
+                )
+                self.status_label.setText("Preset rejected")
+                self.status_label.setStyleSheet("color: red; font-weight: bold; padding: 4px;")
+                return
+
+            if self.menu_worker.is_running() or self._cat_busy:
+                return
+            self._cat_busy = True
             self.progress_bar.setValue(0)
             self.text_display.append(
-                f"\n📤 Uploading {total} menu settings from {path.name}...\n"
+                f"\n📤 Uploading {len(good)} menu settings from {path.name}...\n"
             )
-
-            for idx, item in enumerate(items):
-                num = item.find("MENU_NUMBER").text.strip().zfill(3)
-                val = item.find("MENU_VALUE").text.strip()
-                cmd = f"EX{num}{val};"
-                self.serial_conn.write(cmd.encode())
-                self.text_display.append(f"⏩ Sent: {num} → {val}")
-                self.progress_bar.setValue(int((idx + 1) / total * 100))
-                self.progress_bar.repaint()
-                QApplication.processEvents()
-                time.sleep(0.02)
-
-            self.progress_bar.setValue(100)
-            self.status_label.setText(f"✅ Preset loaded from {path.name}")
-            self.status_label.setStyleSheet(
-                "color: black; font-weight: bold; padding: 4px;"
+            engine = self.cat_engine or CatEngine(self.serial_conn, self._cat_lock)
+            self.menu_worker.start(
+                lambda report: (path.name, good, apply_menus(engine, good, report))
             )
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to load preset: {e}")
@@ -2257,6 +2462,62 @@ class FT991AController(QWidget):
                 "color: red; font-weight: bold; padding: 4px;"
             )
 
+    def _read_all_menus(self):
+        """Every EX menu in one pipelined pass, with the progress bar following along."""
+        def progress(pct):
+            self.progress_bar.setValue(pct)
+            QApplication.processEvents()
+
+        engine = self.cat_engine or CatEngine(self.serial_conn, self._cat_lock)
+        return engine.read_menus(MENU_NUMBERS, progress)
+
+    @staticmethod
+    def _menu_dump_xml(values, root_tag):
+        root = ET.Element(root_tag)
+        for num, spec in SCHEMA.items():
+            menu = ET.SubElement(root, "YaesuFT991A_MenuItems")
+            ET.SubElement(menu, "MENU_NUMBER").text = f"{num:03d}"
+            ET.SubElement(menu, "DESCRIPTION").text = spec.description
+            val = values.get(num)
+            ET.SubElement(menu, "MENU_VALUE").text = val.decode("ascii") if val is not None else "----"
+        return root
+
+    def _on_menus_applied(self, outcome):
+        self._cat_busy = False
+        name, good, result = outcome
+        sent = dict(good)
+        if self.verify_writes_chk.isChecked() and result["table"]:
+            self._show_verify_table(result["table"])
+        if not result["rolled_back"]:
+            self.text_display.append(
+                "\n".join(f"⏩ Sent: {num:03d} → {describe(num, sent[num])}  {SCHEMA[num].description}"
+                          for num in sorted(sent))
+            )
+            self.progress_bar.setValue(100)
+            self.status_label.setText(
+                f"✅ Preset loaded from {name} "
+                f"({result['applied']} changed, {result['unchanged']} already set)"
+            )
+            self.status_label.setStyleSheet("color: black; font-weight: bold; padding: 4px;")
+            return
+
+        bad = ", ".join(f"{n:03d}" for n in result["mismatched"])
+        self.text_display.append(f"❌ Menus did not take: {bad}")
+        if result["rollback_failed"]:
+            left = ", ".join(f"{n:03d}" for n in result["rollback_failed"])
+            self.text_display.append(f"⚠️ Could not restore: {left}")
+            self.status_label.setText(f"⚠️ {name} failed, rollback incomplete")
+        else:
+            self.text_display.append("↩️ Touched menus restored to their previous values")
+            self.status_label.setText(f"↩️ {name} failed, radio rolled back")
+        self.status_label.setStyleSheet("color: red; font-weight: bold; padding: 4px;")
+
+    def _on_menus_failed(self, message):
+        self._cat_busy = False
+        QMessageBox.critical(self, "Error", f"Failed to load preset: {message}")
+        self.status_label.setText("Error loading preset")
+        self.status_label.setStyleSheet("color: red; font-weight: bold; padding: 4px;")
+
     def save_radio_to_file(self):
         if not self.serial_conn or not self.serial_conn.is_open:
             QMessageBox.warning(self, "Warning", "Connect to the radio before saving.")
@@ -2272,35 +2533,9 @@ class FT991AController(QWidget):
         if not filename:
             return
 
-        root = ET.Element("YaesuMenuItems.xml")
-        total = len(MENU_DESCRIPTIONS)
-
-        for idx, (num, (desc, _, _)) in enumerate(MENU_DESCRIPTIONS.items()):
-            menu = ET.SubElement(root, "YaesuFT991A_MenuItems")
-            ET.SubElement(menu, "MENU_NUMBER").text = num
-            ET.SubElement(menu, "DESCRIPTION").text = desc
-
-            cmd = f"EX{num};"
-            self.serial_conn.reset_input_buffer()
-            self.serial_conn.write(cmd.encode('ascii'))
-            response = b""
-            timeout = time.time() + 0.5
-            while time.time() < timeout:
-                part = self.serial_conn.read(1)
-                if part:
-                    response += part
-                    if part == b';':
-                        break
-            decoded = response.decode(errors='ignore').strip()
-
-            if decoded.startswith(f"EX{num}"):
-                val = decoded[5:]
-            else:
-                val = "----"
-
-            ET.SubElement(menu, "MENU_VALUE").text = val
-            self.text_display.append(f"Read Menu {num} → {val} ({desc})")
-            self.progress_bar.setValue(int((idx + 1) / total * 100))
+        values = self._read_all_menus()
+        root = self._menu_dump_xml(values, "YaesuMenuItems.xml")
+        self.text_display.append(f"Read {len(values)} of {len(SCHEMA)} menus")
 
         tree = ET.ElementTree(root)
         tree.write(filename, encoding="utf-8", xml_declaration=True)
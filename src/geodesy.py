@@ -0,0 +1,142 @@
+import json
+from datetime import datetime, timezone
+
+import numpy as np
+
+from settle_profile import PROFILE_DIR
+
+EARTH_KM = 6371.0
+STATION_PATH = PROFILE_DIR / "station.json"
+
+# bearings in degrees true, distance in km, sun times in UTC hours (NaN: no rise/set that day)
+GEO_DTYPE = np.dtype([("bearing", "<f4"), ("long_path", "<f4"), ("km", "<f4"),
+                      ("sunrise", "<f4"), ("sunset", "<f4")])
+
+
+def grid_to_latlon(grid):
+    """Centre of a 4- or 6-char Maidenhead locator, e.g. 'FN31pr'."""
+    g = grid.strip().upper()
+    if len(g) not in (4, 6) or not (g[:2].isalpha() and g[2:4].isdigit()):
+        raise ValueError(f"bad grid locator {grid!r}")
+    lon = (ord(g[0]) - 65) * 20 - 180 + int(g[2]) * 2
+    lat = (ord(g[1]) - 65) * 10 - 90 + int(g[3])
+    if len(g) == 6:
+        lon += (ord(g[4]) - 65) / 12 + 1 / 24
+        lat += (ord(g[5]) - 65) / 24 + 1 / 48
+    else:
+        lon += 1
+        lat += 0.5
+    return lat, lon
+
+
+def load_station():
+    """(grid, lat, lon) saved by save_station, or None."""
+    try:
+        data = json.loads(STATION_PATH.read_text(encoding="utf-8"))
+        return data["grid"], float(data["lat"]), float(data["lon"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_station(grid):
+    lat, lon = grid_to_latlon(grid)
+    STATION_PATH.parent.mkdir(parents=True, exist_ok=True)
+    STATION_PATH.write_text(json.dumps({"grid": grid.strip(), "lat": lat, "lon": lon}, indent=2),
+                            encoding="utf-8")
+    return lat, lon
+
+
+def great_circle(lat1, lon1, lat2, lon2):
+    """Short-path bearing, long-path bearing and distance in km, elementwise."""
+    p1, l1, p2, l2 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (lat1, lon1, lat2, lon2))
+    dl = l2 - l1
+    y = np.sin(dl) * np.cos(p2)
+    x = np.cos(p1) * np.sin(p2) - np.sin(p1) * np.cos(p2) * np.cos(dl)
+    bearing = np.degrees(np.arctan2(y, x)) % 360
+    a = np.sin((p2 - p1) / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dl / 2) ** 2
+    km = 2 * EARTH_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+    return bearing, (bearing + 180) % 360, km
+
+
+def sun_times(lat, lon, day=None):
+    """Sunrise and sunset in UTC hours for each position on day (NOAA approximation)."""
+    day = day or datetime.now(timezone.utc).date()
+    g = 2 * np.pi / 365 * (day.timetuple().tm_yday - 1)
+    eqtime = 229.18 * (0.000075 + 0.001868 * np.cos(g) - 0.032077 * np.sin(g)
+                       - 0.014615 * np.cos(2 * g) - 0.040849 * np.sin(2 * g))
+    decl = (0.006918 - 0.399912 * np.cos(g) + 0.070257 * np.sin(g)
+            - 0.006758 * np.cos(2 * g) + 0.000907 * np.sin(2 * g)
+            - 0.002697 * np.cos(3 * g) + 0.00148 * np.sin(3 * g))
+    phi = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.asarray(lon, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cos_ha = np.cos(np.radians(90.833)) / (np.cos(phi) * np.cos(decl)) - np.tan(phi) * np.tan(decl)
+    # |cos_ha| > 1: polar day or night
+    ha = np.degrees(np.arccos(np.where(np.abs(cos_ha) <= 1, cos_ha, np.nan)))
+    sunrise = (720 - 4 * (lon + ha) - eqtime) / 60 % 24
+    sunset = (720 - 4 * (lon - ha) - eqtime) / 60 % 24
+    return sunrise, sunset
+
+
+class StationGeo:
+    """Beam headings, distances and sun times from our station, per position.
+
+    A few hundred entity positions cover nearly every call, so each
+    distinct (lat, lon) is computed once and batches are just gathers.
+    Sun times are kept for the current day only.
+    """
+
+    def __init__(self, lat, lon):
+        self.lat = lat
+        self.lon = lon
+        self._paths = {}        # (lat, lon) -> (bearing, long path, km)
+        self._sun = {}          # (lat, lon) -> (sunrise, sunset) on self._sun_day
+        self._sun_day = None
+
+    @classmethod
+    def from_grid(cls, grid):
+        return cls(*grid_to_latlon(grid))
+
+    def batch(self, lat, lon, day=None):
+        """GEO_DTYPE array for arrays of positions; NaN rows where lat and lon are both 0."""
+        lat = np.asarray(lat, dtype=np.float32)
+        lon = np.asarray(lon, dtype=np.float32)
+        out = np.full(lat.shape, np.nan, dtype=GEO_DTYPE)
+        known = (lat != 0) | (lon != 0)
+        if not known.any():
+            return out
+        pairs, inv = np.unique(np.stack([lat[known], lon[known]], axis=1), axis=0, return_inverse=True)
+        keys = [tuple(p) for p in pairs.tolist()]
+
+        day = day or datetime.now(timezone.utc).date()
+        if day != self._sun_day:
+            self._sun = {}
+            self._sun_day = day
+        missing = [i for i, k in enumerate(keys) if k not in self._paths or k not in self._sun]
+        if missing:
+            mlat, mlon = pairs[missing, 0], pairs[missing, 1]
+            bearing, long_path, km = great_circle(self.lat, self.lon, mlat, mlon)
+            sunrise, sunset = sun_times(mlat, mlon, day)
+            for j, i in enumerate(missing):
+                self._paths[keys[i]] = (bearing[j], long_path[j], km[j])
+                self._sun[keys[i]] = (sunrise[j], sunset[j])
+
+        table = np.array([self._paths[k] + self._sun[k] for k in keys], dtype=np.float32)
+        rows = table[inv.ravel()]
+        for n, field in enumerate(GEO_DTYPE.names):
+            out[field][known] = rows[:, n]
+        return out
+
+    def for_resolved(self, resolved, day=None):
+        """GEO_DTYPE rows for a cty_bulk DXCC_DTYPE array."""
+        return self.batch(resolved["lat"], resolved["lon"], day)
+
+    def point(self, lat, lon, day=None):
+        return self.batch([lat], [lon], day)[0]
+
+
+def format_hours(h):
+    if np.isnan(h):
+        return "--:--"
+    minutes = int(round(h * 60)) % 1440
+    return f"{minutes // 60:02d}:{minutes % 60:02d}Z"
@@ -0,0 +1,156 @@
+import xml.etree.ElementTree as ET
+from typing import NamedTuple
+
+# MR/MT/MW mode character <-> the names our channel files use
+MODE_CODES = {
+    "LSB": "1", "USB": "2", "CW": "3", "FM": "4", "AM": "5",
+    "RTTY-LSB": "6", "CW-R": "7", "DATA-LSB": "8", "RTTY-USB": "9",
+    "DATA-FM": "A", "FM-N": "B", "DATA-USB": "C", "AM-N": "D", "C4FM": "E",
+}
+MODE_NAMES = {v: k for k, v in MODE_CODES.items()}
+MODE_ALIASES = {"PKT-FM": "DATA-FM", "PKT-LSB": "DATA-LSB", "PKT-USB": "DATA-USB", "CWR": "CW-R"}
+
+CTCSS_CODES = {
+    "CTCSS OFF": 0, "CTCSS ENC/DEC": 1, "CTCSS ENC": 2, "DCS ENC/DEC": 3, "DCS ENC": 4,
+}
+CTCSS_NAMES = {v: k for k, v in CTCSS_CODES.items()}
+SHIFT_CODES = {"Simplex": 0, "Plus Shift": 1, "Minus Shift": 2}
+SHIFT_NAMES = {v: k for k, v in SHIFT_CODES.items()}
+
+BODY_LEN = 23           # memory block after the channel number in MR/MT/MW
+TAG_LEN = 12
+PMS_FIRST = 100         # P-1L; P-1U is 101 ... P-9U is 117
+PMS_LAST = 117
+
+
+class MemoryChannel(NamedTuple):
+    channel: int
+    freq_hz: int
+    mode: str               # MODE_CODES key
+    clar_hz: int = 0
+    rx_clar: bool = False
+    tx_clar: bool = False
+    # None in ctcss/tone/shift: the plan doesn't say, keep what the radio holds
+    ctcss: int = 0          # CTCSS_CODES value
+    tone: str = "00"
+    shift: int = 0          # SHIFT_CODES value
+    tag: str = ""
+
+    def over(self, have):
+        """This channel with its unset fields taken from have, the radio's copy (or defaults)."""
+        fill = {}
+        for field, default in _KEEP_DEFAULTS:
+            if getattr(self, field) is None:
+                fill[field] = default if have is None else getattr(have, field)
+        return self._replace(**fill) if fill else self
+
+    def body(self) -> bytes:
+        """The 23-char MW/MT block after the channel number."""
+        ch = self.over(None)
+        return b"%09d%+05d%d%d%s0%d%2s%d0" % (
+            ch.freq_hz, ch.clar_hz, ch.rx_clar, ch.tx_clar,
+            MODE_CODES[ch.mode].encode("ascii"), ch.ctcss,
+            ch.tone.encode("ascii"), ch.shift,
+        )
+
+    def encode_mw(self) -> bytes:
+        return b"MW%03d%s;" % (self.channel, self.body())
+
+    def encode_mt(self) -> bytes:
+        tag = self.tag.encode("ascii", "replace")[:TAG_LEN].ljust(TAG_LEN)
+        return b"MT%03d%s%s;" % (self.channel, self.body(), tag)
+
+    def same_memory(self, other) -> bool:
+        """Equal in everything MW writes (the tag is MT's business); unset fields match anything."""
+        return self.over(other)._replace(tag="") == other.over(self)._replace(tag="")
+
+
+_KEEP_DEFAULTS = (("ctcss", 0), ("tone", "00"), ("shift", 0))
+
+
+def channel_number(text):
+    """'001' -> 1, 'P-1L' -> 100, 'P-9U' -> 117."""
+    text = text.strip().upper()
+    if text.isdigit():
+        return int(text)
+    if text.startswith("P-") and len(text) == 4 and text[2].isdigit() and text[3] in "LU":
+        return PMS_FIRST + (int(text[2]) - 1) * 2 + (text[3] == "U")
+    raise ValueError(f"bad channel {text!r}")
+
+
+def channel_name(num):
+    if not PMS_FIRST <= num <= PMS_LAST:
+        return f"{num:03d}"
+    n = num - PMS_FIRST
+    return f"P-{n // 2 + 1}{'LU'[n % 2]}"
+
+
+def decode_memory(reply: bytes):
+    """MemoryChannel from an MR or MT reply, or None for an empty/unknown slot."""
+    if len(reply) < 5 + BODY_LEN + 1 or reply[:2] not in (b"MR", b"MT") or not reply.endswith(b";"):
+        return None
+    try:
+        ch = int(reply[2:5])
+        body = reply[5:5 + BODY_LEN].decode("ascii")
+        freq = int(body[0:9])
+        clar = int(body[9:14])
+        mode = MODE_NAMES[body[16]]
+        ctcss = int(body[18])
+        shift = int(body[21])
+    except (ValueError, KeyError, UnicodeDecodeError):
+        return None
+    if freq == 0:
+        return None
+    tag = ""
+    if reply[:2] == b"MT":
+        tag = reply[5 + BODY_LEN:-1].decode("ascii", "replace").rstrip()
+    return MemoryChannel(ch, freq, mode, clar, body[14] == "1", body[15] == "1",
+                         ctcss, body[19:21], shift, tag)
+
+
+def _from_element(elem):
+    freq_text = (elem.findtext("FREQUENCY") or "").strip()
+    if not freq_text:
+        return None
+    # kHz with a thousands separator: "446,740.000"
+    freq_hz = round(float(freq_text.replace(",", "")) * 1000)
+    mode = (elem.findtext("MODE") or "FM").strip().upper()
+    mode = MODE_ALIASES.get(mode, mode)
+    if mode not in MODE_CODES:
+        raise ValueError(f"channel {elem.findtext('CHANNEL')}: unknown mode {mode!r}")
+    clar_status = elem.findtext("CLARIFIERSTATUS") or ""
+    clar = (elem.findtext("CLARIFIER_OFFSET") or "+0000").strip() or "+0000"
+    # MemoryLabels records have no tone or shift at all: leave those to the radio
+    ctcss = elem.findtext("CTCSS")
+    tone = elem.findtext("TONE")
+    shift = elem.findtext("OFFSET")
+    return MemoryChannel(
+        channel_number(elem.findtext("CHANNEL")),
+        freq_hz,
+        mode,
+        int(clar),
+        "RX-CLAR:ON" in clar_status,
+        "TX-CLAR:ON" in clar_status,
+        None if ctcss is None else CTCSS_CODES.get(ctcss.strip(), 0),
+        None if tone is None else tone.strip() or "00",
+        None if shift is None else SHIFT_CODES.get(shift.strip(), 0),
+        (elem.findtext("LABEL") or "").rstrip(),
+    )
+
+
+def load_channel_plan(path):
+    """Channels from a channels.xml or YaesuMemoryLabels.xml file, streamed.
+
+    Slots with no frequency are left out; the radio has no CAT command
+    to erase a memory, so they are never touched. Fields the file doesn't
+    carry (YaesuMemoryLabels.xml has no CTCSS, TONE or OFFSET) come back
+    as None and keep whatever the radio holds.
+    """
+    plan = {}
+    for _event, elem in ET.iterparse(path, events=("end",)):
+        if elem.tag in ("YaesuFrequencyMemoryDetailsV2", "MemoryLabels"):
+            ch = _from_element(elem)
+            if ch is not None:
+                plan[ch.channel] = ch
+            elem.clear()
+    return plan
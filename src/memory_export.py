@@ -0,0 +1,122 @@
+import csv
+import struct
+from pathlib import Path
+
+from memory_channels import (
+    CTCSS_CODES, CTCSS_NAMES, MODE_CODES, MODE_NAMES, SHIFT_CODES, SHIFT_NAMES,
+    TAG_LEN, MemoryChannel, channel_name, channel_number, load_channel_plan,
+)
+
+CSV_FIELDS = ("channel", "frequency_hz", "mode", "clar_hz", "rx_clar", "tx_clar",
+              "ctcss", "tone", "shift", "tag")
+
+BIN_SUFFIX = ".ftm"
+_MAGIC = b"FTM1"
+# channel, freq, clarifier, flags (bit0 RX clar, bit1 TX clar), mode char, ctcss, tone, shift, tag
+_ROW = struct.Struct(f"<HIhBcB2sB{TAG_LEN}s")
+
+
+def _csv_row(ch):
+    return (channel_name(ch.channel), ch.freq_hz, ch.mode, ch.clar_hz, int(ch.rx_clar),
+            int(ch.tx_clar), CTCSS_NAMES[ch.ctcss], ch.tone, SHIFT_NAMES[ch.shift], ch.tag)
+
+
+def _bin_row(ch):
+    return _ROW.pack(ch.channel, ch.freq_hz, ch.clar_hz, ch.rx_clar | ch.tx_clar << 1,
+                     MODE_CODES[ch.mode].encode("ascii"), ch.ctcss, ch.tone.encode("ascii"),
+                     ch.shift, ch.tag.encode("ascii", "replace")[:TAG_LEN])
+
+
+class MemoryWriter:
+    """Writes channel rows to CSV and/or the binary format as they arrive."""
+
+    def __init__(self, csv_path=None, bin_path=None):
+        self._files = []
+        self._csv = None
+        self._bin = None
+        self.rows = 0
+        if csv_path:
+            f = open(csv_path, "w", newline="", encoding="utf-8")
+            self._files.append(f)
+            self._csv = csv.writer(f)
+            self._csv.writerow(CSV_FIELDS)
+        if bin_path:
+            self._bin = open(bin_path, "wb")
+            self._files.append(self._bin)
+            self._bin.write(_MAGIC)
+
+    def write(self, ch):
+        if self._csv:
+            self._csv.writerow(_csv_row(ch))
+        if self._bin:
+            self._bin.write(_bin_row(ch))
+        self.rows += 1
+
+    def close(self):
+        for f in self._files:
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_memories(programmer, channels, csv_path=None, bin_path=None, report=None):
+    """Stream channels off the radio into the export files, one chunk at a time.
+
+    Empty slots are not written. Returns the number of rows written.
+    """
+    channels = list(channels)
+    with MemoryWriter(csv_path, bin_path) as out:
+        for n, (_ch, mem) in enumerate(programmer.iter_channels(channels), 1):
+            if mem is not None:
+                out.write(mem)
+            if report:
+                report(int(n * 100 / len(channels)), f"{n}/{len(channels)} read, {out.rows} exported")
+        return out.rows
+
+
+def iter_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield MemoryChannel(
+                channel_number(row["channel"]),
+                int(row["frequency_hz"]),
+                row["mode"],
+                int(row["clar_hz"] or 0),
+                row["rx_clar"] == "1",
+                row["tx_clar"] == "1",
+                CTCSS_CODES[row["ctcss"]],
+                row["tone"] or "00",
+                SHIFT_CODES[row["shift"]],
+                row["tag"],
+            )
+
+
+def iter_bin(path):
+    with open(path, "rb") as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"{path}: not a memory export")
+        while True:
+            data = f.read(_ROW.size)
+            if len(data) < _ROW.size:
+                return
+            ch, freq, clar, flags, mode, ctcss, tone, shift, tag = _ROW.unpack(data)
+            yield MemoryChannel(ch, freq, MODE_NAMES[mode.decode("ascii")], clar,
+                                bool(flags & 1), bool(flags & 2), ctcss,
+                                tone.decode("ascii"), shift,
+                                tag.rstrip(b"\0 ").decode("ascii", "replace"))
+
+
+def read_plan(path):
+    """Channel plan from any format we write or inherit: XML, CSV or binary export."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        rows = iter_csv(path)
+    elif suffix == BIN_SUFFIX:
+        rows = iter_bin(path)
+    else:
+        return load_channel_plan(path)
+    return {ch.channel: ch for ch in rows}
@@ -0,0 +1,76 @@
+import re
+from array import array
+from bisect import bisect_left
+
+from memory_channels import channel_name, channel_number
+
+_FREQ = re.compile(r"\d{1,3}[.,]\d*$")      # MHz: "146.52", "7,178"; a bare "52" is a channel
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class MemoryIndex:
+    """Channel lookup by frequency, label prefix or channel number.
+
+    Frequencies sit in a sorted array searched with bisect; every prefix
+    of a label (and of each word in it) maps to the channels carrying it.
+    Labels are at most 12 chars, so the prefix table stays small.
+    """
+
+    def __init__(self, channels=()):
+        self.channels = {ch.channel: ch for ch in channels}
+        pairs = sorted((ch.freq_hz, ch.channel) for ch in self.channels.values())
+        self._freqs = array("q", (f for f, _ in pairs))
+        self._freq_channels = array("H", (c for _, c in pairs))
+        prefixes = {}
+        for ch in self.channels.values():
+            label = ch.tag.lower()
+            keys = {label[:n] for n in range(1, len(label) + 1)}
+            for word in _WORD.findall(label):
+                keys.update(word[:n] for n in range(1, len(word) + 1))
+            for key in keys:
+                prefixes.setdefault(key, []).append(ch.channel)
+        self._prefixes = {k: tuple(sorted(v)) for k, v in prefixes.items()}
+
+    def __len__(self):
+        return len(self.channels)
+
+    def nearest(self, hz, k=1):
+        """The k channels closest in frequency to hz, closest first."""
+        freqs = self._freqs
+        i = bisect_left(freqs, hz)
+        lo, hi = i - 1, i
+        found = []
+        while len(found) < k and (lo >= 0 or hi < len(freqs)):
+            if hi >= len(freqs) or (lo >= 0 and hz - freqs[lo] <= freqs[hi] - hz):
+                found.append(self._freq_channels[lo])
+                lo -= 1
+            else:
+                found.append(self._freq_channels[hi])
+                hi += 1
+        return [self.channels[c] for c in found]
+
+    def by_label(self, prefix):
+        return [self.channels[c] for c in self._prefixes.get(prefix.lower(), ())]
+
+    def search(self, text, limit=10):
+        """Type-ahead lookup: a frequency in MHz, a channel number or a label prefix."""
+        text = text.strip()
+        if not text:
+            return []
+        hits = []
+        if _FREQ.match(text):
+            hits += self.nearest(round(float(text.replace(",", ".")) * 1e6), limit)
+        try:
+            ch = self.channels.get(channel_number(text))
+            if ch is not None and ch not in hits:
+                hits.insert(0, ch)
+        except ValueError:
+            pass
+        for ch in self.by_label(text):
+            if ch not in hits:
+                hits.append(ch)
+        return hits[:limit]
+
+    @staticmethod
+    def describe(ch):
+        return f"{channel_name(ch.channel)}  {ch.freq_hz / 1e6:.5f}  {ch.tag}".rstrip()
@@ -0,0 +1,117 @@
+import threading
+import time
+
+import cat_protocol as cat
+from memory_channels import TAG_LEN, channel_name, decode_memory
+
+READ_CHUNK = 8          # MT replies are ~41 bytes; keep each pipelined read short
+WRITE_BATCH = 8
+
+
+def _tag(ch):
+    return ch.tag[:TAG_LEN].rstrip()
+
+
+class MemoryProgrammer:
+    """Brings the radio's memories in line with a channel plan.
+
+    Reads the current memories with pipelined MT queries, writes only the
+    channels that differ and remembers what is left, so a stopped or
+    failed run resumes where it ended instead of starting over.
+    """
+
+    def __init__(self, engine, plan):
+        self.engine = engine
+        self.plan = dict(plan)
+        self.radio = {}         # channel -> MemoryChannel as last read, None if empty
+        self.pending = []       # MemoryChannel objects still to write
+        self.done = []
+        self.failed = []
+        self.compared = False
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def iter_channels(self, channels):
+        """Yield (channel, MemoryChannel or None) as each pipelined MT chunk comes in."""
+        channels = list(channels)
+        for i in range(0, len(channels), READ_CHUNK):
+            chunk = channels[i:i + READ_CHUNK]
+            found = {}
+            for r in self.engine.query_many([cat.query_mt(ch) for ch in chunk]):
+                mem = decode_memory(r)
+                if mem is not None:
+                    found[mem.channel] = mem
+            for ch in chunk:
+                yield ch, found.get(ch)
+
+    def read_channels(self, channels, report=None):
+        channels = list(channels)
+        found = {}
+        for n, (ch, mem) in enumerate(self.iter_channels(channels), 1):
+            found[ch] = mem
+            if report and (n % READ_CHUNK == 0 or n == len(channels)):
+                report(int(n * 100 / len(channels)))
+        return found
+
+    def compare(self, report=None):
+        """Read the planned channels from the radio and work out what has to change."""
+        self.radio.update(self.read_channels(sorted(self.plan), report))
+        self.pending = [want for ch, want in sorted(self.plan.items())
+                        if not self._matches(self.radio.get(ch), want)]
+        self.done = []
+        self.failed = []
+        self.compared = True
+        return self.pending
+
+    @staticmethod
+    def _matches(have, want):
+        return have is not None and have.same_memory(want) and have.tag == _tag(want)
+
+    def _command(self, have, want):
+        # MW leaves the tag alone; MT rewrites memory and tag together
+        want = want.over(have)
+        if have is not None and have.tag == _tag(want):
+            return want.encode_mw()
+        return want.encode_mt()
+
+    def run(self, report=None):
+        """Write the pending channels in batches. Call again after a stop to resume."""
+        self._stop.clear()
+        if not self.compared:
+            self.compare()
+        # channels that failed last time get another go
+        self.pending[:0] = self.failed
+        self.failed = []
+
+        total = len(self.pending) + len(self.done)
+        t0 = time.perf_counter()
+        written = 0
+        while self.pending and not self._stop.is_set():
+            batch = self.pending[:WRITE_BATCH]
+            data = b"".join(self._command(self.radio.get(w.channel), w) for w in batch)
+            with self.engine.lock:
+                self.engine.write(data)
+                self.engine.settle(len(batch) * self.engine.delay("CMD"))
+                back = self.read_channels([w.channel for w in batch])
+            self.radio.update(back)
+            for want in batch:
+                (self.done if self._matches(back.get(want.channel), want) else self.failed).append(want)
+            del self.pending[:len(batch)]
+            written += len(batch)
+
+            if report:
+                rate = written / (time.perf_counter() - t0)
+                eta = len(self.pending) / rate if rate else 0
+                report(int((total - len(self.pending)) * 100 / max(1, total)),
+                       f"{total - len(self.pending)}/{total} channels, "
+                       f"{rate:.1f} ch/s, ETA {eta:.0f} s")
+
+        return {
+            "written": len(self.done),
+            "failed": [channel_name(w.channel) for w in self.failed],
+            "remaining": len(self.pending),
+            "stopped": self._stop.is_set(),
+            "seconds": time.perf_counter() - t0,
+        }
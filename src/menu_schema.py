@@ -0,0 +1,267 @@
+import re
+from typing import NamedTuple
+
+_CODE = re.compile(r"(\d+)\s*:")
+_LABEL = re.compile(r"\s*(\d+)\s*:\s*(.+?)\s*")
+_LABEL_SPAN = re.compile(r"\d+\s*:.*-\s*\d+\s*:")        # "1:100Hz - 19:1000Hz"
+_SPAN_CODE = re.compile(r"(\d+)\s*-\s*(\d+)\s*:")          # "1-99:DG-ID"
+_NUM_RANGE = re.compile(r"([-+]?\d+(?:\.\d+)?)\s*(?:-|to)\s*([-+]?\d+(?:\.\d+)?)")
+
+# Ranges the range text can't express cleanly
+_RANGE_OVERRIDES = {
+    15: (0, 240),           # 0 is OFF, 1-240 seconds
+}
+
+
+class MenuSpec(NamedTuple):
+    num: int
+    description: str
+    range_text: str
+    unit: str
+    width: int              # digits on the wire (sign not counted); max length for text menus
+    signed: bool            # value always carries a leading + or -
+    text: bool              # free text, only length-checked
+    lo: int | None
+    hi: int | None
+    labels: dict            # enum code -> label
+
+
+# number, description, range / enum, unit, wire format
+#   "4"  four digits, zero padded     "+2"  sign plus two digits     "t10"  text, up to 10 chars
+# Formats were taken from a full EX dump of a real FT-991A.
+_ROWS = (
+    (1, "AGC FAST DELAY", "20 - 4000", "msec", "4"),
+    (2, "AGC MID DELAY", "20 - 4000", "msec", "4"),
+    (3, "AGC SLOW DELAY", "20 - 4000", "msec", "4"),
+    (4, "HOME FUNCTION", "0:SCOPE, 1:FUNCTION", "", "1"),
+    (5, "MY CALL INDICATOR", "0 - 5", "sec", "1"),
+    (6, "DISPLAY COLOR", "0:BLUE, 1:GRAY, 2:GREEN, 3:ORANGE, 4:PURPLE, 5:RED, 6:SKY BLUE", "", "1"),
+    (7, "DIMMER LED", "0:1, 1:2", "", "1"),
+    (8, "DIMMER TFT", "0-15", "", "2"),
+    (9, "DISPLAY BAR MTR PEAK HOLD", "0:0s, 1:0.5s, 2:1s, 3:2s", "", "1"),
+    (10, "DVS RX OUT LEVEL", "0-100", "", "3"),
+    (11, "DVS TX OUT LEVEL", "0-100", "", "3"),
+    (12, "KEYER TYPE", "0:OFF, 1:BUG, 2:ELEKEY-A, 3:ELEKEY-B, 4:ELEKEY-Y, 5:ACS", "", "1"),
+    (13, "KEYER DOT DASH", "0:NORMAL, 1:REVERSE", "", "1"),
+    (14, "KEYER CW WEIGHT", "2.5 - 4.5", "", "2"),
+    (15, "KEYER BEACON TIME", "0:OFF, 1:1 - 240", "sec", "3"),
+    (16, "KEYER NUMBER STYLE", "0:1290, 1:AUNO, 2:AUNT, 3:A2NO, 4:A2NT, 5:12NO, 6:12NT", "", "1"),
+    (17, "KEYER CONTEST NUMBER", "0-9999", "", "4"),
+    (18, "KEYER CW MEMORY 1", "0:TEXT, 1:MESSAGE", "", "1"),
+    (19, "KEYER CW MEMORY 2", "0:TEXT, 1:MESSAGE", "", "1"),
+    (20, "KEYER CW MEMORY 3", "0:TEXT, 1:MESSAGE", "", "1"),
+    (21, "KEYER CW MEMORY 4", "0:TEXT, 1:MESSAGE", "", "1"),
+    (22, "KEYER CW MEMORY 5", "0:TEXT, 1:MESSAGE", "", "1"),
+    (23, "NB WIDTH", "0:1ms, 1:3ms, 2:10ms", "", "1"),
+    (24, "NB REJECTION", "0:10 dB, 1:30 dB, 2:50dB", "", "1"),
+    (25, "NB LEVEL", "0-10", "", "2"),
+    (26, "BEEP LEVEL", "0-100", "", "3"),
+    (27, "TIME ZONE", "set at the radio", "", "t5"),
+    (28, "GPS/232C SELECT", "0:GPS1, 1:GPS2, 2:RS232C", "", "1"),
+    (29, "232C RATE", "0:4800bps, 1:9600bps, 2:19200bps, 3:38400bps", "", "1"),
+    (30, "232C TOT", "0:10ms, 1:100ms, 2:1000ms, 3:3000", "", "1"),
+    (31, "CAT RATE", "0:4800bps, 1:9600bps, 2:19200bps, 3:38400bps", "", "1"),
+    (32, "CAT TIMEOUT", "0:10ms, 1:100ms, 2:1000ms, 3:3000ms", "", "1"),
+    (33, "CAT RTS", "0:DISABLE, 1:ENABLE", "", "1"),
+    (34, "MEM GROUP", "0:DISABLE, 1:ENABLE", "", "1"),
+    (35, "QUICK SPLIT FREQ", "-20 to +20 kHz", "", "+2"),
+    (36, "TX TIMEOUT TIMER", "0-30min", "", "2"),
+    (37, "MIC SCAN", "0:DISABLE, 1:ENABLE", "", "1"),
+    (38, "MIC SCAN RESUME", "0:PAUSE, 1:TIME", "", "1"),
+    (39, "REF FREQUENCY ADJUST", "-25 to +25 kHz", "", "+2"),
+    (40, "CLAR MODE SELECT", "0:RX, 1:TX, 2:TRX", "", "1"),
+    (41, "Mode:AM LCUT Freq", "0:OFF, 1:100Hz - 19:1000Hz", "", "2"),
+    (42, "Mode:AM LCUT Slope", "0:6dB/oct, 1:18dB/oct", "", "1"),
+    (43, "Mode:AM HCUT Freq", "0:OFF, 1:700Hz - 67:4000Hz", "", "2"),
+    (44, "Mode:AM HCUT Slope", "0:6dB/oct, 1:18dB/oct", "", "1"),
+    (45, "Mode:AM MIC SEL", "0:MIC, 1:REAR", "", "1"),
+    (46, "Mode:AM OUT LEVEL", "0-100", "", "3"),
+    (47, "Mode:AM PTT SELECT", "0:DAKY, 1:RTS, 2:DTR", "", "1"),
+    (48, "Mode:AM PORT SELECT", "0:DATA, 1:USB", "", "1"),
+    (49, "Mode:AM DATA GAIN", "0-100", "", "3"),
+    (50, "Mode:CW LCUT FREQ", "0:OFF, 1:100Hz - 19:1000Hz", "", "2"),
+    (51, "Mode:CW LCUT SLOPE", "0:6dB/oct, 1:18dB/oct", "", "1"),
+    (52, "Mode:CW HCUT FREQ", "0:OFF, 1:700Hz - 67:4000Hz", "", "2"),
+    (53, "Mode:CW HCUT SLOPE", "0:6dB/oct, 1:18dB/oct", "", "1"),
+    (54, "Mode:CW OUT LEVEL", "0-100", "", "3"),
+    (55, "Mode:CW CW AUTO MODE", "0:OFF, 1:50MHz, 2:ON", "", "1"),
+    (56, "Mode:CW CW BK-IN", "0:SEMI, 1:FULL", "", "1"),
+    (57, "MODE:CW CW BK-IN DELAY", "30 - 3000", "msec", "4"),
+    (58, "Mode:CW CW WAVE SHAPE", "0:1ms, 1:2ms, 2:4ms, 3:6ms", "", "1"),
+    (59, "Mode:CW CW FREQ DISPLAY", "0:DIRECT, 1:OFFSET", "", "1"),
+    (60, "Mode:CW PC KEYING", "0:OFF, 1:DAKY, 2:RTS, 3:DTR", "", "1"),
+    (61, "Mode:CW QSK", "0:15ms, 1:20ms, 2:25ms, 3:30ms", "", "1"),
+    (62, "Mode:DATA DATA MODE", "0:PSK, 1:OTHER", "", "1"),
+    (63, "PSK TONE", "0:1000, 1:1500, 2:2000", "", "1"),
+    (64, "Mode:DATA OTHER DISP SSB", "-3000 to +3000 kHz", "", "+4"),
+    (65, "Mode:DATA OTHER SHIFT SSB", "-3000 to +3000 kHz", "", "+4"),
+    (66, "Mode:DATA DATA LCUT FREQ", "0:OFF, 1:100Hz - 19:1000Hz", "", "2"),
+    (67, "Mode:DATA DATA LCUT SLOPE", "0:6dB/oct, 1:18dB/oct", "", "1"),
+    (68, "Mode:DATA DATA HCUT FREQ", "0:OFF, 1:700Hz - 67:4000Hz", "", "2"),
+    (69, "Mode:DATA DATA HCUT SLOPE", "0:6dB/oct, 1:18dB/oct", "", "1"),
+    (70, "Mode:DATA DATA IN SELECT", "0:MIC, 1:REAR", "", "1"),
+    (71, "Mode:DATA PTT SELECT", "0:DAKY, 1:RTS, 2:DTR", "", "1"),
+    (72, "Mode:DATA PORT SELECT", "0:DATA, 1:USB", "", "1"),
+    (73, "Mode:DATA DATA OUT LEVEL", "0-100", "", "3"),
+    (74, "Mode:FM FM MIC SEL", "0:MIC, 1:REAR", "", "1"),
+    (75, "FM OUT LEVEL", "0-100", "", "3"),
+    (76, "FM PKT PTT SELECT", "0:DAKY, 1:RTS, 2:DTR", "", "1"),
+    (77, "FM PORT SELECT", "0:DATA, 1:USB", "", "1"),
+    (78, "FM PKT TX GAIN", "0-100", "", "3"),
+    (79, "FM PKT MODE", "0:1200, 1:9600", "", "1"),
+    (80, "Mode:FM RPT SHIFT(28MHz)", "0-1000", "", "4"),
+    (81, "Mode:FM RPT SHIFT(50MHz)", "0-4000", "", "4"),
+    (82, "Mode:FM RPT SHIFT(144MHz)", "0-4000", "", "4"),
+    (83, "Mode:FM RPT SHIFT(430MHz)", "0-10000", "", "5"),
+    (84, "ARS 144MHz", "0:OFF, 1:ON", "", "1"),
+    (85, "ARS 430MHz", "0:OFF, 1:ON", "", "1"),
+    (86, "DCS POLARITY", "0:Tn-Rn, 1:Tn-Riv, 2:Tiv-Rn, 3:Tiv-Riv", "", "1"),
+    (87, "MY CALL", "set at the radio", "", "t10"),
+    (88, "GM DISPLAY", "0:DISTANCE, 1:STRENGTH", "", "1"),
+    (89, "DISTANCE", "0:KM, 1:MILE", "", "1"),
+    (90, "AMS TX MODE", "0:AUTO, 1:MANUAL, 2:DN, 3:VW, 4:ANALOG", "", "1"),
+    (91, "STANDBY BEEP", "0:OFF, 1:ON", "", "1"),
+    (92, "Mode:RTTY LCUT FREQ", "0:OFF, 1:100Hz - 19:1000 50Hz STEPS", "", "2"),
+    (93, "Mode:RTTY LCUT SLOPE", "0:6dB/oct, 1:18dB/oct", "", "1"),
+    (94, "Mode:RTTY HCUT FREQ", "0:OFF, 1:700Hz - 67:4000Hz", "", "2"),
+    (95, "Mode:RTTY HCUT SLOPE", "0:6dB/oct, 1:18dB/oct", "", "1"),
+    (96, "RTTY SHIFT PORT", "0:SHIFT, 1:DTR, 2:RTS", "", "1"),
+    (97, "Mode:RTTY POLARITY-R", "0:NOR, 1:REV", "", "1"),
+    (98, "Mode:RTTY POLARITY-T", "0:NOR, 1:REV", "", "1"),
+    (99, "Mode:RTTY OUT LEVEL", "0-100", "", "3"),
+    (100, "Mode:RTTY RTTY SHIFT", "0:170, 1:200, 2:425, 3:850", "", "1"),
+    (101, "Mode:RTTY MARK FREQ", "0:1275Hz, 1:2125Hz", "", "1"),
+    (102, "Mode:SSB LCUT FREQ", "0:OFF, 1:100Hz - 19:1000Hz (50Hz steps)", "", "2"),
+    (103, "Mode:SSB LCUT SLOPE", "0:6dB/oct, 1:18dB/oct", "", "1"),
+    (104, "Mode:SSB HCUT FREQ", "0:OFF, 1:700Hz - 67:4000Hz (50Hz steps)", "", "2"),
+    (105, "Mode:SSB HCUT SLOPE", "0:6dB/oct, 1:18dB/oct", "", "1"),
+    (106, "Mode:SSB MIC SELECT", "0:MIC, 1:REAR", "", "1"),
+    (107, "Mode:SSB OUT LEVEL", "0-100", "", "3"),
+    (108, "Mode:SSB PTT SELECT", "0:DAKY, 1:RTS, 2:DTR", "", "1"),
+    (109, "Mode:SSB PORT SELECT", "0:DATA, 1:USB", "", "1"),
+    (110, "Mode:SSB TX BPF", "0:50-3000, 1:100-2900, 2:200-2800, 3:300-2700, 4:400-2600", "", "1"),
+    (111, "APF WIDTH", "0:NARROW, 1:MEDIUM, 2:WIDE", "", "1"),
+    (112, "CONTOUR LEVEL", "-40 to +20", "", "+2"),
+    (113, "CONTOUR WIDTH", "1-11", "", "2"),
+    (114, "IF NOTCH WIDTH", "0:NARROW, 1:WIDE", "", "1"),
+    (115, "SCOPE DISPLAY MODE", "0:SPECTRUM, 1:WATERFALL", "", "1"),
+    (116, "SCOPE SPAN FREQ", "3:50kHz, 4:100kHz, 5:200kHz, 6:500kHz, 7:1000kHz", "", "2"),
+    (117, "SPECTRUM COLOR", "0:BLUE, 1:GRAY, 2:GREEN, 3:ORANGE, 4:PURPLE, 5:RED, 6:SKY BLUE", "", "1"),
+    (118, "WATERFALL COLOR", "0:BLUE, 1:GRAY, 2:GREEN, 3:ORANGE, 4:PURPLE, 5:RED, 6:SKY BLUE, 7:MULTI", "", "1"),
+    (119, "PRMTRC EQ1 FREQ", "0:OFF, 1:100Hz, 2:200Hz, 3:300Hz, 4:400Hz, 5:500Hz, 6:600Hz, 7:700Hz", "", "2"),
+    (120, "PRMTRC EQ1 LEVEL", "-20 to +10", "", "+2"),
+    (121, "PRMTRC EQ1 BWTH", "1-10", "", "2"),
+    (122, "PRMTRC EQ2 FREQ", "0:OFF, 1:700Hz, 2:800Hz, 3:900Hz, 4:1000Hz, 5:1100Hz, 6:1200Hz, 7:1300Hz, 8:1400Hz, 9:1500Hz", "", "2"),
+    (123, "PRMTRC EQ2 LEVEL", "-20 to +10", "", "+2"),
+    (124, "PRMTRC EQ2 BWTH", "1-10", "", "2"),
+    (125, "PRMTRC EQ3 FREQ", "0:OFF, 1:1500Hz, 2:1600Hz, 3:1700Hz, 4:1800Hz, 5:1900Hz, 6:2000Hz-18:3200Hz", "", "2"),
+    (126, "PRMTRC EQ3 LEVEL", "-20 to +10", "", "+2"),
+    (127, "PRMTRC EQ3 BWTH", "1-10", "", "2"),
+    (128, "P-PRMTRC EQ1 FREQ", "0:OFF, 1:100Hz, 2:200Hz, 3:300Hz, 4:400Hz, 5:500Hz, 6:600Hz, 7:700Hz", "", "2"),
+    (129, "P-PRMTRC EQ1 LEVEL", "-20 to +10", "", "+2"),
+    (130, "P-PRMTRC EQ1 BWTH", "1-10", "", "2"),
+    (131, "P-PRMTRC EQ2 FREQ", "0:OFF, 1:700Hz, 2:800Hz, 3:900Hz, 4:1000Hz, 5:1100Hz, 6:1200Hz, 7:1300Hz, 8:1400Hz, 9:1500Hz", "", "2"),
+    (132, "P-PRMTRC EQ2 LEVEL", "-20 to +10", "", "+2"),
+    (133, "P-PRMTRC EQ2 BWTH", "1-10", "", "2"),
+    (134, "P-PRMTRC EQ3 FREQ", "0:OFF, 1:1500Hz, 2:1600Hz, 3:1700Hz, 4:1800Hz, 5:1900Hz, 6:2000Hz-18:3200Hz", "", "2"),
+    (135, "P-PRMTRC EQ3 LEVEL", "-20 to +10", "", "+2"),
+    (136, "P-PRMTRC EQ3 BWTH", "1-10", "", "2"),
+    (137, "HF TX MAX POWER", "5-100", "W", "3"),
+    (138, "50M TX MAX POWER", "5-100", "W", "3"),
+    (139, "144M TX MAX POWER", "5-50", "W", "3"),
+    (140, "430M TX MAX POWER", "5-50", "W", "3"),
+    (141, "TUNER SELECT", "0:OFF, 1:INTERNAL, 2:EXTERNAL, 3:ATAS, 4:LAMP", "", "1"),
+    (142, "VOX SELECT", "0:MIC, 1:DATA", "", "1"),
+    (143, "VOX GAIN", "0-100", "", "3"),
+    (144, "VOX DELAY", "30-3000", "ms", "4"),
+    (145, "ANTI VOX GAIN", "0-100", "", "3"),
+    (146, "DATA VOX GAIN", "0-100", "", "3"),
+    (147, "DATA VOX DELAY", "30-3000", "ms", "4"),
+    (148, "ANTI DVOX GAIN", "0-100", "", "3"),
+    (149, "EMERGENCY FREQ TX", "0:DISABLE, 1:ENABLE", "", "1"),
+    (150, "PRT/WIRES FREQ", "0:MANUAL, 1:PRESET", "", "1"),
+    (151, "PRESET FREQUENCY", "3000000-47000000", "Hz", "8"),
+    (152, "SEARCH SETUP", "0:HISTORY, 1:ACTIVITY", "", "1"),
+    (153, "WIRES DG-ID", "0:AUTO, 1-99:DG-ID", "", "3"),)
+
+
+def _parse_range(num, range_text):
+    if num in _RANGE_OVERRIDES:
+        return _RANGE_OVERRIDES[num]
+    if ":" in range_text:
+        codes = [int(c) for c in _CODE.findall(range_text)]
+        for a, b in _SPAN_CODE.findall(range_text):
+            codes += [int(a), int(b)]
+        return min(codes), max(codes)
+    m = _NUM_RANGE.search(range_text)
+    if not m:
+        return None, None
+    lo, hi = m.group(1), m.group(2)
+    if "." in lo or "." in hi:
+        # 2.5 - 4.5 style menus go over the wire in tenths
+        return round(float(lo) * 10), round(float(hi) * 10)
+    return int(lo), int(hi)
+
+
+def _labels(range_text):
+    """Enum code -> label for the single N:label items of a range text.
+
+    Spans such as "1:100Hz - 19:1000Hz", "1-99:DG-ID" or "1:1 - 240" are
+    ranges of plain values and get no labels.
+    """
+    labels = {}
+    for item in range_text.split(","):
+        m = _LABEL.fullmatch(item)
+        if not m or _LABEL_SPAN.search(item):
+            continue
+        span = _NUM_RANGE.fullmatch(m.group(2))
+        if span and span.group(1) == m.group(1):
+            continue
+        labels[int(m.group(1))] = m.group(2)
+    return labels
+
+
+def _build(rows):
+    schema = {}
+    for num, desc, range_text, unit, fmt in rows:
+        text = fmt.startswith("t")
+        signed = fmt.startswith("+")
+        width = int(fmt.lstrip("t+"))
+        lo, hi = (None, None) if text else _parse_range(num, range_text)
+        labels = _labels(range_text) if ":" in range_text else {}
+        schema[num] = MenuSpec(num, desc, range_text, unit, width, signed, text, lo, hi, labels)
+    return schema
+
+
+SCHEMA = _build(_ROWS)
+MENU_NUMBERS = tuple(SCHEMA)
+
+# The old "001" -> (description, range, unit) view the GUI was written against
+MENU_DESCRIPTIONS = {
+    f"{s.num:03d}": (s.description, s.range_text, s.unit) for s in SCHEMA.values()
+}
+
+
+def describe(num, raw):
+    """Display form of a raw menu value: enum label or number with its unit."""
+    spec = SCHEMA.get(num)
+    text = raw.decode("ascii", "replace") if isinstance(raw, (bytes, bytearray)) else str(raw)
+    if spec is None or spec.text:
+        return text
+    try:
+        n = int(text)
+    except ValueError:
+        return text
+    if n in spec.labels:
+        return spec.labels[n]
+    return f"{n} {spec.unit}" if spec.unit else str(n)
+
+
+if __name__ == "__main__":
+    # python menu_schema.py: check that value spans in range texts aren't read as labels
+    for num, want in ((41, {0: "OFF"}), (15, {0: "OFF"}), (153, {0: "AUTO"}),
+                      (125, {0: "OFF", 1: "1500Hz", 2: "1600Hz", 3: "1700Hz", 4: "1800Hz", 5: "1900Hz"}),
+                      (86, {0: "Tn-Rn", 1: "Tn-Riv", 2: "Tiv-Rn", 3: "Tiv-Riv"}),
+                      (110, {0: "50-3000", 1: "100-2900", 2: "200-2800", 3: "300-2700", 4: "400-2600"})):
+        got = SCHEMA[num].labels
+        print(f"{'ok ' if got == want else 'BAD'} {num:03d} {got}")
@@ -0,0 +1,109 @@
+import cat_protocol as cat
+from menu_schema import SCHEMA
+from preset_stack import PresetStack
+
+MIN_MENU_WAIT = 0.25
+VERIFY_RETRIES = 2
+
+
+def snapshot_menus(engine, nums):
+    """Current values of nums: from menu_cache where known, one pipelined read for the rest."""
+    cache = engine.menu_cache
+    snap = {n: cache[n] for n in nums if n in cache}
+    unknown = [n for n in nums if n not in snap]
+    if unknown:
+        snap.update(engine.read_menus(unknown))
+    return snap
+
+
+def verify_menus(engine, expected, retries=VERIFY_RETRIES):
+    """Read back what was just written and rewrite only the menus that don't match.
+
+    Each pass is one pipelined EX read of the menus still failing.
+    Returns [(menu, expected, actual or None, ok)] in menu order.
+    """
+    expected = dict(expected)
+    actual = engine.read_menus(list(expected))
+    failed = [n for n, v in expected.items() if actual.get(n) != v]
+    for _ in range(retries):
+        if not failed:
+            break
+        engine.write(PresetStack.encode((n, expected[n]) for n in failed))
+        engine.settle(len(failed) * engine.delay("EX"))
+        actual.update(engine.read_menus(failed))
+        failed = [n for n in failed if actual.get(n) != expected[n]]
+    for n in expected:
+        if n not in actual:
+            engine.menu_cache.pop(n, None)    # no longer know what it holds
+    return [(n, v, actual.get(n), actual.get(n) == v) for n, v in sorted(expected.items())]
+
+
+def format_verify_table(rows, failures_only=False):
+    lines = []
+    for num, want, got, ok in rows:
+        if ok and failures_only:
+            continue
+        got_text = got.decode("ascii", "replace") if got is not None else "no reply"
+        lines.append(f"{num:03d}  {'PASS' if ok else 'FAIL'}  {want.decode('ascii'):>10}  "
+                     f"{got_text:>10}  {SCHEMA[num].description if num in SCHEMA else ''}")
+    return "\n".join(lines)
+
+
+def _write_and_verify(engine, changes, retries):
+    """Send changes as one batch, wait for the last one to land, verify them all."""
+    engine.write(PresetStack.encode(changes))
+    last_num, last_val = changes[-1]
+    budget = max(MIN_MENU_WAIT, len(changes) * engine.delay("EX"))
+    engine.wait_for(cat.query_ex(last_num), lambda r, v=last_val: r[5:-1] == v, budget)
+    return verify_menus(engine, changes, retries)
+
+
+def apply_menus(engine, items, progress=None, retries=VERIFY_RETRIES):
+    """Apply a set of (menu, value) pairs as one unit.
+
+    Snapshot the menus, write only the ones that differ in one batch and
+    read them back, retrying just the failures. If any menu still didn't
+    take, put every touched menu back to its snapshot value, so the radio
+    is never left half way between two presets. Raises RuntimeError,
+    before anything is written, when a menu can't be read for the snapshot.
+    """
+    items = list(items)
+    result = {"applied": 0, "unchanged": 0, "mismatched": [],
+              "rolled_back": False, "rollback_failed": [], "table": []}
+    if not items:
+        return result
+
+    with engine.lock:
+        snap = snapshot_menus(engine, [n for n, _ in items])
+        # a menu without a snapshot value could not be put back
+        missing = [n for n, _ in items if n not in snap]
+        for _ in range(retries):
+            if not missing:
+                break
+            snap.update(engine.read_menus(missing))
+            missing = [n for n in missing if n not in snap]
+        if missing:
+            raise RuntimeError("no reply reading menu " + ", ".join(f"{n:03d}" for n in missing)
+                               + "; nothing was written")
+        changes = [(n, v) for n, v in items if snap.get(n) != v]
+        result["unchanged"] = len(items) - len(changes)
+        if progress:
+            progress(20)
+        if not changes:
+            return result
+
+        result["table"] = _write_and_verify(engine, changes, retries)
+        mismatched = [n for n, _want, _got, ok in result["table"] if not ok]
+        if progress:
+            progress(70)
+        if not mismatched:
+            result["applied"] = len(changes)
+            return result
+
+        result["mismatched"] = mismatched
+        rows = _write_and_verify(engine, [(n, snap[n]) for n, _ in changes], retries)
+        result["rollback_failed"] = [n for n, _want, _got, ok in rows if not ok]
+        result["rolled_back"] = True
+        if progress:
+            progress(100)
+    return result
@@ -0,0 +1,90 @@
+from menu_schema import SCHEMA
+
+
+class MenuValidator:
+    """Range check and fixed-width encoder for one numeric EX menu."""
+
+    __slots__ = ("num", "lo", "hi", "width", "signed")
+
+    def __init__(self, num, lo, hi, width, signed):
+        self.num = num
+        self.lo = lo
+        self.hi = hi
+        self.width = width
+        self.signed = signed
+
+    def parse(self, value):
+        """Integer value of a raw menu string, or raise ValueError."""
+        text = value.strip() if isinstance(value, str) else bytes(value).decode("ascii").strip()
+        body = text[1:] if text[:1] in "+-" else text
+        if not body.isdigit():
+            raise ValueError(f"not a number: {text!r}")
+        if text[:1] in "+-" and not self.signed:
+            raise ValueError(f"sign not allowed: {text!r}")
+        n = int(text)
+        if not self.lo <= n <= self.hi:
+            raise ValueError(f"{n} outside {self.lo}..{self.hi}")
+        return n
+
+    def encode(self, n):
+        if self.signed:
+            return b"%c%0*d" % (43 if n >= 0 else 45, self.width, abs(n))
+        return b"%0*d" % (self.width, n)
+
+    def normalize(self, value):
+        return self.encode(self.parse(value))
+
+
+class TextValidator:
+    """Free-form menus (time zone, callsign) that are only length-checked."""
+
+    __slots__ = ("num", "width")
+
+    def __init__(self, num, width):
+        self.num = num
+        self.width = width
+
+    def normalize(self, value):
+        raw = value.encode("ascii") if isinstance(value, str) else bytes(value)
+        if not raw or len(raw) > self.width or not all(32 < b < 127 for b in raw):
+            raise ValueError(f"bad text value {raw!r}")
+        return raw
+
+
+def compile_validators(schema=SCHEMA):
+    """One validator per menu, built once from the menu schema."""
+    validators = {}
+    for spec in schema.values():
+        if spec.text:
+            validators[spec.num] = TextValidator(spec.num, spec.width)
+        else:
+            validators[spec.num] = MenuValidator(spec.num, spec.lo, spec.hi, spec.width,
+                                                 spec.signed)
+    return validators
+
+
+def validate_menus(items, validators):
+    """Check every (menu, value) pair in one pass before anything is sent.
+
+    Returns (normalized pairs, errors). errors is a list of
+    (menu, value, reason); unknown menus are errors too.
+    """
+    good = []
+    errors = []
+    for num, val in items:
+        v = validators.get(num)
+        if v is None:
+            errors.append((num, val, "unknown menu"))
+            continue
+        try:
+            good.append((num, v.normalize(val)))
+        except (ValueError, UnicodeDecodeError) as e:
+            errors.append((num, val, str(e)))
+    return good, errors
+
+
+def format_errors(errors, limit=8):
+    lines = [f"menu {num:03d}: {reason}" for num, _val, reason in errors[:limit]]
+    if len(errors) > limit:
+        lines.append(f"... and {len(errors) - limit} more")
+    return "\n".join(lines)
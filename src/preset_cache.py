@@ -0,0 +1,113 @@
+import hashlib
+import struct
+import threading
+import xml.etree.ElementTree as ET
+from array import array
+from pathlib import Path
+
+CACHE_SUFFIX = ".ftc"
+_MAGIC = b"FTC1"
+_HEADER = struct.Struct("<4sqq20sH")     # magic, mtime_ns, size, sha1, count
+
+_lock = threading.Lock()
+_by_path = {}       # str(path) -> (mtime_ns, size, CompiledPreset)
+_by_digest = {}     # sha1 -> CompiledPreset, so identical files share one entry
+
+
+class CompiledPreset:
+    """A preset file reduced to menu numbers and raw values."""
+
+    __slots__ = ("digest", "menus", "values")
+
+    def __init__(self, digest, menus, values):
+        self.digest = digest
+        self.menus = menus              # array('H') of menu numbers
+        self.values = values            # tuple of ASCII value bytes
+
+    def __len__(self):
+        return len(self.menus)
+
+    def to_bytes(self, mtime_ns, size):
+        parts = [_HEADER.pack(_MAGIC, mtime_ns, size, self.digest, len(self.menus))]
+        for n, v in zip(self.menus, self.values):
+            parts.append(struct.pack("<HB", n, len(v)))
+            parts.append(v)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, mtime_ns, size, digest, count = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError("not a compiled preset")
+        menus = array("H")
+        values = []
+        pos = _HEADER.size
+        for _ in range(count):
+            n, ln = struct.unpack_from("<HB", data, pos)
+            pos += 3
+            menus.append(n)
+            values.append(bytes(data[pos:pos + ln]))
+            pos += ln
+        return mtime_ns, size, cls(digest, menus, tuple(values))
+
+
+def _compile_xml(data, digest):
+    menus = array("H")
+    values = []
+    for item in ET.fromstring(data).iter("YaesuFT991A_MenuItems"):
+        value = item.findtext("MENU_VALUE").strip()
+        if value == "----":     # menu didn't answer when the backup was taken
+            continue
+        menus.append(int(item.findtext("MENU_NUMBER").strip()))
+        values.append(value.encode("ascii"))
+    return CompiledPreset(digest, menus, tuple(values))
+
+
+def sidecar_path(path):
+    path = Path(path)
+    return path.with_name(path.name + CACHE_SUFFIX)
+
+
+def load_compiled(path):
+    """Compiled form of a preset XML, parsing it only when its content changed.
+
+    Lookup order: this process (path + mtime), the sidecar file next to
+    the XML, any already-compiled file with the same content hash, and
+    only then ET.
+    """
+    path = Path(path)
+    st = path.stat()
+    key = str(path)
+
+    with _lock:
+        hit = _by_path.get(key)
+        if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            return hit[2]
+
+    side = sidecar_path(path)
+    try:
+        mtime_ns, size, preset = CompiledPreset.from_bytes(side.read_bytes())
+        if mtime_ns == st.st_mtime_ns and size == st.st_size:
+            with _lock:
+                preset = _by_digest.setdefault(preset.digest, preset)
+                _by_path[key] = (mtime_ns, size, preset)
+            return preset
+    except (OSError, ValueError, struct.error):
+        pass
+
+    data = path.read_bytes()
+    digest = hashlib.sha1(data).digest()
+    with _lock:
+        preset = _by_digest.get(digest)
+    if preset is None:
+        preset = _compile_xml(data, digest)
+
+    try:
+        side.write_bytes(preset.to_bytes(st.st_mtime_ns, st.st_size))
+    except OSError:
+        pass
+
+    with _lock:
+        preset = _by_digest.setdefault(digest, preset)
+        _by_path[key] = (st.st_mtime_ns, st.st_size, preset)
+    return preset
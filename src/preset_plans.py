@@ -0,0 +1,192 @@
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import NamedTuple
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+import cat_protocol as cat
+from cat_engine import CatEngine
+from menu_transaction import verify_menus
+from menu_validation import format_errors, validate_menus
+from preset_cache import load_compiled
+from preset_stack import PresetStack
+
+VFO_ATTEMPTS = 4
+MIN_MENU_WAIT = 0.25
+
+
+@dataclass(frozen=True)
+class PresetPlan:
+    key: str
+    title: str
+    layers: tuple               # preset files, base first; later files override
+    memory: int | None = None   # None: leave memory alone, 0: force VFO
+    mode: str | None = None     # MD code after "MD", e.g. "0C" for DATA-U
+    extra: tuple = ()           # raw CAT commands sent after everything else
+
+
+# every plan is the full default snapshot plus its overlays, so the diff
+# against menu_cache undoes whatever the previous plan changed
+BASE = "defaultv002.xml"
+APRS = (BASE, "aprs.xml")
+
+PRESET_PLANS = {
+    plan.key: plan for plan in (
+        PresetPlan("default", "Default", (BASE,), memory=4),
+        PresetPlan("default2", "Mic simplex", (BASE, "overrides_only.xml"), memory=59),
+        PresetPlan("mic_d3", "Mic darn3", (BASE, "overrides_only.xml"), memory=4),
+        PresetPlan("ft8", "FT8", (BASE, "ft8_overrides.xml"), memory=0, mode="0C"),
+        PresetPlan("winlink", "Winlink", APRS, memory=53),
+        PresetPlan("aprs", "APRS-pinpoint", APRS, memory=52),
+        PresetPlan("aprs_simplex", "APRS simplex", APRS, memory=59),
+        PresetPlan("ssb", "SSB", (BASE,), memory=60, mode="00"),
+        PresetPlan("wiresx", "WIRES-X", APRS + ("wiresx_overrides.xml",), memory=1),
+    )
+}
+
+
+class PlanStage(NamedTuple):
+    name: str
+    data: bytes
+    kind: str                   # settle profile key
+    query: bytes | None = None  # read-back that proves the stage landed
+    check: object = None        # reply -> bool
+    resend: bool = True         # False: poll the read-back, never rewrite data
+
+
+def compile_plan(plan, changes):
+    """Turn a plan and its pending menu changes into the minimal list of batched writes."""
+    stages = []
+    if changes:
+        last = cat.encode_ex(*changes[-1])
+        # the radio works through the batch in order, so the last menu
+        # reading back means the rest are in too
+        stages.append(PlanStage("menus", PresetStack.encode(changes), "EX",
+                                cat.query_ex(changes[-1][0]),
+                                lambda r, v=last: r == v, resend=False))
+    if plan.memory == 0:
+        stages.append(PlanStage("vfo", cat.VM0, "VM", cat.Q_MC,
+                                lambda r: cat.decode_mc(r) == 0))
+    elif plan.memory is not None:
+        stages.append(PlanStage("vm", cat.VM1, "VM"))
+        stages.append(PlanStage("memory", cat.encode_mc(plan.memory), "MC", cat.Q_MC,
+                                lambda r, ch=plan.memory: cat.decode_mc(r) == ch))
+    if plan.mode:
+        cmd = b"MD%s;" % plan.mode.encode("ascii")
+        stages.append(PlanStage("mode", cmd, "MD", cat.Q_MD, lambda r, v=cmd: r == v))
+    if plan.extra:
+        stages.append(PlanStage("extra", b"".join(plan.extra), "CMD"))
+    return stages
+
+
+class PresetExecutor(QObject):
+    """Runs one compiled plan on a worker thread and reports back by signal."""
+
+    stage_done = pyqtSignal(str, float)
+    finished = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+    def __init__(self, engine: CatEngine, base_dir, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.base_dir = Path(base_dir)
+        self.validators = None
+        self.verify = False         # read back every menu written, not just the last
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, plan: PresetPlan):
+        if self.is_running():
+            return False
+        self._thread = threading.Thread(target=self._run, args=(plan,), daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self, plan):
+        try:
+            self.finished.emit(self.execute(plan))
+        except Exception as e:
+            self.failed.emit(f"{plan.title}: {e}")
+
+    def execute(self, plan):
+        timings = []
+
+        t0 = time.perf_counter()
+        stack = PresetStack(load_compiled(self._resolve(f)) for f in plan.layers)
+        effective = stack.effective()
+        if self.validators is not None:
+            good, errors = validate_menus(effective.items(), self.validators)
+            if errors:
+                raise ValueError(f"preset rejected, nothing sent:\n{format_errors(errors)}")
+            effective = dict(good)
+        changes = stack.diff(self.engine.menu_cache, effective)
+        stages = compile_plan(plan, changes)
+        timings.append(("compile", time.perf_counter() - t0))
+        self.stage_done.emit("compile", timings[-1][1])
+
+        unconfirmed = []
+        verify_rows = []
+        with self.engine.lock:
+            for stage in stages:
+                t0 = time.perf_counter()
+                ok = self._run_stage(stage, len(changes))
+                if stage.name == "menus":
+                    self._remember_menus(changes, ok)
+                    if self.verify:
+                        verify_rows = verify_menus(self.engine, changes)
+                        ok = all(row[3] for row in verify_rows)
+                if not ok:
+                    unconfirmed.append(stage.name)
+                timings.append((stage.name, time.perf_counter() - t0))
+                self.stage_done.emit(stage.name, timings[-1][1])
+
+            t0 = time.perf_counter()
+            actual = cat.decode_mc(self.engine.query(cat.Q_MC))
+            tag = None
+            if actual:
+                tag = cat.decode_mt_tag(self.engine.query(cat.query_mt(actual)))
+            timings.append(("verify", time.perf_counter() - t0))
+            self.stage_done.emit("verify", timings[-1][1])
+
+        return {
+            "plan": plan,
+            "menu_file": " + ".join(plan.layers),
+            "menus": len(changes),
+            "menus_total": len(effective),
+            "memory": actual,
+            "unconfirmed": unconfirmed,
+            "tag": tag,
+            "verify": verify_rows,
+            "timings": timings,
+        }
+
+    def _resolve(self, name):
+        path = Path(name)
+        if not path.is_absolute():
+            path = self.base_dir / path
+        return path
+
+    def _remember_menus(self, changes, confirmed):
+        cache = self.engine.menu_cache
+        for num, val in changes:
+            if confirmed:
+                cache[num] = val
+            else:
+                cache.pop(num, None)
+
+    def _run_stage(self, stage, menu_count):
+        engine = self.engine
+        if stage.query is None:
+            engine.write(stage.data)
+            engine.settle_for(stage.kind)
+            return True
+        if not stage.resend:
+            engine.write(stage.data)
+            budget = max(MIN_MENU_WAIT, menu_count * engine.delay(stage.kind))
+            return engine.wait_for(stage.query, stage.check, budget) is not None
+        retries = VFO_ATTEMPTS - 1 if stage.name == "vfo" else 2
+        return engine.send_verified(stage.data, stage.kind, stage.query, stage.check, retries)
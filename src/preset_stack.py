@@ -0,0 +1,40 @@
+from functools import lru_cache
+
+import cat_protocol as cat
+
+
+class PresetStack:
+    """A base preset plus overlays, resolved to one menu map.
+
+    Later layers win. Layers are CompiledPreset objects, which never
+    change, so the last few merged maps are memoized per layer tuple.
+    """
+
+    def __init__(self, layers):
+        self.layers = tuple(layers)
+
+    def effective(self):
+        return _merge(self.layers)
+
+    def diff(self, known, effective=None):
+        """(menu, value) pairs the radio still needs, given the values it is known to hold.
+
+        Menus missing from known count as different. Pass effective to
+        diff an already validated/normalized copy of the merged map.
+        """
+        if effective is None:
+            effective = self.effective()
+        return [(num, val) for num, val in sorted(effective.items())
+                if known.get(num) != val]
+
+    @staticmethod
+    def encode(changes):
+        return b"".join(cat.encode_ex(num, val) for num, val in changes)
+
+
+@lru_cache(maxsize=16)
+def _merge(layers):
+    merged = {}
+    for layer in layers:
+        merged.update(zip(layer.menus, layer.values))
+    return merged
@@ -0,0 +1,231 @@
+import asyncio
+import threading
+import time
+from typing import NamedTuple
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+import cat_protocol as cat
+from cat_worker import CatWorker
+from scanner_udp import SCANNER_HOST, SCANNER_PORT, ScannerClient, ScannerError
+
+# FT-991A receive coverage
+RX_RANGES = ((30_000, 56_000_000), (118_000_000, 164_000_000), (420_000_000, 470_000_000))
+
+# scanner modulation -> 991A mode
+SCANNER_MODES = {"FM": "FM", "NFM": "FM-N", "AM": "AM", "NAM": "AM-N", "USB": "USB", "LSB": "LSB"}
+
+
+class ScannerHit(NamedTuple):
+    when: float
+    status: object      # ScannerStatus
+
+
+class RadioBackend(QObject):
+    """One radio at the station, with its own I/O worker.
+
+    Backends never block the GUI thread or touch widgets: everything they
+    learn arrives as signals, and the controller writes it into the
+    StationState under the backend's name.
+    """
+
+    name = ""
+
+    online = pyqtSignal(bool)
+    freq_read = pyqtSignal(int)
+    failed = pyqtSignal(str)
+
+    def is_open(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def can_tune(self, hz):
+        return False
+
+    def tune(self, hz, mode=None):
+        self.failed.emit(f"{self.name} can't be tuned from here")
+        return False
+
+
+class YaesuBackend(RadioBackend):
+    """FT-991A over the CatEngine the controller opened.
+
+    Tune requests run as CatWorker jobs under the engine lock. Only the
+    newest request waits while one is on the wire, so a burst of scanner
+    hits ends on the last one rather than queueing them all up.
+    """
+
+    name = "FT-991A"
+    idle = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.engine = None
+        self._pending = None
+        self._worker = CatWorker(self)
+        self._worker.finished.connect(self._on_tuned)
+        self._worker.failed.connect(self._on_failed)
+
+    def attach(self, engine):
+        self.engine = engine
+        self.online.emit(True)
+
+    def detach(self):
+        self.engine = None
+        self._pending = None
+        self.online.emit(False)
+
+    def is_open(self):
+        return self.engine is not None
+
+    def is_busy(self):
+        return self._worker.is_running()
+
+    def can_tune(self, hz):
+        return any(lo <= hz <= hi for lo, hi in RX_RANGES)
+
+    def tune(self, hz, mode=None):
+        if not self.is_open():
+            self.failed.emit(f"{self.name} is not connected")
+            return False
+        if not self.can_tune(hz):
+            self.failed.emit(f"{hz / 1e6:.4f} MHz is outside the {self.name} receive range")
+            return False
+        self._pending = (hz, mode if mode in cat.MD_CODES else None)
+        if not self._worker.is_running():
+            self._start_next()
+        return True
+
+    def _start_next(self):
+        hz, mode = self._pending
+        self._pending = None
+        self._worker.start(self._tune_job, self.engine, hz, mode)
+
+    @staticmethod
+    def _tune_job(report, engine, hz, mode):
+        with engine.lock:
+            if cat.decode_mc(engine.query(cat.Q_MC)) != 0:
+                engine.write(cat.VM0)
+                engine.settle_for("VM")
+            if mode:
+                engine.write(cat.encode_md(mode))
+                engine.settle_for("MD")
+            engine.write(cat.encode_fa(hz))
+            engine.settle_for("FA")
+            return cat.decode_fa(engine.query(cat.Q_FA)) or hz
+
+    def _on_tuned(self, hz):
+        self.freq_read.emit(hz)
+        self._next_or_idle()
+
+    def _on_failed(self, message):
+        self.failed.emit(message)
+        self._next_or_idle()
+
+    def _next_or_idle(self):
+        if self._pending is not None and self.engine is not None:
+            self._start_next()
+        else:
+            self._pending = None
+            self.idle.emit()
+
+
+class ScannerBackend(RadioBackend):
+    """SDS200 over UDP: an asyncio loop on its own thread polls GSI.
+
+    A hit is the squelch opening, or the scanner landing on a new
+    frequency while open. The scanner goes offline after OFFLINE_AFTER
+    polls in a row get no answer, and back online with the next one.
+    """
+
+    name = "SDS200"
+    status_read = pyqtSignal(object)
+    hit = pyqtSignal(object)
+
+    POLL_S = 0.5
+    OFFLINE_AFTER = 3
+    CLOSE_WAIT_S = 2.0
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._thread = None
+        self._stop = threading.Event()
+        self._loop = None
+        self._task = None
+
+    def open(self, host=SCANNER_HOST, port=SCANNER_PORT):
+        if self.is_open():
+            return False
+        # each session gets its own stop flag, so a poller still winding down can't see it cleared
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(host, port, self._stop), daemon=True)
+        self._thread.start()
+        return True
+
+    def is_open(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def close(self):
+        """Stop polling and wait (up to CLOSE_WAIT_S) for the poller to finish."""
+        self._stop.set()
+        loop, task = self._loop, self._task
+        if loop is not None and task is not None:
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                pass            # loop already closed: the thread is on its way out
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(self.CLOSE_WAIT_S)
+
+    def _run(self, host, port, stop):
+        error = None
+        try:
+            asyncio.run(self._main(host, port, stop))
+        except Exception as e:
+            error = str(e)
+        stop.set()          # is_open() is False by the time these land
+        if error:
+            self.failed.emit(error)
+        self.online.emit(False)
+
+    async def _main(self, host, port, stop):
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        # close() may have run before the loop and task were there to cancel
+        if stop.is_set():
+            return
+        last = None
+        misses = 0
+        try:
+            async with ScannerClient(host, port) as client:
+                print(f"[DEBUG] Scanner polling {host}:{port}")
+                while not stop.is_set():
+                    started = self._loop.time()
+                    try:
+                        reply = await client.request("GSI")
+                    except ScannerError as e:
+                        misses += 1
+                        if misses == self.OFFLINE_AFTER:
+                            print(f"[DEBUG] Scanner offline: {e}")
+                            self.online.emit(False)
+                    else:
+                        if misses >= self.OFFLINE_AFTER or last is None:
+                            self.online.emit(True)
+                        misses = 0
+                        status = reply.status()
+                        self.status_read.emit(status)
+                        if status.freq_hz:
+                            self.freq_read.emit(status.freq_hz)
+                        if (not status.muted and status.freq_hz
+                                and (last is None or last.muted or last.freq_hz != status.freq_hz)):
+                            self.hit.emit(ScannerHit(time.time(), status))
+                        last = status
+                    await asyncio.sleep(max(0.0, self.POLL_S - (self._loop.time() - started)))
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if self._task is asyncio.current_task():
+                self._loop = self._task = None
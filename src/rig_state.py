@@ -0,0 +1,105 @@
+from collections import deque
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class RigState(QObject):
+    """Last known radio state. Only the CAT reader writes here; widgets listen."""
+
+    freq_changed = pyqtSignal(int)
+    mode_changed = pyqtSignal(str)
+    tx_changed = pyqtSignal(bool)
+    memory_changed = pyqtSignal(int)
+    meter_changed = pyqtSignal(str, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.freq_hz = None
+        self.mode = None
+        self.is_tx = False
+        self.memory = None
+        self.meters = {}
+
+    def set_freq(self, hz):
+        if hz is None or hz == self.freq_hz:
+            return
+        self.freq_hz = hz
+        self.freq_changed.emit(hz)
+
+    def set_mode(self, mode):
+        if not mode or mode == self.mode:
+            return
+        self.mode = mode
+        self.mode_changed.emit(mode)
+
+    def set_tx(self, is_tx):
+        is_tx = bool(is_tx)
+        if is_tx == self.is_tx:
+            return
+        self.is_tx = is_tx
+        self.tx_changed.emit(is_tx)
+
+    def set_memory(self, channel):
+        # 0 means VFO, anything else is a memory channel number
+        if channel is None or channel == self.memory:
+            return
+        self.memory = channel
+        self.memory_changed.emit(channel)
+
+    def set_meter(self, name, value):
+        if self.meters.get(name) == value:
+            return
+        self.meters[name] = value
+        self.meter_changed.emit(name, value)
+
+    def reset(self):
+        self.freq_hz = None
+        self.mode = None
+        self.memory = None
+        self.meters = {}
+        self.set_tx(False)
+
+
+class StationState(QObject):
+    """Last known state of every radio at the station, keyed by backend name.
+
+    The 991A's RigState feeds its frequency in here too, so the radios
+    panel reads one model whichever backend a value came from.
+    """
+
+    freq_changed = pyqtSignal(str, int)
+    online_changed = pyqtSignal(str, bool)
+    status_changed = pyqtSignal(str, object)
+    hit_added = pyqtSignal(object)
+
+    HIT_HISTORY = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.freqs = {}
+        self.online = {}
+        self.status = {}
+        self.hits = deque(maxlen=self.HIT_HISTORY)
+
+    def set_freq(self, name, hz):
+        if hz is None or self.freqs.get(name) == hz:
+            return
+        self.freqs[name] = hz
+        self.freq_changed.emit(name, hz)
+
+    def set_online(self, name, online):
+        online = bool(online)
+        if self.online.get(name) == online:
+            return
+        self.online[name] = online
+        self.online_changed.emit(name, online)
+
+    def set_status(self, name, status):
+        if self.status.get(name) == status:
+            return
+        self.status[name] = status
+        self.status_changed.emit(name, status)
+
+    def add_hit(self, hit):
+        self.hits.append(hit)
+        self.hit_added.emit(hit)
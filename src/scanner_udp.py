@@ -0,0 +1,224 @@
+import asyncio
+import itertools
+import sys
+import xml.etree.ElementTree as ET
+from collections import deque
+from typing import NamedTuple
+
+from scanner_xml import XML_MARK, XmlReplyParser, scanner_status
+
+SCANNER_HOST = "192.168.10.10"
+SCANNER_PORT = 50536
+
+
+class ScannerError(Exception):
+    pass
+
+
+class ScannerReply(NamedTuple):
+    command: str
+    fields: list        # plain replies: the comma fields after the command
+    items: list         # XML replies: a ListItem per element under the root, in order
+    root: str = None
+    attrs: dict = None  # attributes of the XML root (GSI: Mode, V_Screen)
+
+    def status(self):
+        """ScannerStatus of a GSI reply."""
+        return scanner_status(self.attrs or {}, self.items)
+
+
+class _Exchange:
+    """One request on the wire, waiting for (all of) its reply."""
+
+    def __init__(self, seq, command, line, xml, on_item=None):
+        self.seq = seq
+        self.command = command
+        self.line = line
+        self.on_item = on_item
+        self.parser = XmlReplyParser(on_item) if xml else None
+        self.future = asyncio.get_running_loop().create_future()
+        self.heard = asyncio.Event()    # set on every datagram for this exchange
+
+    def feed(self, data):
+        if self.future.done():
+            return
+        if self.parser is not None and (self.parser.packets or XML_MARK in data):
+            try:
+                done = self.parser.feed(data)
+            except ET.ParseError as e:
+                self.future.set_exception(ScannerError(f"{self.command}: bad XML reply ({e})"))
+                return
+            if done:
+                p = self.parser
+                self.future.set_result(ScannerReply(self.command, [], p.items, p.root_tag,
+                                                    p.root_attrs))
+            return
+        text = data.decode("latin-1").strip("\r\n")
+        fields = text.split(",")
+        if fields[-1] == "NG" or text == "ERR":
+            self.future.set_exception(ScannerError(f"{self.line.strip()}: {text}"))
+        else:
+            self.future.set_result(ScannerReply(self.command, fields[1:], []))
+
+
+class _Protocol(asyncio.DatagramProtocol):
+    def __init__(self, client):
+        self.client = client
+
+    def datagram_received(self, data, addr):
+        self.client._on_datagram(data)
+
+    def error_received(self, exc):
+        print(f"[DEBUG] Scanner UDP error: {exc}")
+
+
+class ScannerClient:
+    """Asyncio client for the SDS200 virtual serial port over UDP.
+
+    One socket stays open for the life of the client. The scanner echoes
+    the command name at the start of every reply but carries no request
+    id, so each request gets a sequence number and replies are matched to
+    the oldest request still waiting on that command; one request per
+    command is on the wire at a time. XML continuation packets carry no
+    command at all, so only one XML request is on the wire at a time. A
+    request is resent after timeout seconds with no datagram for it, up
+    to retries times.
+    """
+
+    def __init__(self, host=SCANNER_HOST, port=SCANNER_PORT, timeout=0.4, retries=3):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self._transport = None
+        self._waiting = {}      # command -> deque of _Exchange
+        self._locks = {}        # command -> asyncio.Lock
+        self._xml_lock = None   # shared by every XML command
+        self._seq = itertools.count(1)
+
+    async def connect(self):
+        if self._transport is None:
+            loop = asyncio.get_running_loop()
+            self._transport, _ = await loop.create_datagram_endpoint(
+                lambda: _Protocol(self), remote_addr=(self.host, self.port))
+        return self
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        for queue in self._waiting.values():
+            for ex in queue:
+                if not ex.future.done():
+                    ex.future.set_exception(ScannerError("connection closed"))
+        self._waiting.clear()
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    async def request(self, command, *args, xml=None, on_item=None):
+        """Send 'command,args...' and return its ScannerReply.
+
+        xml defaults to True for the G.. list/info commands (GLT, GSI, ...)
+        that answer with 'CMD,<XML>,'. on_item(ListItem) is called as each
+        entry of an XML reply arrives; after a retry it starts over.
+        """
+        command = command.upper()
+        line = ",".join([command, *map(str, args)]) + "\r"
+        if xml is None:
+            xml = command in ("GLT", "GSI", "GWF", "PSI")
+        if xml:
+            if self._xml_lock is None:
+                self._xml_lock = asyncio.Lock()
+            lock = self._xml_lock
+        else:
+            lock = self._locks.setdefault(command, asyncio.Lock())
+        async with lock:
+            await self.connect()
+            ex = _Exchange(next(self._seq), command, line, xml, on_item)
+            self._waiting.setdefault(command, deque()).append(ex)
+            try:
+                return await self._run(ex)
+            finally:
+                queue = self._waiting.get(command)
+                if queue and ex in queue:
+                    queue.remove(ex)
+
+    async def _run(self, ex):
+        for attempt in range(self.retries + 1):
+            if attempt:
+                print(f"[DEBUG] Scanner {ex.command} #{ex.seq}: no reply, retry {attempt}")
+                if ex.parser is not None:
+                    ex.parser = XmlReplyParser(ex.on_item)
+            self._transport.sendto(ex.line.encode("ascii"))
+            # keep waiting while datagrams arrive; a silent gap means a lost packet
+            while not ex.future.done():
+                ex.heard.clear()
+                try:
+                    await asyncio.wait_for(ex.heard.wait(), self.timeout)
+                except asyncio.TimeoutError:
+                    break
+            if ex.future.done():
+                return ex.future.result()
+        raise ScannerError(f"{ex.command}: no reply after {self.retries + 1} tries")
+
+    def _on_datagram(self, data):
+        head = data[:8].split(b",", 1)[0].strip().decode("latin-1").upper()
+        queue = self._waiting.get(head)
+        if not queue:
+            if head == "ERR":
+                queue = min((q for q in self._waiting.values() if q),
+                            key=lambda q: q[0].seq, default=None)
+            else:
+                # an XML continuation packet has no header: it belongs to the
+                # XML exchange already part way through its reply
+                queue = next((q for q in self._waiting.values()
+                              if q and q[0].parser is not None and q[0].parser.packets), None)
+        if not queue:
+            print(f"[DEBUG] Scanner: unmatched reply {data[:40]!r}")
+            return
+        ex = queue[0]
+        ex.feed(data)
+        ex.heard.set()
+
+    async def poll(self, interval, *commands, on_reply=None):
+        """Send each command every interval seconds until cancelled.
+
+        on_reply(reply) gets each answer; a failed request is reported
+        and polling carries on.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            for cmd in commands:
+                parts = cmd.split(",")
+                try:
+                    reply = await self.request(parts[0], *parts[1:])
+                except ScannerError as e:
+                    print(f"[DEBUG] Scanner poll {cmd}: {e}")
+                    continue
+                if on_reply is not None:
+                    on_reply(reply)
+            await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+
+
+async def _probe(host, command):
+    parts = command.split(",")
+    async with ScannerClient(host) as client:
+        reply = await client.request(parts[0], *parts[1:],
+                                     on_item=lambda item: print(f"  {item.kind} {item.index} {item.name!r}"
+                                                                f" {item.freq_hz or ''}"))
+    if reply.root is None:
+        print(",".join([reply.command, *reply.fields]))
+        return
+    print(f"{reply.command}: <{reply.root}> with {len(reply.items)} items")
+    if reply.root == "ScannerInfo":
+        print(f"  {reply.status()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_probe(sys.argv[1] if len(sys.argv) > 1 else SCANNER_HOST,
+                       sys.argv[2] if len(sys.argv) > 2 else "GLT,FL"))
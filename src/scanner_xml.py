@@ -0,0 +1,143 @@
+import xml.etree.ElementTree as ET
+from typing import NamedTuple
+
+XML_MARK = b"<XML>,"
+
+
+class ListItem(NamedTuple):
+    """One entry of a GLT list or GSI reply: <FL>, <SYS>, <CFREQ>, <System>, <Property>..."""
+    kind: str
+    index: str = ""
+    name: str = ""
+    avoid: bool = False
+    freq_hz: int = 0
+    mod: str = ""
+    attrs: dict = None      # every attribute of the element
+
+
+class ScannerStatus(NamedTuple):
+    """What a GSI reply says the scanner is doing."""
+    mode: str = ""
+    screen: str = ""
+    system: str = ""
+    department: str = ""
+    channel: str = ""
+    freq_hz: int = 0
+    mod: str = ""
+    sig: int = 0
+    muted: bool = True
+
+
+def parse_freq(text):
+    """' 154.4150MHz' -> 154415000; plain digits are Hz. 0 if empty or unreadable."""
+    t = (text or "").strip().upper()
+    try:
+        if t.endswith("MHZ"):
+            return round(float(t[:-3]) * 1_000_000)
+        if t.endswith("KHZ"):
+            return round(float(t[:-3]) * 1_000)
+        return int(t) if t else 0
+    except ValueError:
+        return 0
+
+
+def list_item(elem):
+    a = elem.attrib
+    return ListItem(elem.tag, a.get("Index", ""), a.get("Name", ""),
+                    a.get("Avoid", "Off") not in ("Off", ""),
+                    parse_freq(a.get("Freq")), a.get("Mod", ""), dict(a))
+
+
+def scanner_status(root_attrs, items):
+    """Fold the items of a GSI reply into a ScannerStatus."""
+    by_kind = {}
+    for item in items:
+        by_kind.setdefault(item.kind, item)
+    chan = by_kind.get("ConvFrequency") or by_kind.get("TGID") or by_kind.get("SiteFrequency")
+    site = by_kind.get("SiteFrequency")
+    props = (by_kind["Property"].attrs or {}) if "Property" in by_kind else {}
+    try:
+        sig = int(props.get("Sig", 0))
+    except ValueError:
+        sig = 0
+    return ScannerStatus(
+        root_attrs.get("Mode", ""), root_attrs.get("V_Screen", ""),
+        by_kind["System"].name if "System" in by_kind else "",
+        by_kind["Department"].name if "Department" in by_kind else "",
+        chan.name if chan else "",
+        (chan and chan.freq_hz) or (site and site.freq_hz) or 0,
+        (chan and chan.mod) or (by_kind["Site"].mod if "Site" in by_kind else ""),
+        sig, props.get("Mute", "Mute") == "Mute")
+
+
+class XmlReplyParser:
+    """Reassembles one XML reply (GLT, GSI, ...) from its datagrams.
+
+    Each datagram goes straight into an XMLPullParser. Large replies come
+    as several packets, each starting with 'CMD,<XML>,' and holding a
+    <Footer No=".." EOT=".."/>; a packet with that header starts a new
+    document, one without continues the current one. The reply is
+    complete at EOT="1", or when a document closes and no footer was sent.
+
+    Every element under the root becomes a ListItem as soon as it closes
+    and is dropped from the tree, so a long list never sits in memory as
+    XML; on_item(item) sees each one while the rest is still arriving.
+    """
+
+    def __init__(self, on_item=None):
+        self.items = []         # ListItems, in arrival order
+        self.root_tag = None
+        self.root_attrs = {}
+        self.packets = 0
+        self.done = False
+        self.on_item = on_item
+        self._parser = None
+        self._root = None
+        self._depth = 0
+        self._footers = 0
+
+    def feed(self, data):
+        """Feed one datagram. Returns True once the reply is complete."""
+        view = memoryview(data)
+        mark = data.find(XML_MARK)
+        if mark >= 0 and data[:mark].rstrip(b",").isalnum():
+            view = view[mark + len(XML_MARK):]
+            self._start()
+        elif self._parser is None:
+            self._start()
+        self.packets += 1
+        if self._fresh:
+            # the declaration has to come first: skip the '\r' after the header
+            skip = 0
+            while skip < len(view) and view[skip] in b" \t\r\n":
+                skip += 1
+            view = view[skip:]
+            self._fresh = not view
+        self._parser.feed(view)
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._depth += 1
+                if self._depth == 1:
+                    self._root = elem
+                    self.root_tag = elem.tag
+                    self.root_attrs.update(elem.attrib)
+                continue
+            self._depth -= 1
+            if self._depth == 1:
+                if elem.tag == "Footer":
+                    self._footers += 1
+                    self.done = self.done or elem.get("EOT") == "1"
+                else:
+                    item = list_item(elem)
+                    self.items.append(item)
+                    if self.on_item is not None:
+                        self.on_item(item)
+                self._root.remove(elem)
+            elif self._depth == 0 and not self._footers:
+                self.done = True
+        return self.done
+
+    def _start(self):
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._depth = 0
+        self._fresh = True
@@ -0,0 +1,70 @@
+from array import array
+
+MIN_QUERY = 2
+
+
+def load_master(path):
+    """Calls from a MASTER.SCP-style list: one per line, '#' starts a comment."""
+    calls = []
+    with open(path, encoding="ascii", errors="replace") as f:
+        for line in f:
+            call = line.split("#", 1)[0].strip().upper()
+            if call:
+                calls.append(call)
+    return calls
+
+
+def _grams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class PartialIndex:
+    """Super check partial: every call containing what has been typed so far.
+
+    Calls are numbered shortest-first, then alphabetically, and each
+    bigram and trigram keeps the sorted numbers of the calls holding it.
+    A query intersects the postings of its rarest grams and checks the
+    survivors, which already come out in ranking order, so it can stop
+    at the first k hits.
+    """
+
+    def __init__(self, calls):
+        self.calls = sorted({c.strip().upper() for c in calls if c.strip()},
+                            key=lambda c: (len(c), c))
+        postings = {}
+        for i, call in enumerate(self.calls):
+            for gram in _grams(call, 2) | _grams(call, 3):
+                postings.setdefault(gram, array("I")).append(i)
+        self._postings = postings
+
+    @classmethod
+    def from_cty(cls, resolver, master=()):
+        return cls(list(resolver.exception_calls()) + list(master))
+
+    def __len__(self):
+        return len(self.calls)
+
+    def search(self, text, k=10):
+        """Up to k calls containing text; calls starting with it come first."""
+        text = text.strip().upper()
+        if len(text) < MIN_QUERY:
+            return []
+        n = 3 if len(text) >= 3 else 2
+        lists = sorted((self._postings.get(g, ()) for g in _grams(text, n)), key=len)
+        if not lists or not lists[0]:
+            return []
+        candidates = lists[0]
+        if len(lists) > 1:
+            others = [set(p) for p in lists[1:3]]      # the rarest few narrow it enough
+            candidates = [i for i in candidates if all(i in s for s in others)]
+
+        starts, inside = [], []
+        for i in candidates:
+            call = self.calls[i]
+            if call.startswith(text):
+                starts.append(call)
+                if len(starts) == k:
+                    break
+            elif len(inside) < k and text in call:
+                inside.append(call)
+        return (starts + inside)[:k]
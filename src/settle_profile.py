@@ -0,0 +1,153 @@
+import json
+import re
+import time
+from pathlib import Path
+
+import cat_protocol as cat
+from memory_channels import decode_memory
+
+PROFILE_DIR = Path(__file__).resolve().parent / "profiles"
+
+# The hand-tuned delays we used before calibration existed
+DEFAULT_SETTLE = {
+    "VM": 0.12,
+    "MC": 0.25,
+    "MD": 0.12,
+    "FA": 0.12,
+    "EX": 0.02,
+    "CMD": 0.20,
+}
+
+SAFETY_FACTOR = 1.5
+MIN_SETTLE = 0.01
+POLL_STEP = 0.01
+PROBE_TIMEOUT = 1.5
+CALIBRATION_MENU = 26   # BEEP LEVEL: harmless to nudge and restore
+
+
+class SettleProfile:
+    def __init__(self, radio_id="default", delays=None, measured_at=None):
+        self.radio_id = radio_id
+        self.delays = dict(DEFAULT_SETTLE)
+        if delays:
+            self.delays.update(delays)
+        self.measured_at = measured_at
+
+    def get(self, kind):
+        return self.delays.get(kind, DEFAULT_SETTLE["CMD"])
+
+    @staticmethod
+    def path_for(radio_id):
+        safe = re.sub(r"[^A-Za-z0-9_-]", "_", radio_id or "default")
+        return PROFILE_DIR / f"settle_{safe}.json"
+
+    @classmethod
+    def load(cls, radio_id):
+        path = cls.path_for(radio_id)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return cls(radio_id, data.get("delays"), data.get("measured_at"))
+        except (OSError, ValueError):
+            return cls(radio_id)
+
+    def save(self):
+        path = self.path_for(self.radio_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "radio_id": self.radio_id,
+            "measured_at": self.measured_at,
+            "delays": self.delays,
+        }
+        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        return path
+
+
+def _time_until(engine, set_cmd, query, check):
+    """Seconds from writing set_cmd until query's reply passes check."""
+    with engine.lock:
+        t0 = time.perf_counter()
+        engine.write(set_cmd)
+        deadline = t0 + PROBE_TIMEOUT
+        while time.perf_counter() < deadline:
+            if check(engine.query(query, timeout_s=0.2)):
+                return time.perf_counter() - t0
+            time.sleep(POLL_STEP)
+    return None
+
+
+def _other_channel(engine, mc):
+    """A filled memory channel near mc to switch to, or None."""
+    for n in (mc + 1, mc - 1, mc + 2, mc - 2, cat.MEM_MIN):
+        if cat.MEM_MIN <= n <= cat.MEM_MAX and n != mc and decode_memory(engine.query(cat.query_mr(n))):
+            return n
+    return None
+
+
+def _probes(engine):
+    """(kind, set command, query, check) tuples, each leaving the radio as found."""
+    probes = []
+
+    hz = cat.decode_fa(engine.query(cat.Q_FA))
+    if hz is not None:
+        nudged = hz + 10 if hz + 10 <= 470_000_000 else hz - 10
+        probes.append(("FA", cat.encode_fa(nudged), cat.Q_FA, lambda r, v=nudged: cat.decode_fa(r) == v))
+        probes.append(("FA", cat.encode_fa(hz), cat.Q_FA, lambda r, v=hz: cat.decode_fa(r) == v))
+
+    mc = cat.decode_mc(engine.query(cat.Q_MC))
+    if mc:
+        probes.append(("VM", cat.VM0, cat.Q_MC, lambda r: cat.decode_mc(r) == 0))
+        probes.append(("VM", cat.VM1, cat.Q_MC, lambda r: bool(cat.decode_mc(r))))
+        other = _other_channel(engine, mc)
+        if other is not None:
+            # a real channel change, then back
+            probes.append(("MC", cat.encode_mc(other), cat.Q_MC, lambda r, v=other: cat.decode_mc(r) == v))
+            probes.append(("MC", cat.encode_mc(mc), cat.Q_MC, lambda r, v=mc: cat.decode_mc(r) == v))
+    elif mc == 0:
+        probes.append(("VM", cat.VM1, cat.Q_MC, lambda r: bool(cat.decode_mc(r))))
+        probes.append(("VM", cat.VM0, cat.Q_MC, lambda r: cat.decode_mc(r) == 0))
+
+    md = engine.query(cat.Q_MD)
+    if md.startswith(b"MD0") and md.endswith(b";") and len(md) == 5:
+        other = cat.encode_md("LSB" if md != cat.encode_md("LSB") else "USB")
+        probes.append(("MD", other, cat.Q_MD, lambda r, v=other: r == v))
+        probes.append(("MD", md, cat.Q_MD, lambda r, v=md: r == v))
+
+    q = cat.query_ex(CALIBRATION_MENU)
+    ex = engine.query(q)
+    if ex.startswith(q[:-1]) and ex.endswith(b";"):
+        val = ex[5:-1]
+        if val.isdigit():
+            nudged = b"%0*d" % (len(val), int(val) + 1 if int(val) < 100 else int(val) - 1)
+            probes.append(("EX", cat.encode_ex(CALIBRATION_MENU, nudged), q, lambda r, v=nudged: r[5:-1] == v))
+            probes.append(("EX", ex, q, lambda r, v=val: r[5:-1] == v))
+
+    return probes
+
+
+def calibrate(engine, radio_id, trials=3, progress=None):
+    """Measure how soon each command type can safely be followed.
+
+    Every probe makes a real change and then restores it, and its delay is
+    the slowest time measured times SAFETY_FACTOR, even when that is below
+    the old hand-tuned value: stages that matter are sent with
+    send_verified, which retries when the readback disagrees. Kinds that
+    never answered keep their default delay.
+    """
+    worst = {}
+    probes = _probes(engine)
+    total = max(1, len(probes) * trials)
+    done = 0
+    for _ in range(trials):
+        for kind, set_cmd, query, check in probes:
+            t = _time_until(engine, set_cmd, query, check)
+            if t is not None:
+                worst[kind] = max(worst.get(kind, 0.0), t)
+            done += 1
+            if progress:
+                progress(int(done * 100 / total))
+
+    delays = {k: max(MIN_SETTLE, round(v * SAFETY_FACTOR, 3)) for k, v in worst.items()}
+    if delays:
+        # CMD also covers replies read with no terminator check (the CAT terminal's read_all)
+        delays["CMD"] = max(delays.values())
+    return SettleProfile(radio_id, delays, time.strftime("%Y-%m-%dT%H:%M:%S"))
@@ -0,0 +1,98 @@
+import re
+import xml.etree.ElementTree as ET
+from typing import NamedTuple
+
+import cat_protocol as cat
+
+_PREFIX = "Properties.Settings.Default."
+_MACRO_KEY = re.compile(r"(FN|Macro)(\d+)(Label|Macro)?$")     # FN1Label, FN1Macro, Macro1Label, Macro1
+_CAT_CMD = re.compile(r"[A-Z]{2}[0-9A-Z+\-. ]*")
+
+# Win4Yaesu span codes are in 100 Hz steps; the radio's own scope span is menu 116
+_SCOPE_SPAN_MENU = 116
+_SCOPE_SPANS = {500: 3, 1000: 4, 2000: 5, 5000: 6, 10000: 7}
+
+
+class FnMacro(NamedTuple):
+    name: str           # "FN1" or "Macro1"
+    label: str
+    source: str         # macro text as Win4Yaesu stored it
+    data: bytes         # pre-encoded CAT bytes, sent in one write
+    skipped: tuple      # commands that have no radio equivalent
+
+
+class Win4YaesuSettings(NamedTuple):
+    com_port: str | None
+    baud_rate: int | None
+    macros: list
+
+
+def read_settings(path):
+    """Property name -> value from a Win4Yaesu settings file, streamed element by element."""
+    settings = {}
+    for _event, elem in ET.iterparse(path, events=("end",)):
+        if elem.tag != "settings":
+            continue
+        name = (elem.findtext("Property") or "").strip()
+        if name.startswith(_PREFIX):
+            settings[name[len(_PREFIX):]] = (elem.findtext("Value") or "").strip()
+        elem.clear()
+    return settings
+
+
+def _translate_internal(cmd):
+    """CAT bytes for a '#' Win4Yaesu command, or None if the radio can't do it."""
+    if cmd.startswith("#SPN") and cmd[4:].isdigit():
+        code = _SCOPE_SPANS.get(int(cmd[4:]))
+        if code is not None:
+            return cat.encode_ex(_SCOPE_SPAN_MENU, b"%02d" % code)
+    return None
+
+
+def compile_macro(text):
+    """Turn a macro string into (CAT bytes, skipped commands)."""
+    parts = []
+    skipped = []
+    for cmd in (c.strip() for c in text.split(";")):
+        if not cmd:
+            continue
+        if cmd.startswith("#"):
+            data = _translate_internal(cmd)
+            if data is None:
+                skipped.append(cmd + ";")
+            else:
+                parts.append(data)
+        elif _CAT_CMD.fullmatch(cmd.upper()):
+            parts.append(cmd.upper().encode("ascii") + b";")
+        else:
+            skipped.append(cmd + ";")
+    return b"".join(parts), tuple(skipped)
+
+
+def import_settings(path):
+    settings = read_settings(path)
+
+    found = {}
+    for key, value in settings.items():
+        m = _MACRO_KEY.match(key)
+        if m:
+            slot = (m.group(1), int(m.group(2)))
+            found.setdefault(slot, {})["Label" if m.group(3) == "Label" else "Macro"] = value
+
+    macros = []
+    # FN keys first, then the numbered macros, each in numeric order
+    for kind, index in sorted(found, key=lambda s: (s[0] != "FN", s[1])):
+        entry = found[(kind, index)]
+        source = entry.get("Macro", "")
+        if not source:
+            continue
+        name = f"{kind}{index}"
+        data, skipped = compile_macro(source)
+        macros.append(FnMacro(name, entry.get("Label") or name, source, data, skipped))
+
+    baud = settings.get("BaudRate", "")
+    return Win4YaesuSettings(
+        settings.get("ComPort") or None,
+        int(baud) if baud.isdigit() else None,
+        macros,
+    )